@@ -0,0 +1,201 @@
+"""In-memory answer caches keyed by question, retrieval settings and corpus version."""
+
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from app.utils.load_env import get_env, load_env
+
+load_env()
+
+ANSWER_CACHE_TTL = float(get_env("ANSWER_CACHE_TTL", "600"))
+ANSWER_CACHE_MAX_BYTES = int(get_env("ANSWER_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+SEMANTIC_CACHE_ENABLED = get_env("SEMANTIC_CACHE", "0") == "1"
+SEMANTIC_CACHE_THRESHOLD = float(get_env("SEMANTIC_CACHE_THRESHOLD", "0.95"))
+SEMANTIC_CACHE_MAX_ENTRIES = int(get_env("SEMANTIC_CACHE_MAX_ENTRIES", "2048"))
+
+
+def normalize_question(question: str) -> str:
+    """Normalize a question so trivially different spellings share a cache entry."""
+    question = re.sub(r"\s+", " ", question.casefold()).strip()
+    return question.rstrip("?!. ")
+
+
+class AnswerCache:
+    """LRU cache of answer payloads with a TTL and an approximate memory cap.
+
+    Keys include the corpus version, so any ingest, delete or fresh start
+    makes older entries unreachable; they age out through TTL and LRU.
+    """
+
+    def __init__(self, ttl: float = ANSWER_CACHE_TTL, max_bytes: int = ANSWER_CACHE_MAX_BYTES):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(question: str, k: int, corpus_version: int, **options) -> tuple:
+        """Build a cache key from the question and everything that shapes the answer."""
+        return (
+            normalize_question(question),
+            k,
+            corpus_version,
+            tuple(sorted(options.items())),
+        )
+
+    def get(self, key: tuple) -> dict:
+        """Return the cached payload for a key, or None if absent or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._evict(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: tuple, payload: dict):
+        """Store a payload, evicting least recently used entries over the cap."""
+        size = len(json.dumps(payload, default=str))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._evict(key)
+            self._entries[key] = (time.monotonic() + self.ttl, payload, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._evict(next(iter(self._entries)))
+
+    def _evict(self, key: tuple):
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and current memory use."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+answer_cache = AnswerCache()
+
+
+class SemanticCache:
+    """Cache of recent answers looked up by query-embedding cosine similarity.
+
+    Embeddings are kept L2-normalised in a fixed-size NumPy ring buffer, so
+    a lookup is one matrix-vector product over every stored question.
+    Entries only match when k, retrieval options and corpus version are
+    identical to the request.
+    """
+
+    def __init__(
+        self,
+        threshold: float = SEMANTIC_CACHE_THRESHOLD,
+        max_entries: int = SEMANTIC_CACHE_MAX_ENTRIES,
+        ttl: float = ANSWER_CACHE_TTL,
+        enabled: bool = SEMANTIC_CACHE_ENABLED,
+    ):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._vectors = None
+        self._versions = np.full(max_entries, -1, dtype=np.int64)
+        self._expires = np.zeros(max_entries, dtype=np.float64)
+        self._params = np.zeros(max_entries, dtype=np.int64)
+        self._payloads = [None] * max_entries
+        self._next = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(embedding) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    @staticmethod
+    def _params_key(k: int, options: dict) -> int:
+        # Hashed so parameter matching is vectorised along with similarity
+        return hash((k, tuple(sorted(options.items()))))
+
+    def lookup(self, embedding, k: int, corpus_version: int, **options) -> dict:
+        """Return the payload of the most similar cached question, or None.
+
+        Args:
+            embedding: Query embedding already computed for retrieval
+            k: Number of documents requested
+            corpus_version: Current corpus version
+            **options: Other retrieval options that must match exactly
+
+        Returns:
+            The cached payload if its similarity reaches the threshold
+        """
+        if not self.enabled:
+            return None
+        query = self._normalize(embedding)
+        with self._lock:
+            if self._vectors is None or self._vectors.shape[1] != query.shape[0]:
+                self.misses += 1
+                return None
+            valid = (
+                (self._versions == corpus_version)
+                & (self._params == self._params_key(k, options))
+                & (self._expires > time.monotonic())
+            )
+            similarities = np.where(valid, self._vectors @ query, -np.inf)
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.threshold:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return self._payloads[best]
+
+    def put(self, embedding, k: int, corpus_version: int, payload: dict, **options):
+        """Remember an answer, overwriting the oldest entry when full."""
+        if not self.enabled:
+            return
+        vector = self._normalize(embedding)
+        with self._lock:
+            if self._vectors is None or self._vectors.shape[1] != vector.shape[0]:
+                self._vectors = np.zeros((self.max_entries, vector.shape[0]), np.float32)
+                self._versions.fill(-1)
+            slot = self._next
+            self._vectors[slot] = vector
+            self._versions[slot] = corpus_version
+            self._expires[slot] = time.monotonic() + self.ttl
+            self._params[slot] = self._params_key(k, options)
+            self._payloads[slot] = payload
+            self._next = (slot + 1) % self.max_entries
+
+    def stats(self) -> dict:
+        """Return hit/miss counters."""
+        with self._lock:
+            return {"enabled": self.enabled, "hits": self.hits, "misses": self.misses}
+
+
+semantic_cache = SemanticCache()
@@ -0,0 +1,249 @@
+"""Reading document files out of uploaded zip and tar archives."""
+
+import logging
+import os
+import tarfile
+import zipfile
+import zlib
+
+from app import uploads
+from app.pipeline import ingest_bulk
+from app.uploads import UploadError, stage_stream, valid_filename
+from app.utils.load_env import get_env, load_env
+
+load_env()
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_EXTENSIONS = (".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+ARCHIVE_TYPES = (ARCHIVE_EXTENSIONS, "Only zip and tar archives are supported.")
+# Caps both the uploaded archive and the total size of the documents in it
+MAX_ARCHIVE_BYTES = int(get_env("MAX_ARCHIVE_BYTES", str(500 * 1024 * 1024)))
+MAX_ARCHIVE_FILES = int(get_env("MAX_ARCHIVE_FILES", "1000"))
+# Raised by zipfile, tarfile and their decompressors on a damaged archive
+_READ_ERRORS = (zipfile.BadZipFile, tarfile.TarError, EOFError, zlib.error, NotImplementedError)
+# Outcomes reported for archive members, in the order they are counted
+MEMBER_STATUSES = ("ingested", "duplicate", "conflict", "skipped", "failed")
+
+
+class ArchiveError(Exception):
+    """The uploaded file is not a readable zip or tar archive."""
+
+
+class ArchiveMember:  # pylint: disable=too-few-public-methods
+    """A document read out of an archive and staged for ingestion."""
+
+    def __init__(self, index: int, path: str, upload):
+        self.index = index
+        self.path = path
+        self.upload = upload
+        # Set once the staged file is committed to the upload directory
+        self.file_path = None
+
+    def entry(self, status: str, **details) -> tuple:
+        """Return an (index, summary entry) pair for this member."""
+        return member_entry(self.index, self.path, self.upload.filename, status, **details)
+
+
+def member_entry(index: int, path: str, filename: str, status: str, **details) -> tuple:
+    """Return an (index, summary entry) pair for one archive member.
+
+    Documents are stored under their base name; ``path`` keeps the member's
+    full path inside the archive so clients can tell same-named files apart.
+    """
+    return index, {"filename": filename, "path": path, "status": status, **details}
+
+
+def summarize(entries: list) -> tuple:
+    """Put (index, entry) pairs back into archive order and count the outcomes.
+
+    Returns:
+        A (files, counts) tuple of summary entries and counts per status
+    """
+    files = [entry for _, entry in sorted(entries, key=lambda pair: pair[0])]
+    counts = {status: 0 for status in MEMBER_STATUSES}
+    for entry in files:
+        counts[entry["status"]] += 1
+    return files, counts
+
+
+def _zip_members(archive_path: str):
+    with zipfile.ZipFile(archive_path) as archive:
+        for info in archive.infolist():
+            if not info.is_dir():
+                with archive.open(info) as f:
+                    yield info.filename, f
+
+
+def _tar_members(archive_path: str):
+    # Stream mode reads the archive front to back, one member at a time
+    with tarfile.open(archive_path, "r|*") as archive:
+        for info in archive:
+            if info.isfile():
+                yield info.name, archive.extractfile(info)
+
+
+def iter_members(archive_path: str, archive_name: str):
+    """Yield (path, file object) for every regular file in an archive.
+
+    Each file object is only valid until the next member is requested.
+
+    Raises:
+        ArchiveError: The archive is corrupt or of an unknown format
+    """
+    members = (
+        _zip_members(archive_path)
+        if archive_name.lower().endswith(".zip")
+        else _tar_members(archive_path)
+    )
+    try:
+        yield from members
+    except _READ_ERRORS as e:
+        raise ArchiveError(f"Could not read archive '{archive_name}'.") from e
+
+
+def _hidden(path: str) -> bool:
+    # macOS resource forks and dotfiles that archivers add on their own
+    parts = path.replace("\\", "/").split("/")
+    return "__MACOSX" in parts or any(part.startswith(".") for part in parts if part)
+
+
+def stage_members(
+    archive_path: str,
+    archive_name: str,
+    staging_dir: str = None,
+    max_file_bytes: int = None,
+    max_total_bytes: int = None,
+    max_files: int = None,
+) -> tuple:
+    """Copy the supported documents in an archive to staging files.
+
+    Members are read one at a time; unsupported ones are skipped without
+    being written anywhere. Every document is staged under its base name,
+    which is the name it is stored under; its path inside the archive is
+    kept on the ArchiveMember.
+
+    Args:
+        archive_path: Path of the uploaded archive
+        archive_name: Original file name, used to tell zip from tar
+        staging_dir: Directory for the staged documents; defaults to
+            UPLOAD_STAGING_DIR
+        max_file_bytes: Largest accepted document; defaults to MAX_UPLOAD_BYTES
+        max_total_bytes: Largest total size of the staged documents;
+            defaults to MAX_ARCHIVE_BYTES
+        max_files: Most documents accepted; defaults to MAX_ARCHIVE_FILES
+
+    Returns:
+        A (staged, skipped) tuple: ArchiveMember objects in archive order and
+        (index, summary entry) pairs for the members that were left out
+
+    Raises:
+        ArchiveError: The archive cannot be read
+        UploadError: The archive holds too many or too much data
+    """
+    staging_dir = staging_dir or uploads.UPLOAD_STAGING_DIR
+    max_file_bytes = uploads.MAX_UPLOAD_BYTES if max_file_bytes is None else max_file_bytes
+    max_total_bytes = MAX_ARCHIVE_BYTES if max_total_bytes is None else max_total_bytes
+    max_files = MAX_ARCHIVE_FILES if max_files is None else max_files
+    staged, skipped = [], []
+    total = 0
+    try:
+        for index, (path, source) in enumerate(iter_members(archive_path, archive_name)):
+            if _hidden(path):
+                continue
+            filename = os.path.basename(path.replace("\\", "/"))
+            if not valid_filename(filename) or not filename.lower().endswith(
+                uploads.ALLOWED_EXTENSIONS
+            ):
+                skipped.append(
+                    member_entry(
+                        index, path, filename, "skipped", reason="unsupported file type"
+                    )
+                )
+                continue
+            if len(staged) >= max_files:
+                raise UploadError(413, f"Archive holds more than {max_files} documents.")
+            try:
+                upload = stage_stream(source, filename, max_file_bytes, staging_dir)
+            except UploadError as e:
+                skipped.append(member_entry(index, path, filename, "skipped", reason=e.detail))
+                continue
+            staged.append(ArchiveMember(index, path, upload))
+            total += upload.size
+            if total > max_total_bytes:
+                raise UploadError(
+                    413,
+                    f"Archive expands to more than {max_total_bytes / 2**20:g} MB of documents.",
+                )
+    except BaseException as e:
+        for member in staged:
+            member.upload.discard()
+        if isinstance(e, _READ_ERRORS):
+            raise ArchiveError(f"Could not read archive '{archive_name}'.") from e
+        raise
+    return staged, skipped
+
+
+def _remove(file_path: str):
+    if os.path.exists(file_path):
+        os.remove(file_path)
+
+
+def ingest_members(
+    archive_name: str, members: list, entries: list, workers: int, progress=None
+) -> dict:
+    """Bulk ingest the committed documents of an archive; runs as a job.
+
+    Documents that fail are removed from the upload directory again, so
+    only ingested files are left there. If the run itself fails, the
+    documents it finished before the error are kept.
+
+    Args:
+        archive_name: Name of the uploaded archive
+        members: ArchiveMember objects whose files were committed
+        entries: (index, summary entry) pairs of the members left out
+        workers: Parser processes for the bulk pipeline
+        progress: Optional job callback invoked as progress(stage, **counts)
+
+    Returns:
+        A dictionary with the total chunks added, counts per status and a
+        summary entry for every document, in archive order
+    """
+    report = progress or (lambda stage, **counts: None)
+    finished = 0
+    # Files reported ingested are in the store and manifest; they must stay
+    ingested = set()
+
+    def file_done(file_path, result):
+        nonlocal finished
+        finished += 1
+        if isinstance(result, dict):
+            ingested.add(file_path)
+        report("ingesting", files_done=finished, files_total=len(members))
+
+    try:
+        results, stats = ingest_bulk(
+            [member.file_path for member in members], workers=workers, progress=file_done
+        )
+    except BaseException:
+        for member in members:
+            if member.file_path not in ingested:
+                _remove(member.file_path)
+        raise
+    logger.info("%s", stats.report())
+
+    entries = list(entries)
+    for member, result in zip(members, results):
+        if isinstance(result, dict):
+            entries.append(member.entry("ingested", chunks_added=result["chunks_added"]))
+            continue
+        # Only ingested files stay in the upload directory
+        _remove(member.file_path)
+        entries.append(member.entry(result if isinstance(result, str) else "failed"))
+    files, counts = summarize(entries)
+    return {
+        "filename": archive_name,
+        "chunks_added": sum(entry.get("chunks_added", 0) for entry in files),
+        "counts": counts,
+        "files": files,
+    }
@@ -0,0 +1,130 @@
+"""Bounded execution of blocking work from async request handlers."""
+
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from app.utils.load_env import get_env, load_env
+
+load_env()
+
+# Maximum concurrent operations per kind of work; override via environment
+LIMITS = {
+    "qa": int(get_env("QA_CONCURRENCY", "8")),
+    "ingest": int(get_env("INGEST_CONCURRENCY", "2")),
+    "io": int(get_env("IO_CONCURRENCY", "16")),
+}
+BLOCKING_THREADS = int(get_env("BLOCKING_THREADS", "32"))
+
+_EXECUTOR = None
+_SEMAPHORES = {}
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Get or create the thread pool used for blocking calls."""
+    global _EXECUTOR
+    if _EXECUTOR is None:
+        _EXECUTOR = ThreadPoolExecutor(
+            max_workers=BLOCKING_THREADS, thread_name_prefix="docqa-blocking"
+        )
+    return _EXECUTOR
+
+
+def shutdown_executor():
+    """Shut down the blocking thread pool; it is recreated on next use."""
+    global _EXECUTOR
+    if _EXECUTOR is not None:
+        _EXECUTOR.shutdown(wait=False, cancel_futures=True)
+        _EXECUTOR = None
+
+
+def limiter(kind: str) -> asyncio.Semaphore:
+    """Return the semaphore bounding concurrent work of the given kind.
+
+    Semaphores are created per event loop so test clients that spin up a
+    fresh loop never wait on a semaphore bound to a closed one.
+
+    Args:
+        kind: One of the keys in LIMITS
+
+    Returns:
+        The semaphore for that kind of work on the running loop
+    """
+    loop = asyncio.get_running_loop()
+    bound_loop, semaphore = _SEMAPHORES.get(kind, (None, None))
+    if bound_loop is not loop:
+        semaphore = asyncio.Semaphore(LIMITS[kind])
+        _SEMAPHORES[kind] = (loop, semaphore)
+    return semaphore
+
+
+async def run_in_thread(func, *args, **kwargs):
+    """Run a blocking callable on the shared thread pool and await its result.
+
+    The callable runs in a copy of the caller's context, so per-request
+    state such as stage timings is visible from the worker thread.
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(
+        get_executor(), partial(context.run, func, *args, **kwargs)
+    )
+
+
+async def run_limited(kind: str, func, *args, **kwargs):
+    """Run a blocking callable on the thread pool under the limit for its kind.
+
+    Args:
+        kind: One of the keys in LIMITS
+        func: Blocking callable to run
+        *args: Positional arguments for func
+        **kwargs: Keyword arguments for func
+
+    Returns:
+        Whatever func returns
+    """
+    async with limiter(kind):
+        return await run_in_thread(func, *args, **kwargs)
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into one computation.
+
+    The first caller for a key starts the work as a task; callers arriving
+    while it runs await the same task instead of repeating it. The task is
+    shielded so a disconnecting caller does not cancel it for the others.
+    """
+
+    def __init__(self):
+        self.leaders = 0
+        self.collapsed = 0
+        self._in_flight = {}
+
+    async def run(self, key, func):
+        """Run ``func()`` for a key unless an identical call is already in flight.
+
+        Args:
+            key: Hashable identity of the call
+            func: Zero-argument callable returning an awaitable
+
+        Returns:
+            The result of the shared computation
+        """
+        task = self._in_flight.get(key)
+        if task is None:
+            self.leaders += 1
+            task = asyncio.ensure_future(func())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        else:
+            self.collapsed += 1
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        """Return how many calls ran and how many were collapsed into another."""
+        return {
+            "leaders": self.leaders,
+            "collapsed": self.collapsed,
+            "in_flight": len(self._in_flight),
+        }
@@ -0,0 +1,115 @@
+"""Token-budgeted assembly of retrieved chunks into prompt context."""
+
+import functools
+import logging
+
+import tiktoken
+
+from app.utils.file_loader import CHUNK_OVERLAP
+from app.utils.load_env import get_env, load_env
+from app.utils.tokens import estimate_tokens
+
+load_env()
+
+CONTEXT_TOKEN_BUDGET = int(get_env("CONTEXT_TOKEN_BUDGET", "3000"))
+# Shorter suffix/prefix matches are too likely to be coincidental
+MIN_MERGE_OVERLAP = 12
+
+logger = logging.getLogger(__name__)
+
+
+@functools.lru_cache(maxsize=None)
+def _encoding(model: str):
+    try:
+        return tiktoken.encoding_for_model(model)
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        # The BPE files are downloaded on first use; estimate when offline
+        logger.warning("No tiktoken encoding for %s (%s); estimating tokens.", model, e)
+        return None
+
+
+def count_tokens(text: str, model: str) -> int:
+    """Count the tokens of a text for a model, estimating if tiktoken is unavailable."""
+    encoding = _encoding(model)
+    if encoding is None:
+        return estimate_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def merge_overlapping(first: str, second: str) -> str:
+    """Join two chunks if the end of the first repeats at the start of the second.
+
+    The splitter repeats up to CHUNK_OVERLAP characters between neighbouring
+    chunks, so adjacent chunks can be stitched back into one passage. A
+    second chunk already contained in the first adds nothing.
+
+    Returns:
+        The merged text, or None if the chunks do not overlap
+    """
+    if second in first:
+        return first
+    longest = min(len(first), len(second), 2 * CHUNK_OVERLAP)
+    for size in range(longest, MIN_MERGE_OVERLAP - 1, -1):
+        if first.endswith(second[:size]):
+            return first + second[size:]
+    return None
+
+
+class PackedContext:  # pylint: disable=too-few-public-methods
+    """Prompt context built from the chunks that fit in the token budget."""
+
+    def __init__(self, passages: list, docs_and_scores: list, tokens: int):
+        self.passages = passages
+        self.docs_and_scores = docs_and_scores
+        self.tokens = tokens
+
+    @property
+    def text(self) -> str:
+        """The passages joined for the prompt."""
+        return "\n\n".join(self.passages)
+
+
+def build_context(
+    docs_and_scores: list, model: str, budget: int = CONTEXT_TOKEN_BUDGET
+) -> PackedContext:
+    """Pack retrieved chunks into a context that fits a token budget.
+
+    Chunks are taken in retrieval order, best first. A chunk that overlaps
+    one already packed from the same source and page is merged into it,
+    so the overlap is not paid for twice. Chunks that would push the
+    context over the budget are skipped.
+
+    Args:
+        docs_and_scores: Retrieved (Document, score) tuples, best first
+        model: Model name used to pick the tokenizer
+        budget: Maximum context tokens
+
+    Returns:
+        The packed context and the (Document, score) tuples it includes
+    """
+    passages = []
+    owners = []
+    used = []
+    tokens = 0
+    for doc, score in docs_and_scores:
+        owner = (doc.metadata.get("source"), doc.metadata.get("page"))
+        text = doc.page_content
+        for index, passage in enumerate(passages):
+            if owners[index] != owner:
+                continue
+            merged = merge_overlapping(passage, text) or merge_overlapping(text, passage)
+            if merged is not None:
+                cost = count_tokens(merged, model) - count_tokens(passage, model)
+                if tokens + cost <= budget:
+                    passages[index] = merged
+                    tokens += cost
+                    used.append((doc, score))
+                break
+        else:
+            cost = count_tokens(text, model)
+            if tokens + cost <= budget:
+                passages.append(text)
+                owners.append(owner)
+                tokens += cost
+                used.append((doc, score))
+    return PackedContext(passages, used, tokens)
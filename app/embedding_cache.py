@@ -0,0 +1,200 @@
+"""Disk-backed LRU cache for embeddings keyed by model and chunk text."""
+
+import hashlib
+import sqlite3
+import threading
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from app.concurrency import run_in_thread
+from app.utils.load_env import get_env, load_env
+
+load_env()
+
+EMBEDDING_CACHE_PATH = get_env("EMBEDDING_CACHE_PATH", "embedding_cache.sqlite3")
+# Roughly 6 KB per entry for 1536-dimensional embeddings
+EMBEDDING_CACHE_MAX_ENTRIES = int(get_env("EMBEDDING_CACHE_MAX_ENTRIES", "50000"))
+# SQLite caps bound parameters per statement
+_LOOKUP_BATCH = 500
+
+_CACHE = None  # Global singleton
+
+
+def cache_key(namespace: str, text: str) -> str:
+    """Return the cache key for a text embedded by the given model."""
+    return hashlib.sha256(f"{namespace}\0{text}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """SQLite store of embedding vectors with LRU eviction and hit counters.
+
+    Vectors are stored as float32 blobs. Every lookup refreshes the entry's
+    recency; once the entry count exceeds ``max_entries`` the least recently
+    used rows are deleted. The entry count is read once at startup and kept
+    up to date in memory, so writes never scan the table.
+    """
+
+    def __init__(
+        self,
+        path: str = EMBEDDING_CACHE_PATH,
+        max_entries: int = EMBEDDING_CACHE_MAX_ENTRIES,
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, vector BLOB NOT NULL, last_used INTEGER NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS embeddings_lru ON embeddings (last_used)"
+        )
+        self._clock = self._conn.execute(
+            "SELECT COALESCE(MAX(last_used), 0) FROM embeddings"
+        ).fetchone()[0]
+        self._entries = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def get_many(self, keys: list) -> dict:
+        """Return cached vectors for the keys that are present.
+
+        Args:
+            keys: Cache keys to look up
+
+        Returns:
+            A dictionary mapping each cached key to its vector
+        """
+        found = {}
+        with self._lock:
+            for start in range(0, len(keys), _LOOKUP_BATCH):
+                batch = keys[start : start + _LOOKUP_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                    batch,
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32).tolist()
+            if found:
+                self._clock += 1
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                    [(self._clock, key) for key in found],
+                )
+                self._conn.commit()
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, items: dict):
+        """Store vectors and evict least recently used entries over the cap.
+
+        Args:
+            items: A dictionary mapping cache keys to vectors
+        """
+        if not items:
+            return
+        with self._lock:
+            self._clock += 1
+            # A key always maps to the same vector, so a row written meanwhile
+            # by another caller can be kept; rowcount is then the rows added
+            added = self._conn.executemany(
+                "INSERT OR IGNORE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)",
+                [
+                    (key, np.asarray(vector, dtype=np.float32).tobytes(), self._clock)
+                    for key, vector in items.items()
+                ],
+            ).rowcount
+            self._entries += added
+            overflow = self._entries - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM embeddings WHERE key IN ("
+                    "SELECT key FROM embeddings ORDER BY last_used LIMIT ?)",
+                    (overflow,),
+                )
+                self._entries -= overflow
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and the current entry count."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+                "entries": self._entries,
+                "max_entries": self.max_entries,
+            }
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Get or create the shared embedding cache."""
+    global _CACHE
+    if _CACHE is None:
+        _CACHE = EmbeddingCache()
+    return _CACHE
+
+
+def _as_float32(vectors: list) -> list:
+    # Round fresh vectors the same way cached ones are, so hits and misses agree
+    return np.asarray(vectors, dtype=np.float32).tolist()
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that only sends uncached texts to the model.
+
+    Only documents are cached. Questions rarely repeat word for word and the
+    answer caches already cover those that do, so query embeddings go
+    straight to the model instead of evicting chunk vectors.
+    """
+
+    def __init__(self, underlying: Embeddings, cache: EmbeddingCache = None):
+        self.underlying = underlying
+        self.cache = cache or get_embedding_cache()
+        self.namespace = getattr(underlying, "model", type(underlying).__name__)
+
+    def _split(self, texts: list) -> tuple:
+        keys = [cache_key(self.namespace, text) for text in texts]
+        found = self.cache.get_many(list(dict.fromkeys(keys)))
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in found:
+                missing.setdefault(key, text)
+        return keys, found, missing
+
+    def embed_documents(self, texts: list) -> list:
+        """Embed documents, reusing cached vectors where available."""
+        keys, found, missing = self._split(texts)
+        if missing:
+            vectors = self.underlying.embed_documents(list(missing.values()))
+            computed = dict(zip(missing, _as_float32(vectors)))
+            self.cache.put_many(computed)
+            found.update(computed)
+        return [found[key] for key in keys]
+
+    def embed_query(self, text: str) -> list:
+        """Embed a query with the model; queries are not cached."""
+        return self.underlying.embed_query(text)
+
+    async def aembed_documents(self, texts: list) -> list:
+        """Async variant of embed_documents using the model's async client.
+
+        Cache reads and writes run on the blocking thread pool, so SQLite
+        I/O never stalls the event loop.
+        """
+        keys, found, missing = await run_in_thread(self._split, texts)
+        if missing:
+            vectors = await self.underlying.aembed_documents(list(missing.values()))
+            computed = dict(zip(missing, _as_float32(vectors)))
+            await run_in_thread(self.cache.put_many, computed)
+            found.update(computed)
+        return [found[key] for key in keys]
+
+    async def aembed_query(self, text: str) -> list:
+        """Async variant of embed_query; queries are not cached."""
+        return await self.underlying.aembed_query(text)
@@ -4,143 +4,451 @@ import argparse
 import os
 from pathlib import Path
 
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langsmith import traceable
-
-from app.utils.file_loader import load_document
+from tqdm import tqdm
+
+from app.context import count_tokens
+from app.lexical_index import get_lexical_index
+from app.manifest import (CHECKPOINT_PATH, DuplicateFilter, IngestCheckpoint,
+                          file_sha256, get_manifest)
+from app.metrics import EMBEDDED_CHUNKS, timed
+from app.pipeline import (DEFAULT_BATCH_SIZE, DEFAULT_EMBED_CONCURRENCY,
+                          DEFAULT_WORKERS, ingest_bulk)
+from app.utils.file_loader import (LOADERS, PAGE_WINDOW, iter_documents,
+                                   iter_windows, make_chunk_ids,
+                                   split_documents)
 from app.utils.load_env import load_env
-from app.vector_store import get_vectordb
+from app.utils.tracing import traceable
+from app.vector_store import (EMBEDDING_MODEL, bump_corpus_version,
+                              get_manager, get_vectordb)
 
 load_env()
 
 
+# Chunks are written in slices so progress can be reported while embedding
+EMBED_BATCH_SIZE = 64
+# List prices in USD per million tokens, for dry-run cost estimates
+EMBEDDING_PRICES = {
+    "text-embedding-ada-002": 0.10,
+    "text-embedding-3-small": 0.02,
+    "text-embedding-3-large": 0.13,
+}
+
+
 @traceable(name="File Ingestion")
-def ingest_single_file(file_path: str) -> dict:
+def ingest_single_file(
+    file_path: str, sha256: str = None, progress=None, update: bool = False
+) -> dict:
     """Process and ingest a single document file.
 
+    In update mode a file already in the manifest under the same name is
+    re-split and diffed against its stored chunks: only new chunks are
+    embedded and written, chunks that disappeared are deleted, and
+    unchanged chunks keep their IDs and embeddings.
+
     Args:
         file_path: Path to the file to ingest
+        sha256: Precomputed content hash of the file, if already known
+        progress: Optional callback invoked as progress(stage, **counts)
+            after each ingestion stage
+        update: Replace an existing file of the same name instead of
+            skipping it as a duplicate
 
     Returns:
         A dictionary containing the filename and number of chunks added
     """
     filename = Path(file_path).name
+    manifest = get_manifest()
+    report = progress or (lambda stage, **counts: None)
 
-    vectordb = get_vectordb()
-
-    existing_docs = vectordb.similarity_search(" ", k=100)
-    already_ingested = any(
-        doc.metadata.get("source") == filename for doc in existing_docs
-    )
-
-    if already_ingested:
+    sha256 = sha256 or file_sha256(file_path)
+    existing = manifest.find_duplicate(filename, sha256, update=update)
+    if existing:
         print(
-            f"File '{filename}' already exists in the vector store. Skipping ingestion."
+            f"File '{filename}' already exists in the vector store"
+            f" as '{existing}'. Skipping ingestion."
         )
         return "duplicate"
 
+    previous = manifest.get(filename)
+    generation = get_manager().generation
+    vectordb = get_vectordb()
+    lexical = get_lexical_index()
+    old_ids = set(previous["chunk_ids"]) if previous else set()
+    chunk_ids = []
+    new_ids = []
+    new_total = 0
+    pages = 0
+    seen = {}
     try:
-        document = load_document(file_path)
-        splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=50)
-        chunks = splitter.split_documents(document)
-        for chunk in chunks:
-            chunk.metadata["source"] = filename
-
-        vectordb.add_documents(chunks)
-
-        return {"filename": os.path.basename(file_path), "chunks_added": len(chunks)}
+        # Pages are parsed, split and embedded a window at a time so a large
+        # PDF never has all of its text in memory at once
+        windows = iter_windows(iter_documents(file_path), PAGE_WINDOW)
+        while True:
+            with timed("parse"):
+                window = next(windows, None)
+            if window is None:
+                break
+            pages += len(window)
+            report("parsed", pages_parsed=pages)
+
+            with timed("split"):
+                chunks = split_documents(window, filename)
+                ids = make_chunk_ids(chunks, seen)
+            chunk_ids.extend(ids)
+
+            # Only chunks the stored version lacks need embedding
+            new = [(c, i) for c, i in zip(chunks, ids) if i not in old_ids]
+            new_total += len(new)
+            for start in range(0, len(new), EMBED_BATCH_SIZE):
+                part = new[start : start + EMBED_BATCH_SIZE]
+                batch = [chunk for chunk, _ in part]
+                batch_ids = [chunk_id for _, chunk_id in part]
+                # Embed and write separately so each stage is timed on its own
+                with timed("embed"):
+                    vectors = vectordb.embeddings.embed_documents(
+                        [chunk.page_content for chunk in batch]
+                    )
+                EMBEDDED_CHUNKS.inc(len(batch))
+                with timed("chroma_write"):
+                    vectordb._collection.upsert(  # pylint: disable=protected-access
+                        ids=batch_ids,
+                        embeddings=vectors,
+                        documents=[chunk.page_content for chunk in batch],
+                        metadatas=[chunk.metadata for chunk in batch],
+                    )
+                new_ids.extend(batch_ids)
+                report("embedding", chunks_embedded=len(new_ids), chunks_total=new_total)
+            if get_manager().generation == generation:
+                lexical.add([i for _, i in new], [c for c, _ in new])
+
+        if get_manager().generation != generation:
+            print(f"Vector store was reset while ingesting {filename}; discarding.")
+            return 0
+        removed = list(old_ids.difference(chunk_ids))
+        if removed:
+            vectordb.delete(ids=removed)
+        lexical.delete(removed)
+        manifest.record(filename, sha256, chunk_ids)
+
+        result = {"filename": os.path.basename(file_path), "chunks_added": len(new_ids)}
+        if previous:
+            result["chunks_removed"] = len(removed)
+            result["chunks_unchanged"] = len(chunk_ids) - len(new_ids)
+        return result
     except Exception as e:
         print(f"Failed to process {file_path}: {str(e)}")
+        if new_ids:
+            vectordb.delete(ids=new_ids)
+            lexical.delete(new_ids)
         return 0
 
 
+def delete_file(filename: str) -> int:
+    """Remove one file's chunks from the vector store and the manifest.
+
+    Chunk IDs come from the manifest; chunks written before the manifest
+    tracked them are found through their source metadata instead.
+
+    Args:
+        filename: Name the file was ingested under
+
+    Returns:
+        The number of chunks deleted
+    """
+    manifest = get_manifest()
+    vectordb = get_vectordb()
+    entry = manifest.get(filename)
+    chunk_ids = set(entry["chunk_ids"]) if entry else set()
+    chunk_ids.update(vectordb.get(where={"source": filename}, include=[])["ids"])
+
+    if chunk_ids:
+        vectordb.delete(ids=list(chunk_ids))
+        get_lexical_index().delete(chunk_ids)
+    if entry is not None:
+        manifest.remove(filename)
+    elif chunk_ids:
+        bump_corpus_version()
+    return len(chunk_ids)
+
+
 @traceable(name="Batch Ingestion")
-def ingest_files(file_paths: list) -> list:
-    """Process and ingest multiple document files.
+def ingest_files(
+    file_paths: list,
+    workers: int = DEFAULT_WORKERS,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    embed_concurrency: int = DEFAULT_EMBED_CONCURRENCY,
+    checkpoint: IngestCheckpoint = None,
+    progress=None,
+) -> list:
+    """Process and ingest multiple document files through the bulk pipeline.
 
     Args:
         file_paths: List of file paths to ingest
+        workers: Number of parser processes (0 parses in-process)
+        batch_size: Maximum chunks per embedding request and Chroma write
+        embed_concurrency: Maximum embedding requests in flight
+        checkpoint: Optional IngestCheckpoint that makes the run resumable
+        progress: Optional callback invoked as progress(file_path, result)
+            as each file finishes
 
     Returns:
         List of ingestion results for each file
     """
-    results = []
-    for file_path in file_paths:
-        result = ingest_single_file(file_path)
-        results.append(result)
+    results, stats = ingest_bulk(
+        file_paths,
+        workers=workers,
+        batch_size=batch_size,
+        embed_concurrency=embed_concurrency,
+        checkpoint=checkpoint,
+        progress=progress,
+    )
+    print(stats.report())
     return results
 
 
-@traceable(name="Directory Ingestion")
-def ingest_directory(directory_path: str) -> list:
-    """Process and ingest all documents from a directory.
+def find_documents(directory_path: str) -> list:
+    """Return the supported document files under a directory, recursively.
+
+    Hidden files and directories are skipped.
 
     Args:
-        directory_path: Path to the directory containing files to ingest
+        directory_path: Directory to search
 
     Returns:
-        List of ingestion results for all files
+        Sorted list of file paths
     """
-    file_paths = [os.path.join(directory_path, f) for f in os.listdir(directory_path)]
-    return ingest_files(file_paths)
+    file_paths = []
+    for root, dirs, filenames in os.walk(directory_path):
+        dirs[:] = [d for d in dirs if not d.startswith(".")]
+        file_paths.extend(
+            os.path.join(root, f)
+            for f in filenames
+            if not f.startswith(".") and Path(f).suffix.lower() in LOADERS
+        )
+    return sorted(file_paths)
+
+
+def name_collisions(file_paths: list) -> dict:
+    """Group paths that share a base name, which files are stored under.
+
+    Returns:
+        A dictionary mapping each base name used by more than one path to
+        those paths
+    """
+    paths_by_name = {}
+    for file_path in file_paths:
+        paths_by_name.setdefault(Path(file_path).name, []).append(file_path)
+    return {name: paths for name, paths in paths_by_name.items() if len(paths) > 1}
 
 
-def ingest_documents_from_directory(directory_path):
-    """Process and ingest all documents from a directory.
+@traceable(name="Directory Ingestion")
+def ingest_directory(
+    directory_path: str,
+    workers: int = DEFAULT_WORKERS,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> list:
+    """Process and ingest all documents under a directory and its subdirectories.
 
     Args:
         directory_path: Path to the directory containing files to ingest
+        workers: Number of parser processes (0 parses in-process)
+        batch_size: Maximum chunks per embedding request and Chroma write
 
     Returns:
-        List of chunks for all files
+        List of ingestion results for all files
     """
-    all_chunks = []
+    file_paths = find_documents(directory_path)
+    return ingest_files(file_paths, workers=workers, batch_size=batch_size)
 
-    for filename in os.listdir(directory_path):
-        file_path = os.path.join(directory_path, filename)
 
-        if not os.path.isfile(file_path):
-            continue
+def estimate_ingestion(file_paths: list, model: str = EMBEDDING_MODEL) -> dict:
+    """Count what ingesting files would embed, without calling the embeddings API.
 
-        try:
-            document = load_document(file_path)
-            splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=50)
-            chunks = splitter.split_documents(document)
-            filename = Path(file_path).name
-            for chunk in chunks:
-                chunk.metadata["source"] = filename
-            all_chunks.extend(chunks)
-            print(f"Ingested {len(chunks)} chunks from {filename}")
-        except Exception as e:
-            print(f"Failed to process {filename}: {str(e)}")
-
-    return all_chunks
+    Files already in the vector store, and files whose name is taken by a
+    different stored file, are left out, as a real run would skip them.
+    Files are parsed a page window at a time, as in ingestion.
 
+    Args:
+        file_paths: Paths of the files to ingest
+        model: Embedding model whose tokenizer counts the tokens
 
-def main(directory):
+    Returns:
+        A dictionary of file, chunk and token counts
+    """
+    duplicates = DuplicateFilter(get_manifest())
+    counts = {
+        "files": 0,
+        "duplicates": 0,
+        "conflicts": 0,
+        "failed": 0,
+        "chunks": 0,
+        "tokens": 0,
+    }
+    for file_path in file_paths:
+        filename = Path(file_path).name
+        status, _ = duplicates.check(filename, file_sha256(file_path))
+        if status != "new":
+            counts["duplicates" if status == "duplicate" else "conflicts"] += 1
+            continue
+        try:
+            for window in iter_windows(iter_documents(file_path), PAGE_WINDOW):
+                for chunk in split_documents(window, filename):
+                    counts["chunks"] += 1
+                    counts["tokens"] += count_tokens(chunk.page_content, model)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            print(f"Failed to process {file_path}: {str(e)}")
+            counts["failed"] += 1
+            continue
+        counts["files"] += 1
+    return counts
+
+
+def main(  # pylint: disable=too-many-arguments
+    directory,
+    workers=DEFAULT_WORKERS,
+    batch_size=DEFAULT_BATCH_SIZE,
+    embed_concurrency=DEFAULT_EMBED_CONCURRENCY,
+    checkpoint_path=CHECKPOINT_PATH,
+    dry_run=False,
+    price_per_million=None,
+):
     """Main entry point for the script.
 
     Args:
         directory: Path to the directory containing files to ingest
+        workers: Number of parser processes
+        batch_size: Maximum chunks per embedding request and Chroma write
+        embed_concurrency: Maximum embedding requests in flight
+        checkpoint_path: Log of finished files that lets an interrupted
+            run resume where it stopped
+        dry_run: Report what would be embedded and its cost, then exit
+        price_per_million: Embedding price in USD per million tokens;
+            defaults to the list price of EMBEDDING_MODEL
     """
-    chunks = ingest_documents_from_directory(directory)
+    file_paths = find_documents(directory)
+    if not file_paths:
+        print(f"No PDF, TXT or Markdown files found under '{directory}'.")
+        return
+    collisions = name_collisions(file_paths)
+    if collisions:
+        for name, paths in collisions.items():
+            print(f"'{name}' is used by {len(paths)} files: {', '.join(paths)}")
+        raise SystemExit(
+            "Files are stored under their base names, so these must be renamed"
+            " before the directory can be ingested."
+        )
 
-    if not chunks:
-        print("No chunks ingested. Exiting.")
+    if dry_run:
+        counts = estimate_ingestion(file_paths)
+        price = price_per_million
+        if price is None:
+            price = EMBEDDING_PRICES.get(EMBEDDING_MODEL)
+        print(
+            f"Dry run: {counts['files']} files to ingest, {counts['duplicates']} already"
+            f" in the vector store, {counts['conflicts']} named like a different stored"
+            f" file, {counts['failed']} unreadable."
+        )
+        print(f"  chunks:         {counts['chunks']:>14,}")
+        print(f"  tokens:         {counts['tokens']:>14,} ({EMBEDDING_MODEL})")
+        if price is None:
+            print("  estimated cost: unknown model price; pass --price-per-million")
+        else:
+            cost = counts["tokens"] / 1_000_000 * price
+            print(f"  estimated cost: {f'${cost:,.2f}':>14} at ${price} per 1M tokens")
         return
 
-    print(f"Vector store updated with {len(chunks)} total chunks.")
+    chunks = 0
+    with tqdm(
+        total=len(file_paths), unit="file", desc="Ingesting", disable=None
+    ) as progress_bar:
+
+        def progress(_file_path, result):
+            nonlocal chunks
+            if isinstance(result, dict):
+                chunks += result["chunks_added"]
+            progress_bar.set_postfix(chunks=chunks, refresh=False)
+            progress_bar.update()
+
+        results = ingest_files(
+            file_paths,
+            workers=workers,
+            batch_size=batch_size,
+            embed_concurrency=embed_concurrency,
+            checkpoint=IngestCheckpoint(checkpoint_path),
+            progress=progress,
+        )
+
+    added = sum(r["chunks_added"] for r in results if isinstance(r, dict))
+    skipped = results.count("duplicate")
+    conflicts = results.count("conflict")
+    failed = sum(1 for r in results if not isinstance(r, (dict, str)))
+    print(
+        f"{len(results) - skipped - conflicts - failed} files ingested,"
+        f" {skipped} already present, {conflicts} name conflicts, {failed} failed."
+    )
+
+    if not added:
+        print("No chunks ingested.")
+    else:
+        print(f"Vector store updated with {added} total chunks.")
+    if conflicts:
+        raise SystemExit(
+            f"{conflicts} files were not ingested because a different file with the"
+            " same name is already stored. Rename them, or delete the stored file first."
+        )
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(
-        description="Ingest multiple documents into a vector store."
+        description="Ingest a directory tree of documents into the vector store."
     )
     parser.add_argument(
         "--dir",
         type=str,
         default="test_files",
-        help="Directory containing documents to ingest.",
+        help="Directory searched recursively for documents to ingest.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help="Number of parser processes (0 parses in-process).",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help="Maximum chunks per embedding request and vector store write.",
+    )
+    parser.add_argument(
+        "--embed-concurrency",
+        type=int,
+        default=DEFAULT_EMBED_CONCURRENCY,
+        help="Maximum embedding requests in flight.",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        type=str,
+        default=CHECKPOINT_PATH,
+        help="Log of finished files used to resume an interrupted run.",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Report chunk and token counts and the estimated cost without embedding.",
+    )
+    parser.add_argument(
+        "--price-per-million",
+        type=float,
+        help="Embedding price in USD per million tokens for --dry-run.",
     )
     args = parser.parse_args()
-    main(args.dir)
+    main(
+        args.dir,
+        workers=args.workers,
+        batch_size=args.batch_size,
+        embed_concurrency=args.embed_concurrency,
+        checkpoint_path=args.checkpoint,
+        dry_run=args.dry_run,
+        price_per_million=args.price_per_million,
+    )
@@ -0,0 +1,226 @@
+"""Background ingestion jobs with bounded queueing and progress events."""
+
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+
+from app.concurrency import run_limited
+from app.ingest import ingest_single_file
+from app.utils.load_env import get_env, load_env
+
+load_env()
+
+JOB_WORKERS = int(get_env("JOB_WORKERS", "2"))
+JOB_QUEUE_DEPTH = int(get_env("JOB_QUEUE_DEPTH", "32"))
+# Finished jobs kept around for /jobs/{id} lookups
+JOB_HISTORY = 1000
+
+
+class QueueFullError(Exception):
+    """Raised when the ingestion queue cannot accept more work."""
+
+
+class Job:  # pylint: disable=too-many-instance-attributes
+    """State of a single ingestion job."""
+
+    def __init__(self, file_path: str, filename: str, sha256: str, update: bool = False):
+        self.id = uuid.uuid4().hex
+        self.file_path = file_path
+        self.filename = filename
+        self.sha256 = sha256
+        self.update = update
+        self.status = "queued"
+        self.stage = "queued"
+        self.progress = {}
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        # (filename, sha256) of every document the job ingests
+        self.files = [(filename, sha256)]
+        # Blocking callable run instead of ingest_single_file, for bulk jobs
+        self.task = None
+
+    @property
+    def done(self) -> bool:
+        """Whether the job has reached a terminal state."""
+        return self.status in ("completed", "duplicate", "failed")
+
+    def to_dict(self) -> dict:
+        """Return a JSON-serialisable view of the job."""
+        return {
+            "job_id": self.id,
+            "filename": self.filename,
+            "status": self.status,
+            "stage": self.stage,
+            "progress": dict(self.progress),
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobQueue:
+    """Bounded queue of ingestion jobs drained by a fixed pool of workers.
+
+    Progress and completion events are passed to the ``notify`` coroutine,
+    which the API uses to broadcast them over /ws/files.
+    """
+
+    def __init__(self, notify, workers: int = JOB_WORKERS, depth: int = JOB_QUEUE_DEPTH):
+        self.notify = notify
+        self.workers = workers
+        self.depth = depth
+        self.jobs = OrderedDict()
+        self._loop = None
+        self._queue = None
+        self._tasks = []
+
+    def _ensure_started(self):
+        # Workers are bound to the running loop; test clients use a new one per test
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=self.depth)
+        self._tasks = [loop.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def start(self):
+        """Start the workers on the running loop."""
+        self._ensure_started()
+
+    async def stop(self):
+        """Cancel the workers."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._loop = None
+
+    @property
+    def queued(self) -> int:
+        """Number of jobs waiting for a worker."""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def get(self, job_id: str) -> Job:
+        """Return a job by ID, or None."""
+        return self.jobs.get(job_id)
+
+    def find_active(self, filename: str, sha256: str) -> Job:
+        """Return an unfinished job for the same filename or content, or None."""
+        for job in self.jobs.values():
+            if not job.done and any(
+                name == filename or digest == sha256 for name, digest in job.files
+            ):
+                return job
+        return None
+
+    def submit(
+        self, file_path: str, filename: str, sha256: str, update: bool = False
+    ) -> Job:
+        """Queue a file for ingestion.
+
+        Args:
+            file_path: Path of the saved upload
+            filename: Name the file is ingested under
+            sha256: Content hash of the file
+            update: Re-ingest an existing file of the same name incrementally
+
+        Returns:
+            The queued job
+
+        Raises:
+            QueueFullError: If the queue already holds its maximum depth
+        """
+        return self._enqueue(Job(file_path, filename, sha256, update=update))
+
+    def submit_bulk(self, name: str, files: list, task) -> Job:
+        """Queue several documents for ingestion as a single job.
+
+        Args:
+            name: Name the job is reported under, e.g. the archive's
+            files: (filename, sha256) pairs of the documents it ingests,
+                so find_active sees them
+            task: Blocking callable run as task(progress) under the ingest
+                limit; returns the job's result dictionary
+
+        Returns:
+            The queued job
+
+        Raises:
+            QueueFullError: If the queue already holds its maximum depth
+        """
+        job = Job(None, name, None)
+        job.files = list(files)
+        job.task = task
+        return self._enqueue(job)
+
+    def _enqueue(self, job: Job) -> Job:
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull as e:
+            raise QueueFullError("Ingestion queue is full.") from e
+        self.jobs[job.id] = job
+        self._trim_history()
+        return job
+
+    def _trim_history(self):
+        while len(self.jobs) > JOB_HISTORY:
+            oldest_id = next(iter(self.jobs))
+            if not self.jobs[oldest_id].done:
+                break
+            del self.jobs[oldest_id]
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    def _progress_callback(self, job: Job):
+        loop = asyncio.get_running_loop()
+
+        def report(stage, **counts):
+            # Called from the ingestion thread; hop back onto the loop
+            job.stage = stage
+            job.progress.update(counts)
+            event = {"type": "job_progress", "job": job.to_dict()}
+            asyncio.run_coroutine_threadsafe(self.notify(event), loop)
+
+        return report
+
+    async def _run(self, job: Job):
+        job.status = job.stage = "running"
+        await self.notify({"type": "job_progress", "job": job.to_dict()})
+        try:
+            if job.task is not None:
+                result = await run_limited("ingest", job.task, self._progress_callback(job))
+            else:
+                result = await run_limited(
+                    "ingest",
+                    ingest_single_file,
+                    job.file_path,
+                    sha256=job.sha256,
+                    progress=self._progress_callback(job),
+                    update=job.update,
+                )
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            result = 0
+            job.error = str(e)
+
+        if result == "duplicate":
+            job.status = "duplicate"
+        elif isinstance(result, dict):
+            job.status = "completed"
+            job.result = result
+        else:
+            job.status = "failed"
+            job.error = job.error or "Failed to process file."
+        job.stage = job.status
+        job.finished_at = time.time()
+        await self.notify({"type": f"job_{job.status}", "job": job.to_dict()})
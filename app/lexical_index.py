@@ -0,0 +1,192 @@
+"""Persistent BM25 keyword index over stored chunks, backed by SQLite FTS5."""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+
+from langchain_core.documents import Document
+
+from app.utils.load_env import get_env, load_env
+from app.vector_store import VECTOR_STORE_DIR, get_vectordb
+
+load_env()
+
+# Lives inside the store directory, so deleting or moving the store takes
+# the index along and the two never disagree
+LEXICAL_INDEX_PATH = get_env(
+    "LEXICAL_INDEX_PATH", os.path.join(VECTOR_STORE_DIR, "lexical_index.sqlite3")
+)
+# SQLite caps bound parameters per statement
+_ID_BATCH = 500
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+_INDEX = None  # Global singleton
+
+
+def match_query(text: str) -> str:
+    """Turn free text into an FTS5 query matching any of its terms.
+
+    Every term is quoted, so punctuation and FTS5 operators in user input
+    are treated as plain words.
+    """
+    terms = dict.fromkeys(token.casefold() for token in _TOKEN.findall(text))
+    return " OR ".join(f'"{term}"' for term in terms)
+
+
+class LexicalIndex:
+    """Inverted index of chunk text ranked with BM25.
+
+    Chunks are keyed by the same IDs as in Chroma, so the index is updated
+    incrementally alongside the vector store. A search is a local SQLite
+    query and never calls the embeddings API.
+    """
+
+    def __init__(self, path: str = LEXICAL_INDEX_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+        self._connect()
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS chunks ("
+            "rowid INTEGER PRIMARY KEY, chunk_id TEXT UNIQUE NOT NULL, "
+            "metadata TEXT NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS chunk_text USING fts5("
+            "content, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+
+    def add(self, chunk_ids: list, documents: list):
+        """Index chunks; IDs already present are left unchanged.
+
+        Args:
+            chunk_ids: IDs the chunks were written under in the vector store
+            documents: The chunks, in the same order as chunk_ids
+        """
+        with self._lock:
+            for chunk_id, document in zip(chunk_ids, documents):
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO chunks (chunk_id, metadata) VALUES (?, ?)",
+                    (chunk_id, json.dumps(document.metadata, default=str)),
+                )
+                if cursor.rowcount:
+                    self._conn.execute(
+                        "INSERT INTO chunk_text (rowid, content) VALUES (?, ?)",
+                        (cursor.lastrowid, document.page_content),
+                    )
+            self._conn.commit()
+
+    def delete(self, chunk_ids: list):
+        """Remove chunks from the index."""
+        chunk_ids = list(chunk_ids)
+        with self._lock:
+            for start in range(0, len(chunk_ids), _ID_BATCH):
+                batch = chunk_ids[start : start + _ID_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                rowids = [
+                    (row[0],)
+                    for row in self._conn.execute(
+                        f"SELECT rowid FROM chunks WHERE chunk_id IN ({placeholders})",
+                        batch,
+                    )
+                ]
+                self._conn.executemany("DELETE FROM chunk_text WHERE rowid = ?", rowids)
+                self._conn.executemany("DELETE FROM chunks WHERE rowid = ?", rowids)
+            self._conn.commit()
+
+    def search(self, query: str, k: int = 4) -> list:
+        """Return the k best keyword matches for a query.
+
+        Args:
+            query: Free-text question
+            k: Number of chunks to return
+
+        Returns:
+            List of (Document, score) tuples, best first. Scores are BM25
+            scores, where higher means a better match.
+        """
+        expression = match_query(query)
+        if not expression:
+            return []
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT c.chunk_id, c.metadata, t.content, bm25(chunk_text) AS rank "
+                "FROM chunk_text t JOIN chunks c ON c.rowid = t.rowid "
+                "WHERE chunk_text MATCH ? ORDER BY rank LIMIT ?",
+                (expression, k),
+            ).fetchall()
+        # SQLite reports BM25 negated so that ascending order is best first
+        return [
+            (
+                Document(
+                    page_content=content, metadata=json.loads(metadata), id=chunk_id
+                ),
+                -rank,
+            )
+            for chunk_id, metadata, content, rank in rows
+        ]
+
+    def count(self) -> int:
+        """Return the number of indexed chunks."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+    def clear(self):
+        """Remove every chunk from the index."""
+        with self._lock:
+            self._conn.execute("DELETE FROM chunk_text")
+            self._conn.execute("DELETE FROM chunks")
+            self._conn.commit()
+
+    def recreate(self):
+        """Start over with a new, empty index file.
+
+        Used after the store directory is deleted, which also unlinks the
+        file this connection still writes to.
+        """
+        with self._lock:
+            self._conn.close()
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            self._connect()
+
+    def rebuild_from_store(self, vectordb):
+        """Index every chunk already in the vector store.
+
+        Stores created before the lexical index existed would otherwise only
+        be searchable by vector. Reading documents is a local Chroma call.
+        """
+        stored = vectordb.get(include=["documents", "metadatas"])
+        documents = [
+            Document(page_content=text or "", metadata=metadata or {})
+            for text, metadata in zip(stored["documents"], stored["metadatas"])
+        ]
+        self.add(stored["ids"], documents)
+
+
+def get_lexical_index() -> LexicalIndex:
+    """Get or create the lexical index instance."""
+    global _INDEX
+    if _INDEX is None:
+        is_new = not os.path.exists(LEXICAL_INDEX_PATH)
+        # Checked before the index creates the directory it lives in
+        has_store = os.path.exists(VECTOR_STORE_DIR)
+        index = LexicalIndex()
+        if is_new and has_store:
+            index.rebuild_from_store(get_vectordb())
+        _INDEX = index
+    return _INDEX
+
+
+def reset_lexical_index():
+    """Empty the lexical index, or delete it if it was never opened."""
+    if _INDEX is not None:
+        _INDEX.recreate()
+    elif os.path.exists(LEXICAL_INDEX_PATH):
+        os.remove(LEXICAL_INDEX_PATH)
@@ -1,23 +1,44 @@
 """FastAPI application for LangChain document Q&A system."""
 
 import argparse
+import json
 import logging
 import os
 import shutil
+import time
 from contextlib import asynccontextmanager
-from typing import Set
+from functools import partial
+from typing import List, Literal, Optional, Set
 
-from fastapi import (FastAPI, File, HTTPException, Request, UploadFile,
-                     WebSocket, WebSocketDisconnect)
+from fastapi import (FastAPI, HTTPException, Query, Request, WebSocket,
+                     WebSocketDisconnect)
+from fastapi.encoders import jsonable_encoder
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from langchain.globals import set_llm_cache
-from pydantic import BaseModel
-
-from app.ingest import ingest_single_file
-from app.qa_chain import answer_question
-from app.vector_store import get_vectordb
+from fastapi.responses import (JSONResponse, PlainTextResponse,
+                               StreamingResponse)
+from langchain_core.globals import set_llm_cache
+from pydantic import BaseModel, Field, ValidationError, model_validator
+
+from app import archives, uploads
+from app.answer_cache import answer_cache, semantic_cache
+from app.archives import (ARCHIVE_TYPES, ArchiveError, ingest_members,
+                          stage_members, summarize)
+from app.concurrency import (SingleFlight, limiter, run_in_thread, run_limited,
+                             shutdown_executor)
+from app.embedding_cache import get_embedding_cache
+from app.ingest import delete_file
+from app.jobs import JobQueue, QueueFullError
+from app.lexical_index import get_lexical_index, reset_lexical_index
+from app.manifest import DuplicateFilter, get_manifest, reset_manifest
+from app.metrics import ServerTimingMiddleware, observe, render
+from app.pipeline import DEFAULT_WORKERS
+from app.qa_chain import (aanswer_batch, aanswer_question, ashutdown,
+                          astream_answer, llm_calls, warm_up)
+from app.uploads import UploadError, receive_upload
+from app.utils.load_env import get_env
+from app.vector_store import (cleanup, corpus_version, exists, get_manager,
+                              get_vectordb)
 
 set_llm_cache(None)
 
@@ -26,6 +47,12 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Create model clients and open stores at startup rather than on first use;
+# set WARM_START=0 for faster restarts when first-request latency matters less
+WARM_START = get_env("WARM_START", "1") == "1"
+# Parser processes for /upload/archive; 0 parses inside the server process
+ARCHIVE_PARSE_WORKERS = int(get_env("ARCHIVE_PARSE_WORKERS", str(DEFAULT_WORKERS)))
+
 # Parse CLI arguments
 parser = argparse.ArgumentParser()
 parser.add_argument(
@@ -34,10 +61,11 @@ parser.add_argument(
 args, _ = parser.parse_known_args()
 
 if args.fresh_start:
-    VECTOR_STORE_DIR = "vector_store"
-    if os.path.exists(VECTOR_STORE_DIR):
-        shutil.rmtree(VECTOR_STORE_DIR)
+    if exists():
+        cleanup()
         logger.info("🧹 Fresh start: Deleted vector store directory.")
+    reset_manifest()
+    reset_lexical_index()
 
 
 @asynccontextmanager
@@ -50,8 +78,15 @@ async def lifespan(_app: FastAPI):
     if os.path.exists(reload_trigger):
         os.remove(reload_trigger)
 
-    get_vectordb()
+    if WARM_START:
+        started = time.perf_counter()
+        await run_in_thread(warm_up)
+        logger.info("Clients warmed up in %.2fs.", time.perf_counter() - started)
+    await job_queue.start()
     yield
+    await job_queue.stop()
+    shutdown_executor()
+    await ashutdown()
 
 
 app = FastAPI(lifespan=lifespan)
@@ -63,20 +98,92 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
+app.add_middleware(ServerTimingMiddleware)
+
+
+# Largest number of questions accepted by /ask/batch
+ASK_BATCH_MAX = 256
+
+
+class RetrievalSettings(BaseModel):
+    """Retrieval settings shared by the question answering requests."""
+
+    k: int = 4
+    # "lexical" answers from the keyword index without embedding the question
+    mode: Literal["vector", "hybrid", "lexical"] = "vector"
+    # Optional vector and hybrid retrieval tuning; see qa_chain.get_docs_with_scores
+    fetch_k: Optional[int] = Field(None, ge=1, le=200)
+    mmr_lambda: Optional[float] = Field(None, ge=0, le=1)
+    score_threshold: Optional[float] = Field(None, ge=-1, le=1)
+
+    @model_validator(mode="after")
+    def _tuning_needs_vectors(self):
+        # Keyword search has no embeddings to gather, rerank or threshold
+        if self.mode == "lexical" and self.retrieval_options():
+            raise ValueError(
+                "fetch_k, mmr_lambda and score_threshold only apply to vector and "
+                "hybrid modes."
+            )
+        return self
+
+    def retrieval_options(self) -> dict:
+        """Return the retrieval options that were set on the request."""
+        options = {
+            "fetch_k": self.fetch_k,
+            "mmr_lambda": self.mmr_lambda,
+            "score_threshold": self.score_threshold,
+        }
+        return {name: value for name, value in options.items() if value is not None}
 
 
-class QuestionRequest(BaseModel):
+class QuestionRequest(RetrievalSettings):
     """Request model for question answering."""
 
     question: str
-    k: int = 4
 
 
+class BatchQuestionRequest(RetrievalSettings):
+    """Request model for answering several questions at once."""
+
+    questions: List[str] = Field(..., min_length=1, max_length=ASK_BATCH_MAX)
+
+
+# Identical concurrent questions share one retrieval and LLM call
+ask_flight = SingleFlight()
+
 # Store active WebSocket connections
 active_connections: Set[WebSocket] = set()
 
 
+async def broadcast(message: dict):
+    """Send a message to every connected /ws/files client."""
+    for connection in list(active_connections):
+        try:
+            await connection.send_json(message)
+        except Exception as e:
+            logger.error("Error sending update to WebSocket client: %s", str(e))
+
+
+async def notify_job_event(event: dict):
+    """Forward ingestion job events to WebSocket clients."""
+    await broadcast(event)
+    job = event["job"]
+    if event["type"] == "job_completed":
+        logger.info(
+            "%s chunks ingested from '%s'.",
+            job["result"]["chunks_added"],
+            job["filename"],
+        )
+        await broadcast({"type": "file_updated", "files": os.listdir(uploads.UPLOAD_DIR)})
+    elif event["type"] == "job_failed":
+        logger.error("Ingestion failed for '%s': %s", job["filename"], job["error"])
+
+
+job_queue = JobQueue(notify=notify_job_event)
+
+
 @app.websocket("/ws/files")
 async def websocket_endpoint(websocket: WebSocket):
     """Establish a WebSocket connection for file updates."""
@@ -87,7 +194,7 @@ async def websocket_endpoint(websocket: WebSocket):
             # Wait for any message (we don't actually need to process it)
             await websocket.receive_text()
     except WebSocketDisconnect:
-        active_connections.remove(websocket)
+        active_connections.discard(websocket)
 
 
 @app.exception_handler(RequestValidationError)
@@ -96,10 +203,21 @@ async def validation_exception_handler(_request: Request, exc: RequestValidation
     logger.warning("Validation error: %s", exc)
     return JSONResponse(
         status_code=422,
-        content={"error": "Invalid input", "details": exc.errors()},
+        # Errors from model validators carry the raised exception in their context
+        content={"error": "Invalid input", "details": jsonable_encoder(exc.errors())},
     )
 
 
+async def _answer(payload: QuestionRequest) -> dict:
+    async with limiter("qa"):
+        return await aanswer_question(
+            payload.question,
+            payload.k,
+            mode=payload.mode,
+            **payload.retrieval_options(),
+        )
+
+
 @app.post("/ask")
 async def ask_question(payload: QuestionRequest):
     """Answer a question based on ingested documents."""
@@ -108,7 +226,16 @@ async def ask_question(payload: QuestionRequest):
 
     logger.info("Received question: %s with k=%s", payload.question, payload.k)
     try:
-        response = answer_question(payload.question, payload.k)
+        # Same key as the answer cache: a request made after the corpus changed
+        # must not join a call that is answering from the old corpus
+        key = answer_cache.make_key(
+            payload.question,
+            payload.k,
+            corpus_version(),
+            mode=payload.mode,
+            **payload.retrieval_options(),
+        )
+        response = await ask_flight.run(key, lambda: _answer(payload))
         logger.info("Answer generated successfully.")
         return response
     except Exception as e:
@@ -119,6 +246,129 @@ async def ask_question(payload: QuestionRequest):
         ) from e
 
 
+@app.post("/ask/batch")
+async def ask_batch(payload: BatchQuestionRequest):
+    """Answer a list of questions with one embeddings call and one vector query.
+
+    Results come back in the order of the questions; an item that fails
+    carries its own ``error`` instead of failing the whole batch.
+    """
+    logger.info(
+        "Received batch of %s questions with k=%s", len(payload.questions), payload.k
+    )
+    try:
+        results = await aanswer_batch(
+            payload.questions,
+            payload.k,
+            mode=payload.mode,
+            **payload.retrieval_options(),
+        )
+        logger.info("Batch answered successfully.")
+        return {"results": results}
+    except Exception as e:
+        logger.error("Error processing question batch: %s", str(e))
+        raise HTTPException(
+            status_code=500,
+            detail="Something went wrong while processing the questions.",
+        ) from e
+
+
+async def _timed_answer_events(payload: QuestionRequest):
+    """Stream answer events, stamping time-to-first-byte and first-token timings."""
+    start = time.perf_counter()
+    first_token_ms = None
+    try:
+        async with limiter("qa"):
+            async for event in astream_answer(
+                payload.question,
+                payload.k,
+                mode=payload.mode,
+                **payload.retrieval_options(),
+            ):
+                elapsed_ms = round((time.perf_counter() - start) * 1000, 1)
+                if event["type"] == "sources":
+                    logger.info("Streaming /ask time to first byte: %sms", elapsed_ms)
+                    event = {**event, "ttfb_ms": elapsed_ms}
+                elif event["type"] == "token" and first_token_ms is None:
+                    first_token_ms = elapsed_ms
+                    observe("ttft", time.perf_counter() - start)
+                elif event["type"] == "done":
+                    event = {
+                        **event,
+                        "first_token_ms": first_token_ms,
+                        "total_ms": elapsed_ms,
+                    }
+                yield event
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        logger.error("Error streaming answer: %s", str(e))
+        yield {
+            "type": "error",
+            "detail": "Something went wrong while processing the question.",
+        }
+
+
+def _encode_sse(event: dict) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+
+def _encode_ndjson(event: dict) -> str:
+    return json.dumps(event) + "\n"
+
+
+@app.post("/ask/stream")
+async def ask_question_stream(
+    payload: QuestionRequest, stream_format: str = Query("sse", alias="format")
+):
+    """Stream sources and then answer tokens as Server-Sent Events or JSON lines."""
+    if not payload.question.strip():
+        raise HTTPException(status_code=400, detail="Question cannot be empty.")
+    if stream_format not in ("sse", "ndjson"):
+        raise HTTPException(status_code=400, detail="Format must be 'sse' or 'ndjson'.")
+
+    logger.info("Streaming question: %s with k=%s", payload.question, payload.k)
+    encode = _encode_sse if stream_format == "sse" else _encode_ndjson
+    media_type = (
+        "text/event-stream" if stream_format == "sse" else "application/x-ndjson"
+    )
+
+    async def body():
+        async for event in _timed_answer_events(payload):
+            yield encode(event)
+
+    return StreamingResponse(
+        body(), media_type=media_type, headers={"Cache-Control": "no-cache"}
+    )
+
+
+@app.websocket("/ws/ask")
+async def ask_websocket(websocket: WebSocket):
+    """Answer questions over a WebSocket, streaming the same events as /ask/stream."""
+    await websocket.accept()
+    try:
+        while True:
+            message = await websocket.receive_json()
+            try:
+                payload = QuestionRequest.model_validate(message)
+            except ValidationError as e:
+                await websocket.send_json(
+                    {
+                        "type": "error",
+                        "detail": "Invalid input",
+                        "errors": e.errors(include_context=False),
+                    }
+                )
+                continue
+            if not payload.question.strip():
+                await websocket.send_json(
+                    {"type": "error", "detail": "Question cannot be empty."}
+                )
+                continue
+            async for event in _timed_answer_events(payload):
+                await websocket.send_json(event)
+    except WebSocketDisconnect:
+        pass
+
+
 @app.get("/health")
 async def health_check():
     """Check application health status."""
@@ -131,10 +381,21 @@ async def status_check():
     """Check the status of the vector store."""
     try:
         vectordb = get_vectordb()
-        count = vectordb._collection.count()
+        count = await run_limited("io", vectordb._collection.count)
+        lexical_count = await run_limited("io", lambda: get_lexical_index().count())
         files = os.listdir("uploaded_docs") if os.path.exists("uploaded_docs") else []
         logger.info("Vector store contains %s documents.", count)
-        return {"status": "ready", "documents_indexed": count, "uploaded_files": files}
+        return {
+            "status": "ready",
+            "documents_indexed": count,
+            "lexical_chunks_indexed": lexical_count,
+            "uploaded_files": files,
+            "embedding_cache": get_embedding_cache().stats(),
+            "answer_cache": answer_cache.stats(),
+            "semantic_cache": semantic_cache.stats(),
+            "ask_coalescing": ask_flight.stats(),
+            "llm_calls": llm_calls.stats(),
+        }
     except Exception as e:
         logger.error("Error checking status: %s", str(e))
         raise HTTPException(
@@ -142,60 +403,126 @@ async def status_check():
         ) from e
 
 
-@app.post("/upload")
-async def upload_file(file: UploadFile = File(...)):
-    """Upload and process a document file."""
-    try:
-        # ✅ Allow .pdf, .txt, .md only
-        allowed_extensions = [".pdf", ".txt", ".md"]
-        ext = os.path.splitext(file.filename)[1].lower()
-        if ext not in allowed_extensions:
-            raise HTTPException(
-                status_code=400,
-                detail="Only PDF, TXT, and Markdown files are supported.",
+def _metric_samples() -> list:
+    llm = llm_calls.stats()
+    samples = [
+        (
+            "docqa_job_queue_depth",
+            "gauge",
+            "Ingestion jobs waiting for a worker.",
+            job_queue.queued,
+        ),
+        ("docqa_llm_calls_total", "counter", "Answers that called the LLM.", llm["calls"]),
+        ("docqa_llm_skipped_total", "counter", "Answers that skipped the LLM.", llm["skipped"]),
+        (
+            "docqa_ask_collapsed_total",
+            "counter",
+            "Identical /ask requests served by another in-flight request.",
+            ask_flight.stats()["collapsed"],
+        ),
+    ]
+    caches = {
+        "answer": answer_cache.stats(),
+        "semantic": semantic_cache.stats(),
+        "embedding": get_embedding_cache().stats(),
+    }
+    for name, stats in caches.items():
+        for outcome in ("hits", "misses"):
+            samples.append(
+                (
+                    f"docqa_{name}_cache_{outcome}_total",
+                    "counter",
+                    f"{name.capitalize()} cache {outcome}.",
+                    stats[outcome],
+                )
             )
+    return samples
 
-        upload_dir = "uploaded_docs"
-        os.makedirs(upload_dir, exist_ok=True)
-
-        file_path = os.path.join(upload_dir, file.filename)
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
 
-        logger.info("File '%s' uploaded successfully.", file.filename)
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Expose stage latencies and counters in Prometheus text format."""
+    return PlainTextResponse(
+        render(_metric_samples()), media_type="text/plain; version=0.0.4"
+    )
 
-        # Ingest the uploaded file
-        result = ingest_single_file(file_path)
 
-        if result == "duplicate":
-            return {
-                "message": (
-                    f"File '{file.filename}' already exists in the vector store."
-                    "Skipping ingestion."
-                )
+# Upload endpoints parse their multipart body themselves; describe it for /docs
+FILE_UPLOAD_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["file"],
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                }
             }
+        },
+    }
+}
 
-        if isinstance(result, dict):
-            logger.info(
-                "%s chunks ingested from '%s'.", result["chunks_added"], file.filename
-            )
-            # Notify WebSocket clients
-            for connection in active_connections:
-                try:
-                    await connection.send_json(
-                        {"type": "file_updated", "files": os.listdir(upload_dir)}
+
+@app.post("/upload", status_code=202, openapi_extra=FILE_UPLOAD_BODY)
+async def upload_file(request: Request, update: bool = Query(False)):
+    """Upload a document file and queue it for ingestion.
+
+    The file is streamed to a staging file while it is hashed, so a
+    duplicate is rejected before it is parsed and an oversize file is cut
+    off as soon as it passes MAX_UPLOAD_BYTES. Accepted files are moved
+    into uploaded_docs atomically.
+
+    With ?update=true a new version of an already ingested file replaces
+    it, re-embedding only the chunks that changed.
+    """
+    try:
+        try:
+            upload = await receive_upload(request)
+        except UploadError as e:
+            raise HTTPException(status_code=e.status_code, detail=e.detail) from e
+        filename, sha256 = upload.filename, upload.sha256
+
+        # Duplicates are rejected before anything is moved into place or parsed.
+        # The first call may rebuild the manifest from the store, so it runs
+        # off the event loop like the other store calls.
+        manifest = await run_limited("io", get_manifest)
+        if manifest.find_duplicate(
+            filename, sha256, update=update
+        ) or job_queue.find_active(filename, sha256):
+            await run_limited("io", upload.discard)
+            return JSONResponse(
+                status_code=200,
+                content={
+                    "message": (
+                        f"File '{filename}' already exists in the vector store."
+                        "Skipping ingestion."
                     )
-                except Exception as e:
-                    logger.error("Error sending update to WebSocket client: %s", str(e))
+                },
+            )
 
-            return {
-                "message": (
-                    f"Successfully uploaded '{file.filename}' with {result['chunks_added']} chunks."
-                )
-            }
+        file_path = await run_limited("io", upload.commit)
+        logger.info("File '%s' uploaded successfully (%s bytes).", filename, upload.size)
+
+        try:
+            job = job_queue.submit(file_path, filename, sha256, update=update)
+        except QueueFullError as e:
+            # An update overwrote the stored version; the manifest still holds
+            # the old hash, so a retry re-ingests it
+            if not update:
+                os.remove(file_path)
+            logger.warning("Ingestion queue full; rejecting '%s'.", filename)
+            raise HTTPException(
+                status_code=503,
+                detail="Ingestion queue is full. Please retry shortly.",
+                headers={"Retry-After": "5"},
+            ) from e
 
-        logger.error("Error uploading file: ingestion failed for '%s'", file.filename)
-        raise HTTPException(status_code=500, detail="Failed to process file.")
+        return {
+            "message": f"File '{filename}' queued for ingestion.",
+            "job_id": job.id,
+            "status": job.status,
+        }
 
     except HTTPException as http_exc:
         raise http_exc  # Let FastAPI handle this cleanly
@@ -207,38 +534,148 @@ async def upload_file(file: UploadFile = File(...)):
         ) from e
 
 
+@app.post("/upload/archive", status_code=202, openapi_extra=FILE_UPLOAD_BODY)
+async def upload_archive(request: Request):
+    """Upload a zip or tar archive of documents and queue them as one ingestion job.
+
+    Supported members are read out of the archive one at a time and hashed
+    as they are staged, so duplicates and name conflicts are dropped before
+    anything reaches uploaded_docs. The rest go through the batched bulk
+    pipeline together in a single job, and clients get one file_updated
+    event when it finishes.
+
+    The job's result, at /jobs/{job_id}, has a summary entry for every
+    document in archive order. If nothing is left to ingest, the summary
+    is returned straight away instead.
+    """
+    try:
+        try:
+            archive = await receive_upload(
+                request, max_bytes=archives.MAX_ARCHIVE_BYTES, file_types=ARCHIVE_TYPES
+            )
+        except UploadError as e:
+            raise HTTPException(status_code=e.status_code, detail=e.detail) from e
+
+        try:
+            staged, entries = await run_limited(
+                "io", stage_members, archive.temp_path, archive.filename
+            )
+        except UploadError as e:
+            raise HTTPException(status_code=e.status_code, detail=e.detail) from e
+        except ArchiveError as e:
+            raise HTTPException(status_code=400, detail=str(e)) from e
+        finally:
+            await run_limited("io", archive.discard)
+
+        accepted = []
+        try:
+            duplicates = DuplicateFilter(await run_limited("io", get_manifest))
+            for member in staged:
+                upload = member.upload
+                status, other = duplicates.check(upload.filename, upload.sha256)
+                if status == "new" and job_queue.find_active(upload.filename, upload.sha256):
+                    status, other = "duplicate", upload.filename
+                if status == "duplicate":
+                    entries.append(member.entry(status, duplicate_of=other))
+                elif status == "conflict":
+                    reason = (
+                        f"a different file named '{other}' is already stored"
+                        if duplicates.manifest.get(other) is not None
+                        else "another member of this archive has the same name"
+                    )
+                    entries.append(member.entry(status, reason=reason))
+                else:
+                    accepted.append(member)
+            for member in accepted:
+                member.file_path = await run_limited("io", member.upload.commit)
+        finally:
+            # Committed files have moved; this only removes the rest
+            for member in staged:
+                await run_limited("io", member.upload.discard)
+
+        if not accepted:
+            files, counts = summarize(entries)
+            return JSONResponse(
+                status_code=200,
+                content={
+                    "message": f"No new documents to ingest in '{archive.filename}'.",
+                    "counts": counts,
+                    "files": files,
+                },
+            )
+
+        try:
+            job = job_queue.submit_bulk(
+                archive.filename,
+                [(member.upload.filename, member.upload.sha256) for member in accepted],
+                partial(
+                    ingest_members,
+                    archive.filename,
+                    accepted,
+                    entries,
+                    ARCHIVE_PARSE_WORKERS,
+                ),
+            )
+        except QueueFullError as e:
+            for member in accepted:
+                await run_limited("io", os.remove, member.file_path)
+            logger.warning("Ingestion queue full; rejecting '%s'.", archive.filename)
+            raise HTTPException(
+                status_code=503,
+                detail="Ingestion queue is full. Please retry shortly.",
+                headers={"Retry-After": "5"},
+            ) from e
+
+        logger.info(
+            "Archive '%s' queued: %s documents to ingest.", archive.filename, len(accepted)
+        )
+        return {
+            "message": (
+                f"{len(accepted)} files from '{archive.filename}' queued for ingestion."
+            ),
+            "job_id": job.id,
+            "status": job.status,
+        }
+
+    except HTTPException as http_exc:
+        raise http_exc
+
+    except Exception as e:
+        logger.error("Error ingesting archive: %s", str(e))
+        raise HTTPException(
+            status_code=500, detail="Something went wrong while ingesting the archive."
+        ) from e
+
+
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    """Report the status and progress of an ingestion job."""
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return job.to_dict()
+
+
 @app.post("/fresh-start")
 async def fresh_start():
     """Reset the vector store to a fresh state."""
     try:
-        # Delete vector store and uploaded files
-        vector_store_dir = "vector_store"
-        if os.path.exists(vector_store_dir):
-            shutil.rmtree(vector_store_dir)
-            logger.info("🧹 Deleted vector store directory.")
+        # Swap in an empty vector store and delete uploaded files
+        generation = await run_limited("io", get_manager().reset)
+        logger.info("🧹 Reset vector store (generation %s).", generation)
+        reset_manifest()
+        reset_lexical_index()
 
         upload_dir = "uploaded_docs"
         if os.path.exists(upload_dir):
-            shutil.rmtree(upload_dir)
+            await run_limited("io", shutil.rmtree, upload_dir)
             logger.info("🗑️ Deleted uploaded files directory.")
 
         # Notify all connected clients about the change
-        for connection in active_connections:
-            try:
-                await connection.send_json({"type": "files_cleared"})
-            except Exception as e:
-                logger.error("Error sending update to WebSocket client: %s", str(e))
+        await broadcast({"type": "files_cleared"})
 
         return {
-            "message": (
-                "All files have been deleted."
-                "Please manually restart both the backend and frontend servers."
-            ),
-            "instructions": (
-                "1. Stop the backend server (Ctrl+C)\n"
-                "2. Stop the frontend server (Ctrl+C)\n"
-                "3. Restart both servers"
-            ),
+            "message": "All files have been deleted and the vector store is empty.",
         }
     except Exception as e:
         logger.error("Error during fresh start: %s", str(e))
@@ -248,6 +685,45 @@ async def fresh_start():
         ) from e
 
 
+@app.delete("/files/{filename}")
+async def delete_uploaded_file(filename: str):
+    """Delete one file and its chunks without rebuilding the vector store."""
+    if os.path.basename(filename) != filename or filename in ("", ".", ".."):
+        raise HTTPException(status_code=400, detail="Invalid filename.")
+    if job_queue.find_active(filename, None):
+        raise HTTPException(
+            status_code=409, detail=f"File '{filename}' is still being ingested."
+        )
+
+    upload_dir = "uploaded_docs"
+    file_path = os.path.join(upload_dir, filename)
+    # Unknown names are answered from the manifest and the upload directory
+    # alone, without opening the vector store or its embeddings client
+    manifest = await run_limited("io", get_manifest)
+    if manifest.get(filename) is None and not os.path.isfile(file_path):
+        raise HTTPException(status_code=404, detail="File not found.")
+
+    try:
+        removed = await run_limited("io", delete_file, filename)
+        if os.path.isfile(file_path):
+            await run_limited("io", os.remove, file_path)
+
+        logger.info("🗑️ Deleted '%s' and %s chunks.", filename, removed)
+        files = os.listdir(upload_dir) if os.path.exists(upload_dir) else []
+        await broadcast({"type": "file_updated", "files": files, "deleted": filename})
+
+        return {
+            "message": f"File '{filename}' has been deleted.",
+            "chunks_removed": removed,
+        }
+    except Exception as e:
+        logger.error("Error deleting file: %s", str(e))
+        raise HTTPException(
+            status_code=500,
+            detail="Something went wrong while deleting the file.",
+        ) from e
+
+
 @app.get("/files")
 async def list_uploaded_files():
     """List all files currently in the vector store."""
@@ -0,0 +1,284 @@
+"""Persistent manifest of ingested files for O(1) duplicate detection."""
+
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime, timezone
+
+from app.vector_store import (VECTOR_STORE_DIR, bump_corpus_version,
+                              get_vectordb)
+
+# Inside the store directory, so wiping the store never leaves a stale manifest
+MANIFEST_PATH = os.path.join(VECTOR_STORE_DIR, "manifest.json")
+CHECKPOINT_PATH = "ingest_checkpoint.jsonl"
+HASH_BLOCK_SIZE = 1024 * 1024
+
+_MANIFEST = None  # Global singleton
+
+
+def file_sha256(file_path: str) -> str:
+    """Compute the SHA-256 digest of a file without reading it all into memory.
+
+    Args:
+        file_path: Path to the file to hash
+
+    Returns:
+        The hex-encoded SHA-256 digest of the file contents
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class IngestManifest:
+    """Index of ingested files keyed by filename and by content hash.
+
+    Each entry records the SHA-256 of the file bytes, the Chroma chunk IDs
+    written for it and the time it was ingested. The manifest lives next to
+    the vector store so duplicate checks never need an embedding round trip.
+    """
+
+    def __init__(self, path: str = MANIFEST_PATH):
+        self.path = path
+        self._lock = threading.RLock()
+        self._files = {}
+        self._by_hash = {}
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        self._files = data.get("files", {})
+        self._by_hash = {
+            entry["sha256"]: name
+            for name, entry in self._files.items()
+            if entry.get("sha256")
+        }
+
+    def save(self):
+        """Atomically write the manifest to disk."""
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"files": self._files}, f, indent=2)
+            os.replace(tmp_path, self.path)
+
+    def get(self, filename: str) -> dict:
+        """Return the manifest entry for a filename, or None."""
+        with self._lock:
+            return self._files.get(filename)
+
+    def find_by_hash(self, sha256: str) -> str:
+        """Return the filename already ingested with this content hash, or None."""
+        with self._lock:
+            return self._by_hash.get(sha256)
+
+    def find_duplicate(self, filename: str, sha256: str, update: bool = False) -> str:
+        """Return the name of an ingested file matching by name or content, or None.
+
+        With update=True an existing file of the same name is not a duplicate
+        unless its content is unchanged, so it can be re-ingested in place.
+        """
+        with self._lock:
+            if filename in self._files and not update:
+                return filename
+            return self._by_hash.get(sha256)
+
+    def record(self, filename: str, sha256: str, chunk_ids: list, save: bool = True):
+        """Record a successfully ingested file and persist the manifest.
+
+        Args:
+            filename: Name the file was ingested under
+            sha256: Hex digest of the file contents
+            chunk_ids: IDs of the chunks written to the vector store
+            save: Write the manifest to disk now; bulk runs that keep an
+                IngestCheckpoint save once at the end instead
+        """
+        with self._lock:
+            previous = self._files.get(filename)
+            if previous and previous.get("sha256"):
+                self._by_hash.pop(previous["sha256"], None)
+            self._files[filename] = {
+                "sha256": sha256,
+                "chunk_ids": list(chunk_ids),
+                "ingested_at": datetime.now(timezone.utc).isoformat(),
+            }
+            if sha256:
+                self._by_hash[sha256] = filename
+            if save:
+                self.save()
+            bump_corpus_version()
+
+    def remove(self, filename: str) -> dict:
+        """Remove a file from the manifest and return its entry, or None."""
+        with self._lock:
+            entry = self._files.pop(filename, None)
+            if entry is None:
+                return None
+            if entry.get("sha256"):
+                self._by_hash.pop(entry["sha256"], None)
+            self.save()
+            bump_corpus_version()
+            return entry
+
+    def clear(self):
+        """Forget every file and delete the manifest from disk."""
+        with self._lock:
+            self._files = {}
+            self._by_hash = {}
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            bump_corpus_version()
+
+    def filenames(self) -> list:
+        """Return the names of all ingested files."""
+        with self._lock:
+            return list(self._files)
+
+    def rebuild_from_store(self, vectordb, upload_dir: str = "uploaded_docs"):
+        """Seed the manifest from chunk metadata in an existing vector store.
+
+        Stores created before the manifest existed would otherwise have every
+        file re-ingested. Reading IDs and metadata is a local Chroma call and
+        does not hit the embeddings API.
+        """
+        with self._lock:
+            stored = vectordb.get(include=["metadatas"])
+            ids_by_source = {}
+            for chunk_id, metadata in zip(stored["ids"], stored["metadatas"]):
+                source = (metadata or {}).get("source")
+                if source:
+                    ids_by_source.setdefault(source, []).append(chunk_id)
+
+            for source, chunk_ids in ids_by_source.items():
+                uploaded = os.path.join(upload_dir, source)
+                sha256 = file_sha256(uploaded) if os.path.isfile(uploaded) else None
+                self._files[source] = {
+                    "sha256": sha256,
+                    "chunk_ids": chunk_ids,
+                    "ingested_at": None,
+                }
+                if sha256:
+                    self._by_hash[sha256] = source
+            self.save()
+
+
+class DuplicateFilter:
+    """Sorts the files of one batch into new files, duplicates and name conflicts.
+
+    Files are stored under their base names, so two different files with
+    the same name cannot both be kept. A file whose content is already
+    stored, or was seen earlier in the batch, is a duplicate. A different
+    file under a name that is already taken is a conflict: skipping it as a
+    duplicate would silently drop its content.
+    """
+
+    def __init__(self, manifest: IngestManifest):
+        self.manifest = manifest
+        self._names = set()
+        self._hashes = {}
+
+    def check(self, filename: str, sha256: str) -> tuple:
+        """Classify one file; a new file's name and content are reserved for it.
+
+        Returns:
+            A (status, other) tuple: ("new", None), ("duplicate", name of
+            the file with the same content) or ("conflict", filename)
+        """
+        other = self.manifest.find_by_hash(sha256) or self._hashes.get(sha256)
+        if other is not None:
+            return "duplicate", other
+        entry = self.manifest.get(filename)
+        if filename in self._names or (entry is not None and entry.get("sha256")):
+            return "conflict", filename
+        if entry is not None:
+            # Rebuilt from a store that predates content hashes; assume unchanged
+            return "duplicate", filename
+        self._names.add(filename)
+        self._hashes[sha256] = filename
+        return "new", None
+
+
+class IngestCheckpoint:
+    """Append-only log of the files finished during a bulk ingestion run.
+
+    Saving the manifest rewrites every entry, which makes recording files
+    one by one quadratic over a large run. A bulk run appends each finished
+    file here instead and saves the manifest once at the end. If the
+    process dies first, the next run replays the log into the manifest, so
+    files that were already stored are skipped rather than re-embedded.
+    """
+
+    def __init__(self, path: str = CHECKPOINT_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = None
+
+    def replay(self, manifest: IngestManifest) -> int:
+        """Record the files of an interrupted run in the manifest.
+
+        Returns:
+            The number of files recovered
+        """
+        if not os.path.exists(self.path):
+            return 0
+        recovered = 0
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Torn last line from the crash
+                manifest.record(entry["filename"], entry["sha256"], entry["chunk_ids"], save=False)
+                recovered += 1
+        manifest.save()
+        self.clear()
+        return recovered
+
+    def append(self, filename: str, sha256: str, chunk_ids: list):
+        """Durably note that a file has been fully written to the store."""
+        line = json.dumps({"filename": filename, "sha256": sha256, "chunk_ids": chunk_ids})
+        with self._lock:
+            if self._file is None:
+                # pylint: disable-next=consider-using-with
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def clear(self):
+        """Close and delete the log once the manifest holds its entries."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+
+def get_manifest() -> IngestManifest:
+    """Get or create the ingest manifest instance."""
+    global _MANIFEST
+    if _MANIFEST is None:
+        manifest = IngestManifest()
+        if not os.path.exists(manifest.path) and os.path.exists(VECTOR_STORE_DIR):
+            manifest.rebuild_from_store(get_vectordb())
+        _MANIFEST = manifest
+    return _MANIFEST
+
+
+def reset_manifest():
+    """Delete the manifest and drop the cached instance."""
+    global _MANIFEST
+    if _MANIFEST is not None:
+        _MANIFEST.clear()
+    else:
+        if os.path.exists(MANIFEST_PATH):
+            os.remove(MANIFEST_PATH)
+        bump_corpus_version()
+    _MANIFEST = None
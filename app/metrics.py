@@ -0,0 +1,176 @@
+"""In-process latency histograms, counters and the Server-Timing header."""
+
+import contextvars
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Upper bounds in seconds, from a fast local lookup to a slow LLM call
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+# Stage durations of the request being handled, for its Server-Timing header
+_request_timings = contextvars.ContextVar("request_timings", default=None)
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{name}="{value}"' for name, value in labels.items())
+    return "{" + pairs + "}"
+
+
+class Histogram:
+    """Cumulative histogram with one series per value of a single label."""
+
+    def __init__(self, name: str, documentation: str, label: str, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.label = label
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label_value: str, seconds: float):
+        """Record one observation for a label value."""
+        with self._lock:
+            series = self._series.setdefault(
+                label_value, {"counts": [0] * (len(self.buckets) + 1), "sum": 0.0}
+            )
+            series["counts"][bisect_left(self.buckets, seconds)] += 1
+            series["sum"] += seconds
+
+    def snapshot(self) -> dict:
+        """Return the observation count and total seconds per label value."""
+        with self._lock:
+            return {
+                value: {"count": sum(series["counts"]), "sum": series["sum"]}
+                for value, series in self._series.items()
+            }
+
+    def render(self) -> list:
+        """Return the histogram in Prometheus text exposition format."""
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self._lock:
+            for value, series in sorted(self._series.items()):
+                cumulative = 0
+                bounds = [str(bound) for bound in self.buckets] + ["+Inf"]
+                for bound, count in zip(bounds, series["counts"]):
+                    cumulative += count
+                    labels = _format_labels({self.label: value, "le": bound})
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = _format_labels({self.label: value})
+                lines.append(f"{self.name}_sum{labels} {series['sum']:.6f}")
+                lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Counter:
+    """Monotonic counter."""
+
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1):
+        """Increase the counter."""
+        with self._lock:
+            self.value += amount
+
+    def render(self) -> list:
+        """Return the counter in Prometheus text exposition format."""
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} counter",
+            f"{self.name} {self.value}",
+        ]
+
+
+STAGE_SECONDS = Histogram(
+    "docqa_stage_seconds", "Time spent in each ingestion and query stage.", "stage"
+)
+PROMPT_TOKENS = Counter("docqa_prompt_tokens_total", "Prompt tokens sent to the LLM.")
+EMBEDDED_CHUNKS = Counter(
+    "docqa_embedded_chunks_total", "Chunks sent for embedding during ingestion."
+)
+
+
+def observe(stage: str, seconds: float):
+    """Record a stage duration measured elsewhere, e.g. in a worker process."""
+    STAGE_SECONDS.observe(stage, seconds)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + seconds
+
+
+@contextmanager
+def timed(stage: str):
+    """Time the enclosed block as one observation of a stage."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage, time.perf_counter() - start)
+
+
+def render(samples: list) -> str:
+    """Render all metrics plus point-in-time samples as Prometheus text.
+
+    Args:
+        samples: (name, type, help, value) tuples for values owned by other
+            components, such as cache statistics and queue depth
+
+    Returns:
+        The metrics page
+    """
+    lines = STAGE_SECONDS.render() + PROMPT_TOKENS.render() + EMBEDDED_CHUNKS.render()
+    for name, kind, documentation, value in samples:
+        lines.append(f"# HELP {name} {documentation}")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.append(f"{name} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def _server_timing(timings: dict, total: float) -> bytes:
+    entries = [f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in timings.items()]
+    entries.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(entries).encode("latin-1")
+
+
+class ServerTimingMiddleware:  # pylint: disable=too-few-public-methods
+    """ASGI middleware adding a Server-Timing header with per-stage durations.
+
+    Streaming responses send headers before their body is produced, so
+    they only report the stages that finished before the first byte.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = {}
+        token = _request_timings.set(timings)
+        start = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                header = _server_timing(timings, time.perf_counter() - start)
+                message = {
+                    **message,
+                    "headers": [*message.get("headers", []), (b"server-timing", header)],
+                }
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_timings.reset(token)
@@ -0,0 +1,429 @@
+"""Pipelined bulk ingestion: parallel parsing, batched embedding and writes."""
+
+import itertools
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import (FIRST_COMPLETED, ProcessPoolExecutor,
+                                ThreadPoolExecutor, wait)
+from functools import partial
+from pathlib import Path
+
+from app.lexical_index import get_lexical_index
+from app.manifest import DuplicateFilter, file_sha256, get_manifest
+from app.metrics import EMBEDDED_CHUNKS, observe
+from app.utils.file_loader import (PAGE_WINDOW, load_document,
+                                   load_pdf_pages, make_chunk_ids,
+                                   pdf_metadata, pdf_page_count,
+                                   split_documents)
+from app.utils.tokens import estimate_tokens
+from app.vector_store import get_manager, get_vectordb
+
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+DEFAULT_BATCH_SIZE = 256
+DEFAULT_EMBED_CONCURRENCY = 4
+# OpenAI caps a single embeddings request at 300k tokens; stay well below it
+DEFAULT_MAX_BATCH_TOKENS = 100_000
+# Parsers are spawned rather than forked: forking the threaded API server
+# can hand a child locks that other threads were holding
+_PARSE_CONTEXT = multiprocessing.get_context("spawn")
+
+
+class PipelineStats:
+    """Per-stage item counts and busy time for a bulk ingestion run."""
+
+    STAGES = ("parse", "embed", "write")
+
+    def __init__(self):
+        self.items = {stage: 0 for stage in self.STAGES}
+        self.seconds = {stage: 0.0 for stage in self.STAGES}
+        self.started = time.perf_counter()
+        self.wall_seconds = 0.0
+
+    def add(self, stage: str, items: int, seconds: float):
+        """Record work done by one stage."""
+        self.items[stage] += items
+        self.seconds[stage] += seconds
+
+    def finish(self):
+        """Stop the wall clock for the run."""
+        self.wall_seconds = time.perf_counter() - self.started
+
+    def summary(self) -> dict:
+        """Return counts, busy time and throughput for every stage."""
+        stages = {}
+        for stage in self.STAGES:
+            busy = self.seconds[stage]
+            stages[stage] = {
+                "items": self.items[stage],
+                "busy_seconds": round(busy, 3),
+                "items_per_second": round(self.items[stage] / busy, 2) if busy else None,
+            }
+        return {"wall_seconds": round(self.wall_seconds, 3), "stages": stages}
+
+    def report(self) -> str:
+        """Format the summary as a human-readable block."""
+        lines = [f"Bulk ingestion finished in {self.wall_seconds:.2f}s"]
+        units = {"parse": "files", "embed": "chunks", "write": "chunks"}
+        for stage, data in self.summary()["stages"].items():
+            rate = data["items_per_second"]
+            lines.append(
+                f"  {stage:<6} {data['items']:>7} {units[stage]:<6} "
+                f"busy {data['busy_seconds']:>8.2f}s  "
+                f"{rate if rate is not None else '-':>8} {units[stage]}/s"
+            )
+        return "\n".join(lines)
+
+
+def parse_file(file_path: str, pages: tuple = None, metadata: dict = None) -> tuple:
+    """Load and split one file or page window; runs inside a worker process.
+
+    Args:
+        file_path: Path to the file to parse
+        pages: Optional (start, stop) range of PDF pages to parse instead
+            of the whole file
+        metadata: Document-level PDF metadata, required with pages
+
+    Returns:
+        A (chunks, parse_seconds, split_seconds) tuple with the split chunks
+        and the time spent loading and splitting them
+    """
+    start = time.perf_counter()
+    if pages is None:
+        document = load_document(file_path)
+    else:
+        document = load_pdf_pages(file_path, *pages, metadata)
+    loaded = time.perf_counter()
+    chunks = split_documents(document, Path(file_path).name)
+    return chunks, loaded - start, time.perf_counter() - loaded
+
+
+def page_windows(file_path: str, page_window: int = PAGE_WINDOW) -> list:
+    """Return the page ranges to parse a file in, or [None] for the whole file.
+
+    Only PDFs longer than one window are split, so their pages can be
+    parsed by several workers and no worker returns a whole manual at once.
+    """
+    if Path(file_path).suffix.lower() != ".pdf":
+        return [None]
+    total = pdf_page_count(file_path)
+    if total <= page_window:
+        return [None]
+    return [(start, min(start + page_window, total)) for start in range(0, total, page_window)]
+
+
+class _FileState:  # pylint: disable=too-few-public-methods
+    """Bookkeeping for a file whose chunks are spread across windows and batches."""
+
+    def __init__(self, filename: str, sha256: str, windows: int):
+        self.filename = filename
+        self.sha256 = sha256
+        # Chunk IDs per page window, kept in page order for the manifest
+        self.windows = [[] for _ in range(windows)]
+        self.unparsed = windows
+        self.pending = 0
+        self.failed = False
+
+    @property
+    def chunk_ids(self) -> list:
+        """IDs of every chunk parsed so far, in page order."""
+        return [chunk_id for window in self.windows for chunk_id in window]
+
+    @property
+    def done(self) -> bool:
+        """Whether every window is parsed and every chunk written."""
+        return not self.unparsed and not self.pending
+
+
+def _parse_unordered(pool, tasks, limit: int):
+    """Parse tasks in a pool, yielding (task, result getter) as they finish.
+
+    At most limit tasks are in flight, so parsed chunks never pile up
+    faster than the embedding stage takes them.
+    """
+    tasks = iter(tasks)
+    in_flight = {}
+    while True:
+        for task in itertools.islice(tasks, limit - len(in_flight)):
+            _, file_path, pages, metadata = task
+            in_flight[pool.submit(parse_file, file_path, pages, metadata)] = task
+        if not in_flight:
+            return
+        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+        for future in done:
+            yield in_flight.pop(future), future.result
+
+
+def _batches(chunks, batch_size: int, max_batch_tokens: int):
+    """Pack (chunk, chunk_id, state) entries into batches capped by count and tokens."""
+    batch, batch_tokens = [], 0
+    for entry in chunks:
+        tokens = estimate_tokens(entry[0].page_content)
+        if batch and (len(batch) >= batch_size or batch_tokens + tokens > max_batch_tokens):
+            yield batch
+            batch, batch_tokens = [], 0
+        batch.append(entry)
+        batch_tokens += tokens
+    if batch:
+        yield batch
+
+
+def _embed_batch(embeddings, batch: list) -> tuple:
+    start = time.perf_counter()
+    vectors = embeddings.embed_documents([chunk.page_content for chunk, _, _ in batch])
+    seconds = time.perf_counter() - start
+    observe("embed", seconds)
+    EMBEDDED_CHUNKS.inc(len(batch))
+    return batch, vectors, seconds
+
+
+class _BulkRun:
+    """State shared by the plan, parse, embed/write and finalize stages of ingest_bulk."""
+
+    def __init__(self, checkpoint=None, progress=None):
+        self.stats = PipelineStats()
+        self.manifest = get_manifest()
+        self.generation = get_manager().generation
+        self.vectordb = get_vectordb()
+        self.lexical = get_lexical_index()
+        self.checkpoint = checkpoint
+        self.report = progress or (lambda file_path, result: None)
+        self.results = {}
+        self.files = {}
+        self.states = []
+
+    @property
+    def current(self) -> bool:
+        """Whether the vector store is still the one the run started on."""
+        return get_manager().generation == self.generation
+
+    def plan(self, file_paths: list) -> list:
+        """Recover checkpointed files and drop duplicates and name conflicts.
+
+        Returns:
+            (file_path, filename, sha256) tuples of the files left to ingest
+        """
+        if self.checkpoint is not None:
+            recovered = self.checkpoint.replay(self.manifest)
+            if recovered:
+                print(f"Recovered {recovered} files from an interrupted run.")
+            # Without a manifest on disk the next start would rebuild it from the
+            # store and take files that were half written at a crash as finished
+            self.manifest.save()
+
+        todo = []
+        duplicates = DuplicateFilter(self.manifest)
+        for file_path in file_paths:
+            filename = Path(file_path).name
+            sha256 = file_sha256(file_path)
+            status, other = duplicates.check(filename, sha256)
+            if status == "duplicate":
+                print(f"File '{file_path}' has the same content as '{other}'. Skipping.")
+            elif status == "conflict":
+                print(
+                    f"File '{file_path}' differs from another file named '{filename}'"
+                    " that is already ingested. Skipping; rename it to ingest it."
+                )
+            else:
+                todo.append((file_path, filename, sha256))
+                continue
+            self.results[file_path] = status
+            self.report(file_path, status)
+        return todo
+
+    def fail(self, state: _FileState, error):
+        """Mark a file as failed and report it once."""
+        if not state.failed:
+            file_path = self.files[state.filename]
+            print(f"Failed to process {file_path}: {error}")
+            state.failed = True
+            self.results[file_path] = 0
+            self.report(file_path, 0)
+
+    def finish(self, state: _FileState):
+        """Record a file in the manifest once all of its chunks are written."""
+        if state.failed or not state.done:
+            return
+        if not self.current:
+            self.fail(state, "vector store was reset")
+            return
+        if self.checkpoint is None:
+            self.manifest.record(state.filename, state.sha256, state.chunk_ids)
+        else:
+            self.manifest.record(state.filename, state.sha256, state.chunk_ids, save=False)
+            self.checkpoint.append(state.filename, state.sha256, state.chunk_ids)
+        file_path = self.files[state.filename]
+        self.report(file_path, self.results[file_path])
+
+    def _tasks(self, todo: list, page_window: int):
+        # Page counts are read lazily, as the pool asks for more work
+        for file_path, filename, sha256 in todo:
+            try:
+                windows = page_windows(file_path, page_window)
+                metadata = pdf_metadata(file_path) if windows[0] is not None else None
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                print(f"Failed to process {file_path}: {str(e)}")
+                self.results[file_path] = 0
+                self.report(file_path, 0)
+                continue
+            state = _FileState(filename, sha256, len(windows))
+            self.files[filename] = file_path
+            self.states.append(state)
+            self.results[file_path] = {"filename": filename, "chunks_added": 0}
+            for index, pages in enumerate(windows):
+                yield (state, index), file_path, pages, metadata
+
+    def parse(self, todo: list, pool, page_window: int, limit: int):
+        """Parse files and page windows, yielding (chunk, chunk_id, state) entries.
+
+        Args:
+            todo: Files returned by plan
+            pool: Process pool to parse in, or None to parse in this process
+            page_window: Pages of a PDF parsed per task
+            limit: Most parse tasks in flight at once
+        """
+        tasks = self._tasks(todo, page_window)
+        if pool is not None:
+            parsed = _parse_unordered(pool, tasks, limit)
+        else:
+            parsed = ((task, partial(parse_file, *task[1:])) for task in tasks)
+
+        for ((state, index), file_path, _, _), get_chunks in parsed:
+            state.unparsed -= 1
+            try:
+                chunks, parse_seconds, split_seconds = get_chunks()
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                self.fail(state, str(e))
+                continue
+            if state.failed:
+                continue
+
+            # Worker processes cannot record metrics; observe their timings here
+            observe("parse", parse_seconds)
+            observe("split", split_seconds)
+            self.stats.add("parse", 0 if state.unparsed else 1, parse_seconds + split_seconds)
+            # Windows are page-aligned, so per-window IDs match whole-file IDs
+            state.windows[index] = make_chunk_ids(chunks)
+            state.pending += len(chunks)
+            self.results[file_path]["chunks_added"] += len(chunks)
+            self.finish(state)
+            yield from zip(chunks, state.windows[index], itertools.repeat(state))
+
+    def write(self, batch: list, vectors: list, seconds: float):
+        """Upsert one embedded batch and finish the files it completes."""
+        self.stats.add("embed", len(batch), seconds)
+        start = time.perf_counter()
+        self.vectordb._collection.upsert(  # pylint: disable=protected-access
+            ids=[chunk_id for _, chunk_id, _ in batch],
+            embeddings=vectors,
+            documents=[chunk.page_content for chunk, _, _ in batch],
+            metadatas=[chunk.metadata for chunk, _, _ in batch],
+        )
+        if self.current:
+            self.lexical.add(
+                [chunk_id for _, chunk_id, _ in batch], [chunk for chunk, _, _ in batch]
+            )
+        seconds = time.perf_counter() - start
+        self.stats.add("write", len(batch), seconds)
+        observe("chroma_write", seconds)
+        for _, _, state in batch:
+            state.pending -= 1
+            self.finish(state)
+
+    def _drain(self, in_flight: deque, limit: int):
+        while len(in_flight) > limit:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                in_flight.remove(future)
+                try:
+                    self.write(*future.result())
+                except Exception as e:  # pylint: disable=broad-exception-caught
+                    for _, _, state in future.batch:
+                        state.pending -= 1
+                        self.fail(state, f"failed to embed chunks: {e}")
+
+    def embed_and_write(
+        self, chunks, batch_size: int, embed_concurrency: int, max_batch_tokens: int
+    ):
+        """Batch parsed chunks, embed the batches concurrently and write each one."""
+        in_flight = deque()
+        with ThreadPoolExecutor(max_workers=embed_concurrency) as pool:
+            for batch in _batches(chunks, batch_size, max_batch_tokens):
+                future = pool.submit(_embed_batch, self.vectordb.embeddings, batch)
+                future.batch = batch
+                in_flight.append(future)
+                self._drain(in_flight, embed_concurrency)
+            self._drain(in_flight, 0)
+
+    def save_progress(self):
+        """Save the manifest of a checkpointed run, finished or not."""
+        if self.checkpoint is not None:
+            self.manifest.save()
+            self.checkpoint.clear()
+
+    def finalize(self):
+        """Remove the chunks of failed files and stop the clock."""
+        # Chunks of a failed file may already be stored by other batches
+        orphaned = [cid for state in self.states if state.failed for cid in state.chunk_ids]
+        if orphaned and self.current:
+            self.vectordb.delete(ids=orphaned)
+            self.lexical.delete(orphaned)
+        self.stats.finish()
+
+
+def ingest_bulk(
+    file_paths: list,
+    workers: int = DEFAULT_WORKERS,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    embed_concurrency: int = DEFAULT_EMBED_CONCURRENCY,
+    max_batch_tokens: int = DEFAULT_MAX_BATCH_TOKENS,
+    page_window: int = PAGE_WINDOW,
+    checkpoint=None,
+    progress=None,
+) -> tuple:
+    """Ingest many files through a parse -> batch -> embed -> write pipeline.
+
+    Parsing runs in a process pool; PDFs longer than page_window pages are
+    parsed as separate page windows so one large file is spread across
+    workers. Only a few windows are parsed ahead of the embedding stage,
+    which keeps memory proportional to the window rather than the corpus.
+    Chunks from different files are packed into embedding batches capped by
+    chunk count and estimated tokens, a bounded number of batches are
+    embedded concurrently, and finished batches are written to Chroma in
+    one upsert each.
+
+    Args:
+        file_paths: Paths of the files to ingest
+        workers: Parser processes; 0 parses in the calling process
+        batch_size: Maximum chunks per embedding request and Chroma write
+        embed_concurrency: Maximum embedding requests in flight
+        max_batch_tokens: Maximum estimated tokens per embedding request
+        page_window: Pages of a PDF parsed per task
+        checkpoint: Optional IngestCheckpoint. Finished files are logged
+            to it and the manifest is saved once at the end; files logged
+            by an interrupted run are recovered first.
+        progress: Optional callback invoked as progress(file_path, result)
+            once each file's outcome is known
+
+    Returns:
+        A (results, stats) tuple. results holds one entry per input path in
+        the same shape as ingest_single_file, or "conflict" for a file whose
+        name is taken by different content; stats is a PipelineStats.
+    """
+    run = _BulkRun(checkpoint, progress)
+    todo = run.plan(file_paths)
+    parse_pool = (
+        ProcessPoolExecutor(max_workers=workers, mp_context=_PARSE_CONTEXT)
+        if workers > 0
+        else None
+    )
+    try:
+        chunks = run.parse(todo, parse_pool, page_window, 2 * workers)
+        run.embed_and_write(chunks, batch_size, embed_concurrency, max_batch_tokens)
+    finally:
+        if parse_pool is not None:
+            parse_pool.shutdown(cancel_futures=True)
+        run.save_progress()
+    run.finalize()
+    return [run.results[file_path] for file_path in file_paths], run.stats
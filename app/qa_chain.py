@@ -1,23 +1,28 @@
 """Question answering chain implementation using LangChain."""
 
+import asyncio
 import os
+import threading
 
-from langchain_chroma import Chroma
+import numpy as np
+from langchain_core.documents import Document
 from langchain_core.messages import HumanMessage
 from langchain_core.prompts import PromptTemplate
-from langchain_openai import ChatOpenAI, OpenAIEmbeddings
-from langsmith import traceable
 
-from app.utils.load_env import load_env
+from app.answer_cache import answer_cache, semantic_cache
+from app.concurrency import limiter, run_in_thread
+from app.context import build_context, count_tokens
+from app.lexical_index import get_lexical_index
+from app.metrics import PROMPT_TOKENS, timed
+from app.utils.load_env import get_env, load_env
+from app.utils.tracing import traceable
+from app.vector_store import corpus_version, get_manager, get_vectordb
 
 load_env()
 
-llm = ChatOpenAI(
-    model="gpt-3.5-turbo",
-    temperature=0,
-    streaming=False,
-    verbose=True,
-)
+LLM_MODEL = "gpt-3.5-turbo"
+
+llm = None  # Created on first use by get_llm()
 
 """Question answering template."""
 TEMPLATE = """You are an expert assistant answering questions using only the context below.
@@ -31,37 +36,504 @@ Question:
 
 Answer:"""
 prompt = PromptTemplate.from_template(TEMPLATE)
+NO_ANSWER = "I don't know based on the document."
 
-vectordb = Chroma(
-    persist_directory="vector_store", embedding_function=OpenAIEmbeddings()
+RETRIEVAL_MODES = ("vector", "hybrid", "lexical")
+# Reciprocal rank fusion constant; larger values flatten the rank weights
+RRF_K = 60
+# Default candidates fetched per requested chunk for fusion and reranking
+CANDIDATES_PER_K = 4
+# Minimum cosine similarity for a chunk to count as relevant; unset keeps all
+RELEVANCE_FLOOR = (
+    float(get_env("RELEVANCE_FLOOR")) if get_env("RELEVANCE_FLOOR") else None
 )
 
 
+class LLMCallStats:
+    """Counts answers that called the LLM and answers that skipped it."""
+
+    def __init__(self):
+        self.calls = 0
+        self.skipped = 0
+        self._lock = threading.Lock()
+
+    def record(self, skipped: bool):
+        """Count one answered question."""
+        with self._lock:
+            if skipped:
+                self.skipped += 1
+            else:
+                self.calls += 1
+
+    def stats(self) -> dict:
+        """Return call and skip counters."""
+        with self._lock:
+            total = self.calls + self.skipped
+            return {
+                "calls": self.calls,
+                "skipped": self.skipped,
+                "skip_rate": round(self.skipped / total, 3) if total else None,
+            }
+
+
+llm_calls = LLMCallStats()
+
+
+def get_llm():
+    """Get or create the chat model client."""
+    global llm
+    if llm is None:
+        # pylint: disable=import-outside-toplevel
+        from langchain_openai import ChatOpenAI
+
+        llm = ChatOpenAI(
+            model=LLM_MODEL,
+            temperature=0,
+            streaming=False,
+            verbose=True,
+            http_client=get_manager().http_client,
+            http_async_client=get_manager().http_async_client,
+        )
+    return llm
+
+
+async def ashutdown():
+    """Drop the chat model client and close the HTTP pools it is bound to.
+
+    Both are created again on first use, so a later lifespan in the same
+    process does not inherit a client wired to closed pools.
+    """
+    global llm
+    llm = None
+    await get_manager().ashutdown()
+
+
+def warm_up():
+    """Create the model clients, open the stores and load the tokenizer.
+
+    Everything here is otherwise created on first use, which would add
+    its setup time to the first question.
+    """
+    get_vectordb()
+    get_lexical_index()
+    get_llm()
+    count_tokens("", LLM_MODEL)
+
+
+def embed_query(query):
+    """Embed a question with the vector store's embedding function."""
+    with timed("query_embed"):
+        return get_manager().embeddings.embed_query(query)
+
+
+async def aembed_query(query):
+    """Embed a question with the async embeddings client."""
+    with timed("query_embed"):
+        return await get_manager().embeddings.aembed_query(query)
+
+
+async def aembed_queries(queries):
+    """Embed several questions in one embeddings request."""
+    embeddings = get_manager().embeddings
+    # Batch queries go through aembed_documents; bypass the chunk embedding
+    # cache the way single queries do
+    embeddings = getattr(embeddings, "underlying", embeddings)
+    with timed("query_embed"):
+        return await embeddings.aembed_documents(list(queries))
+
+
+def reciprocal_rank_fusion(rankings, k=4):
+    """Fuse several rankings of the same chunks by reciprocal rank.
+
+    Args:
+        rankings: Lists of (Document, score) tuples, each ordered best first
+        k: Number of fused results to return
+
+    Returns:
+        List of (Document, fused score) tuples, best first
+    """
+    fused = {}
+    for ranking in rankings:
+        for rank, (doc, _) in enumerate(ranking, start=1):
+            key = doc.id or (doc.metadata.get("source"), doc.page_content)
+            entry = fused.setdefault(key, [doc, 0.0])
+            entry[1] += 1.0 / (RRF_K + rank)
+    ranked = sorted(fused.values(), key=lambda entry: entry[1], reverse=True)
+    return [(doc, score) for doc, score in ranked[:k]]
+
+
+def _normalize_rows(vectors):
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def maximal_marginal_relevance(query_similarity, doc_vectors, k, lambda_mult=0.5):
+    """Greedily pick k candidates that are relevant but not redundant.
+
+    All similarities come from one matrix product up front; each of the k
+    greedy picks is then a handful of vector operations over the candidates.
+
+    Args:
+        query_similarity: Cosine similarity of each candidate to the query
+        doc_vectors: L2-normalised candidate embeddings, one row per candidate
+        k: Number of candidates to pick
+        lambda_mult: 1 ranks purely by relevance, 0 purely by diversity
+
+    Returns:
+        Indices of the picked candidates in selection order
+    """
+    if min(k, len(query_similarity)) == 0:
+        return []
+    pairwise = doc_vectors @ doc_vectors.T
+    available = np.ones(len(query_similarity), dtype=bool)
+    best = int(np.argmax(query_similarity))
+    selected = [best]
+    available[best] = False
+    # Highest similarity of every candidate to anything already picked
+    redundancy = pairwise[best]
+    for _ in range(min(k, len(query_similarity)) - 1):
+        scores = lambda_mult * query_similarity - (1 - lambda_mult) * redundancy
+        best = int(np.argmax(np.where(available, scores, -np.inf)))
+        selected.append(best)
+        available[best] = False
+        redundancy = np.maximum(redundancy, pairwise[best])
+    return selected
+
+
+def _rerank(vectordb, candidates, embedding, k, mmr_lambda, score_threshold):
+    # Candidate embeddings are read back from the local store, not the API
+    stored = vectordb._collection.get(  # pylint: disable=protected-access
+        ids=[doc.id for doc, _ in candidates], include=["embeddings"]
+    )
+    by_id = dict(zip(stored["ids"], stored["embeddings"]))
+    candidates = [(doc, score) for doc, score in candidates if doc.id in by_id]
+    if not candidates:
+        return []
+
+    vectors = _normalize_rows(
+        np.asarray([by_id[doc.id] for doc, _ in candidates], dtype=np.float32)
+    )
+    similarity = vectors @ _normalize_rows(np.asarray(embedding, dtype=np.float32))
+    keep = np.arange(len(candidates))
+    if score_threshold is not None:
+        keep = keep[similarity >= score_threshold]
+    if mmr_lambda is None:
+        order = keep[:k]
+    else:
+        order = keep[
+            maximal_marginal_relevance(similarity[keep], vectors[keep], k, mmr_lambda)
+        ]
+    return [candidates[i] for i in order]
+
+
+def _vector_search(vectordb, embeddings, n):
+    """Run one Chroma query for every embedding and return a ranking per query."""
+    with timed("vector_search"):
+        results = vectordb._collection.query(  # pylint: disable=protected-access
+            query_embeddings=list(embeddings),
+            n_results=n,
+            include=["documents", "metadatas", "distances"],
+        )
+    return [
+        [
+            (Document(page_content=text, metadata=metadata or {}, id=chunk_id), distance)
+            for text, metadata, chunk_id, distance in zip(*columns)
+        ]
+        for columns in zip(
+            results["documents"],
+            results["metadatas"],
+            results["ids"],
+            results["distances"],
+        )
+    ]
+
+
+def _lexical_search(query, k):
+    with timed("lexical_search"):
+        return get_lexical_index().search(query, k)
+
+
+def _search_many(  # pylint: disable=too-many-arguments
+    queries, k, embeddings, mode, fetch_k=None, mmr_lambda=None, score_threshold=None
+):
+    """Retrieve chunks for several queries, batching the vector lookups."""
+    if mode not in RETRIEVAL_MODES:
+        raise ValueError(f"Unknown retrieval mode: {mode}")
+    if mode == "lexical":
+        return [_lexical_search(query, k) for query in queries]
+
+    if score_threshold is None:
+        score_threshold = RELEVANCE_FLOOR
+    vectordb = get_vectordb()
+    pool = max(fetch_k or k * CANDIDATES_PER_K, k)
+    rerank = mmr_lambda is not None or score_threshold is not None
+    wanted = pool if rerank else k
+    if mode == "vector":
+        rankings = _vector_search(vectordb, embeddings, wanted)
+    else:
+        rankings = [
+            reciprocal_rank_fusion(
+                [hits, _lexical_search(query, pool)], k=wanted
+            )
+            for query, hits in zip(queries, _vector_search(vectordb, embeddings, pool))
+        ]
+    if not rerank:
+        return rankings
+    return [
+        _rerank(vectordb, candidates, embedding, k, mmr_lambda, score_threshold)
+        for candidates, embedding in zip(rankings, embeddings)
+    ]
+
+
+def _search(query, k, embedding, mode, **options):
+    return _search_many([query], k, [embedding], mode, **options)[0]
+
+
 @traceable(name="Document Retrieval")
-def get_docs_with_scores(query, k=4):
-    """Retrieve documents and their relevance scores for a given query."""
-    return vectordb.similarity_search_with_score(query, k=k)
+def get_docs_with_scores(query, k=4, embedding=None, mode="vector", **options):
+    """Retrieve documents and their relevance scores for a given query.
 
+    Pass a precomputed query embedding to avoid embedding the query twice.
+    ``mode`` selects dense vector search (scores are distances, lower is
+    closer), BM25 keyword search ("lexical", higher is better, no
+    embedding call) or both fused by reciprocal rank ("hybrid", higher is
+    better).
 
-@traceable(name="LLM Call")
-def answer_question(query: str, k: int = 4):
-    """Generate an answer to a question based on relevant documents."""
-    docs_and_scores = get_docs_with_scores(query, k=k)
-    docs = [doc for doc, _ in docs_and_scores]
-    context = "\n\n".join([doc.page_content for doc in docs])
-    formatted_prompt = prompt.format(context=context, question=query)
-    response = llm.invoke([HumanMessage(content=formatted_prompt)])
-
-    if not docs:
-        return {"answer": "I don't know based on the document.", "sources": []}
+    Optional ``options`` tune vector and hybrid retrieval:
+    ``fetch_k`` candidates are gathered first, chunks whose cosine
+    similarity to the question is below ``score_threshold`` (default
+    RELEVANCE_FLOOR) are dropped, and ``mmr_lambda`` diversifies the final
+    k with maximal marginal relevance so overlapping chunks do not crowd
+    the prompt.
+    """
+    if embedding is None and mode != "lexical":
+        embedding = embed_query(query)
+    return _search(query, k, embedding, mode, **options)
+
+
+@traceable(name="Document Retrieval")
+async def aget_docs_with_scores(query, k=4, embedding=None, mode="vector", **options):
+    """Retrieve documents without blocking the event loop.
+
+    The query is embedded with the async OpenAI client and only the local
+    Chroma and keyword index lookups run on the blocking thread pool.
+    """
+    if embedding is None and mode != "lexical":
+        embedding = await aembed_query(query)
+    return await run_in_thread(_search, query, k, embedding, mode, **options)
+
+
+def _build_prompt(query, docs_and_scores):
+    """Pack the chunks into the context budget and build the prompt.
+
+    Returns:
+        A (messages, context, prompt_tokens) tuple, where context holds
+        the chunks that made it into the prompt
+    """
+    context = build_context(docs_and_scores, LLM_MODEL)
+    formatted_prompt = prompt.format(context=context.text, question=query)
+    prompt_tokens = count_tokens(formatted_prompt, LLM_MODEL)
+    return [HumanMessage(content=formatted_prompt)], context, prompt_tokens
+
+
+def _format_sources(docs_and_scores):
+    return [
+        {
+            "source": os.path.basename(doc.metadata.get("source", "Unknown")),
+            "snippet": doc.page_content.strip().replace("\n", " ")[:200],
+            "score": round(score, 2) if score is not None else None,
+        }
+        for doc, score in docs_and_scores
+    ]
+
+
+def _format_response(answer, docs_and_scores, prompt_tokens):
+    if not docs_and_scores:
+        return {"answer": NO_ANSWER, "sources": [], "prompt_tokens": prompt_tokens}
     return {
-        "answer": response.content,
-        "sources": [
-            {
-                "source": os.path.basename(doc.metadata.get("source", "Unknown")),
-                "snippet": doc.page_content.strip().replace("\n", " ")[:200],
-                "score": round(score, 2) if score is not None else None,
-            }
-            for doc, score in docs_and_scores
-        ],
+        "answer": answer,
+        "sources": _format_sources(docs_and_scores),
+        "prompt_tokens": prompt_tokens,
+    }
+
+
+async def _agenerate(query, docs_and_scores, limit=None):
+    """Build the prompt and call the LLM unless there is nothing to ground it in."""
+    messages, context, prompt_tokens = _build_prompt(query, docs_and_scores)
+    llm_calls.record(skipped=not context.docs_and_scores)
+    if context.docs_and_scores:
+        PROMPT_TOKENS.inc(prompt_tokens)
+        if limit is None:
+            with timed("llm"):
+                answer = (await get_llm().ainvoke(messages)).content
+        else:
+            async with limit:
+                with timed("llm"):
+                    answer = (await get_llm().ainvoke(messages)).content
+    else:
+        # Nothing relevant to ground an answer in; skip the model round trip
+        answer, prompt_tokens = NO_ANSWER, 0
+    return _format_response(answer, context.docs_and_scores, prompt_tokens)
+
+
+@traceable(name="LLM Call")
+async def aanswer_question(query: str, k: int = 4, mode: str = "vector", **options):
+    """Async variant of answer_question for use inside request handlers."""
+    version = corpus_version()
+    cache_key = answer_cache.make_key(query, k, version, mode=mode, **options)
+    cached = answer_cache.get(cache_key)
+    if cached is not None:
+        return {**cached, "cached": True}
+
+    # The embedding is needed for retrieval anyway; reuse it for the lookup
+    embedding = None
+    if mode != "lexical":
+        embedding = await aembed_query(query)
+        similar = semantic_cache.lookup(embedding, k, version, mode=mode, **options)
+        if similar is not None:
+            return {**similar, "cached": True}
+
+    docs_and_scores = await aget_docs_with_scores(
+        query, k=k, embedding=embedding, mode=mode, **options
+    )
+    result = await _agenerate(query, docs_and_scores)
+    answer_cache.put(cache_key, result)
+    if embedding is not None:
+        semantic_cache.put(embedding, k, version, result, mode=mode, **options)
+    return {**result, "cached": False}
+
+
+def answer_question(query: str, k: int = 4, mode: str = "vector", **options):
+    """Blocking wrapper around aanswer_question for scripts and the REPL.
+
+    Must not be called from a running event loop; request handlers await
+    aanswer_question directly.
+    """
+    return asyncio.run(aanswer_question(query, k, mode, **options))
+
+
+@traceable(name="Batch LLM Call")
+async def aanswer_batch(queries: list, k: int = 4, mode: str = "vector", **options):
+    """Answer many questions with shared embedding and retrieval calls.
+
+    Uncached questions are embedded in one request and looked up in one
+    batched Chroma query. LLM calls then run concurrently under the shared
+    "qa" limit, so throughput scales with QA_CONCURRENCY.
+
+    Returns:
+        One dictionary per question, in order: the answer payload, or an
+        ``error`` message if that question failed
+    """
+    version = corpus_version()
+    results = [None] * len(queries)
+    pending = []
+    for index, query in enumerate(queries):
+        if not query.strip():
+            results[index] = {"question": query, "error": "Question cannot be empty."}
+            continue
+        cached = answer_cache.get(
+            answer_cache.make_key(query, k, version, mode=mode, **options)
+        )
+        if cached is not None:
+            results[index] = {"question": query, **cached, "cached": True}
+        else:
+            pending.append(index)
+
+    embeddings = {}
+    if pending and mode != "lexical":
+        vectors = await aembed_queries(queries[index] for index in pending)
+        embeddings = dict(zip(pending, vectors))
+        for index in list(pending):
+            similar = semantic_cache.lookup(
+                embeddings[index], k, version, mode=mode, **options
+            )
+            if similar is not None:
+                results[index] = {"question": queries[index], **similar, "cached": True}
+                pending.remove(index)
+    if not pending:
+        return results
+
+    rankings = await run_in_thread(
+        _search_many,
+        [queries[index] for index in pending],
+        k,
+        [embeddings.get(index) for index in pending],
+        mode,
+        **options,
+    )
+
+    async def answer(index, docs_and_scores):
+        query = queries[index]
+        try:
+            result = await _agenerate(query, docs_and_scores, limit=limiter("qa"))
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            results[index] = {"question": query, "error": str(e)}
+            return
+        answer_cache.put(answer_cache.make_key(query, k, version, mode=mode, **options), result)
+        if index in embeddings:
+            semantic_cache.put(
+                embeddings[index], k, version, result, mode=mode, **options
+            )
+        results[index] = {"question": query, **result, "cached": False}
+
+    await asyncio.gather(*map(answer, pending, rankings))
+    return results
+
+
+async def astream_answer(query: str, k: int = 4, mode: str = "vector", **options):
+    """Stream an answer as events: sources first, then tokens as they arrive.
+
+    Yields dictionaries with a ``type`` of "sources", "token" or "done". The
+    "done" event carries the full answer, the prompt token count and
+    whether it came from cache. Cached answers are replayed as a single
+    token.
+    """
+    version = corpus_version()
+    cache_key = answer_cache.make_key(query, k, version, mode=mode, **options)
+    cached = answer_cache.get(cache_key)
+    embedding = None
+    if cached is None and mode != "lexical":
+        embedding = await aembed_query(query)
+        cached = semantic_cache.lookup(embedding, k, version, mode=mode, **options)
+    if cached is not None:
+        yield {"type": "sources", "sources": cached["sources"]}
+        yield {"type": "token", "content": cached["answer"]}
+        yield {
+            "type": "done",
+            "answer": cached["answer"],
+            "prompt_tokens": cached.get("prompt_tokens"),
+            "cached": True,
+        }
+        return
+
+    docs_and_scores = await aget_docs_with_scores(
+        query, k=k, embedding=embedding, mode=mode, **options
+    )
+    messages, context, prompt_tokens = _build_prompt(query, docs_and_scores)
+    docs_and_scores = context.docs_and_scores
+    llm_calls.record(skipped=not docs_and_scores)
+    yield {"type": "sources", "sources": _format_sources(docs_and_scores)}
+
+    if not docs_and_scores:
+        tokens, prompt_tokens = [NO_ANSWER], 0
+        yield {"type": "token", "content": NO_ANSWER}
+    else:
+        tokens = []
+        PROMPT_TOKENS.inc(prompt_tokens)
+        # Includes time the consumer takes to send each token on
+        with timed("llm"):
+            async for chunk in get_llm().astream(messages):
+                if chunk.content:
+                    tokens.append(chunk.content)
+                    yield {"type": "token", "content": chunk.content}
+
+    result = _format_response("".join(tokens), docs_and_scores, prompt_tokens)
+    answer_cache.put(cache_key, result)
+    if embedding is not None:
+        semantic_cache.put(embedding, k, version, result, mode=mode, **options)
+    yield {
+        "type": "done",
+        "answer": result["answer"],
+        "prompt_tokens": prompt_tokens,
+        "cached": False,
     }
@@ -0,0 +1,298 @@
+"""Streaming multipart uploads, hashed on the fly and moved into place atomically."""
+
+import hashlib
+import os
+import tempfile
+import time
+
+from python_multipart.exceptions import MultipartParseError
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+from app.concurrency import run_in_thread
+from app.metrics import observe
+from app.utils.load_env import get_env, load_env
+
+load_env()
+
+UPLOAD_DIR = "uploaded_docs"
+# Partial uploads live outside UPLOAD_DIR so listings never show them; it
+# must be on the same filesystem for the final rename to be atomic
+UPLOAD_STAGING_DIR = get_env("UPLOAD_STAGING_DIR", ".upload_staging")
+MAX_UPLOAD_BYTES = int(get_env("MAX_UPLOAD_BYTES", str(50 * 1024 * 1024)))
+ALLOWED_EXTENSIONS = (".pdf", ".txt", ".md")
+# Accepted extensions and the error returned for anything else
+DOCUMENT_TYPES = (ALLOWED_EXTENSIONS, "Only PDF, TXT, and Markdown files are supported.")
+# File data is hashed and written in blocks of this size
+UPLOAD_BLOCK_SIZE = 1024 * 1024
+# Room for multipart boundaries and part headers around the file itself
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+class UploadError(Exception):
+    """An upload was rejected; carries the HTTP status to respond with."""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def _too_large(max_bytes: int) -> UploadError:
+    return UploadError(413, f"File is larger than the {max_bytes / 2**20:g} MB upload limit.")
+
+
+def valid_filename(filename: str) -> bool:
+    """Return whether a client-supplied name is a plain file name."""
+    return os.path.basename(filename) == filename and filename not in ("", ".", "..")
+
+
+class StagedUpload:
+    """An uploaded file written to a temporary path, with its hash and size."""
+
+    def __init__(self, filename: str, temp_path: str, sha256: str, size: int):
+        self.filename = filename
+        self.temp_path = temp_path
+        self.sha256 = sha256
+        self.size = size
+
+    def commit(self, upload_dir: str = None) -> str:
+        """Atomically move the file into the upload directory and return its path."""
+        upload_dir = upload_dir or UPLOAD_DIR
+        os.makedirs(upload_dir, exist_ok=True)
+        file_path = os.path.join(upload_dir, self.filename)
+        os.replace(self.temp_path, file_path)
+        return file_path
+
+    def discard(self):
+        """Delete the temporary file."""
+        if os.path.exists(self.temp_path):
+            os.remove(self.temp_path)
+
+
+def stage_stream(source, filename: str, max_bytes: int, staging_dir: str) -> StagedUpload:
+    """Copy a readable binary stream to a staging file, hashing it on the way.
+
+    Args:
+        source: File object to read from
+        filename: Name the file will be committed under
+        max_bytes: Largest accepted file size
+        staging_dir: Directory for the temporary file
+
+    Returns:
+        The staged file
+
+    Raises:
+        UploadError: The stream is larger than max_bytes; nothing is left
+            on disk
+    """
+    os.makedirs(staging_dir, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=staging_dir, suffix=".part")
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for block in iter(lambda: source.read(UPLOAD_BLOCK_SIZE), b""):
+                size += len(block)
+                if size > max_bytes:
+                    raise _too_large(max_bytes)
+                digest.update(block)
+                f.write(block)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+    return StagedUpload(filename, temp_path, digest.hexdigest(), size)
+
+
+class _UploadWriter:
+    """Multipart parser callbacks that stream one file field to disk."""
+
+    def __init__(self, field: str, max_bytes: int, file_types: tuple):
+        self.field = field
+        self.max_bytes = max_bytes
+        self.file_types = file_types
+        self.filename = None
+        self.size = 0
+        self.digest = hashlib.sha256()
+        self.temp_path = None
+        self._file = None
+        self._pending = []
+        self._pending_bytes = 0
+        self._in_file = False
+        self._header_name = b""
+        self._header_value = b""
+        self._disposition = b""
+        self.complete = False
+
+    def on_part_begin(self):
+        """Start a new part; it is not the file until its headers say so."""
+        self._in_file = False
+        self._disposition = b""
+
+    def on_header_field(self, data, start, end):
+        """Collect a piece of a part header's name."""
+        self._header_name += data[start:end]
+
+    def on_header_value(self, data, start, end):
+        """Collect a piece of a part header's value."""
+        self._header_value += data[start:end]
+
+    def on_header_end(self):
+        """Keep the Content-Disposition header once it is complete."""
+        if self._header_name.lower() == b"content-disposition":
+            self._disposition = self._header_value
+        self._header_name = b""
+        self._header_value = b""
+
+    def on_headers_finished(self):
+        """Check the file name and type of the file field before its data arrives."""
+        _, options = parse_options_header(self._disposition)
+        if options.get(b"name", b"").decode("utf-8", "replace") != self.field:
+            return
+        if self.filename is not None:
+            raise UploadError(400, "Only one file can be uploaded at a time.")
+        filename = options.get(b"filename", b"").decode("utf-8", "replace")
+        if not valid_filename(filename):
+            raise UploadError(400, "Invalid filename.")
+        # Reject unsupported types before reading any file data
+        extensions, unsupported = self.file_types
+        if not filename.lower().endswith(extensions):
+            raise UploadError(400, unsupported)
+        self.filename = filename
+        self._in_file = True
+
+    def on_part_data(self, data, start, end):
+        """Queue file data for the next flush, enforcing the size limit."""
+        if not self._in_file:
+            return
+        self.size += end - start
+        if self.size > self.max_bytes:
+            raise _too_large(self.max_bytes)
+        self._pending.append(data[start:end])
+        self._pending_bytes += end - start
+
+    def on_part_end(self):
+        """Stop treating data as file data."""
+        self._in_file = False
+
+    def on_end(self):
+        """Note that the closing boundary was reached."""
+        self.complete = True
+
+    def open(self, staging_dir: str):
+        """Create the temporary file that file data is written to."""
+        os.makedirs(staging_dir, exist_ok=True)
+        fd, self.temp_path = tempfile.mkstemp(dir=staging_dir, suffix=".part")
+        self._file = os.fdopen(fd, "wb")
+
+    def ready(self) -> bool:
+        """Whether a full block of file data is waiting to be written."""
+        return self._pending_bytes >= UPLOAD_BLOCK_SIZE
+
+    def flush(self):
+        """Hash and write the pending file data; runs on a worker thread."""
+        if not self._pending:
+            return
+        block = b"".join(self._pending)
+        self._pending, self._pending_bytes = [], 0
+        self.digest.update(block)
+        self._file.write(block)
+
+    def close(self):
+        """Flush remaining data and close the temporary file."""
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
+
+    def abort(self):
+        """Close and delete the temporary file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self.temp_path and os.path.exists(self.temp_path):
+            os.remove(self.temp_path)
+
+
+async def _timed_call(func) -> float:
+    def call():
+        start = time.perf_counter()
+        func()
+        return time.perf_counter() - start
+
+    return await run_in_thread(call)
+
+
+async def receive_upload(
+    request,
+    field: str = "file",
+    max_bytes: int = None,
+    staging_dir: str = None,
+    file_types: tuple = DOCUMENT_TYPES,
+) -> StagedUpload:
+    """Stream a multipart file field to a temporary file.
+
+    The body is parsed as it arrives and file data is hashed and written in
+    fixed-size blocks, so memory stays flat and the file is written exactly
+    once. A request whose Content-Length already exceeds the limit is
+    refused before any of the body is read; otherwise the upload is cut off
+    as soon as the file passes ``max_bytes``.
+
+    Args:
+        request: The incoming Starlette request
+        field: Name of the form field holding the file
+        max_bytes: Largest accepted file size; defaults to MAX_UPLOAD_BYTES
+        staging_dir: Directory for the temporary file; defaults to
+            UPLOAD_STAGING_DIR
+        file_types: (extensions, error detail) pair of accepted file types
+
+    Returns:
+        The staged upload; the caller commits or discards it
+
+    Raises:
+        UploadError: The request is malformed, too large or of an
+            unsupported type
+    """
+    max_bytes = MAX_UPLOAD_BYTES if max_bytes is None else max_bytes
+    staging_dir = staging_dir or UPLOAD_STAGING_DIR
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or not params.get(b"boundary"):
+        raise UploadError(400, "Expected a multipart/form-data upload.")
+    length = request.headers.get("content-length")
+    if length and length.isdigit() and int(length) > max_bytes + MULTIPART_OVERHEAD:
+        raise _too_large(max_bytes)
+
+    writer = _UploadWriter(field, max_bytes, file_types)
+    parser = MultipartParser(
+        params[b"boundary"],
+        {
+            "on_part_begin": writer.on_part_begin,
+            "on_part_data": writer.on_part_data,
+            "on_part_end": writer.on_part_end,
+            "on_header_field": writer.on_header_field,
+            "on_header_value": writer.on_header_value,
+            "on_header_end": writer.on_header_end,
+            "on_headers_finished": writer.on_headers_finished,
+            "on_end": writer.on_end,
+        },
+    )
+    seconds = 0.0
+    try:
+        await run_in_thread(writer.open, staging_dir)
+        async for chunk in request.stream():
+            parser.write(chunk)
+            if writer.ready():
+                seconds += await _timed_call(writer.flush)
+        parser.finalize()
+        if not writer.complete:
+            raise UploadError(400, "The upload ended before the multipart body was complete.")
+        seconds += await _timed_call(writer.close)
+    except BaseException as e:
+        await run_in_thread(writer.abort)
+        if isinstance(e, MultipartParseError):
+            raise UploadError(400, "The upload is not a valid multipart/form-data body.") from e
+        raise
+    if writer.filename is None:
+        await run_in_thread(writer.abort)
+        raise UploadError(400, f"No '{field}' file in the upload.")
+    observe("upload_save", seconds)
+    return StagedUpload(writer.filename, writer.temp_path, writer.digest.hexdigest(), writer.size)
@@ -1,9 +1,66 @@
 """File loading utilities for document processing."""
 
+import functools
+import hashlib
+import importlib
+import itertools
+import json
 from pathlib import Path
 
-from langchain_community.document_loaders import (PyPDFLoader, TextLoader,
-                                                  UnstructuredMarkdownLoader)
+CHUNK_SIZE = 500
+CHUNK_OVERLAP = 50
+# Documents are split and embedded this many pages at a time, so ingestion
+# memory grows with the window rather than with the document
+PAGE_WINDOW = 32
+# Keys PyPDFLoader adds per page rather than per document
+PDF_PAGE_METADATA = ("page", "page_label")
+# Metadata that identifies a chunk; loader extras like PDF modification dates
+# change on every save and would otherwise give every chunk a new ID
+CHUNK_ID_METADATA = ("source", "page")
+
+# Loader per extension, imported on first use: importing every loader up
+# front costs about a second even when only text files are parsed
+LOADERS = {
+    ".pdf": ("langchain_community.document_loaders.pdf", "PyPDFLoader"),
+    ".txt": ("langchain_community.document_loaders.text", "TextLoader"),
+    ".md": ("langchain_community.document_loaders.markdown", "UnstructuredMarkdownLoader"),
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _loader_class(ext: str):
+    module, name = LOADERS[ext]
+    return getattr(importlib.import_module(module), name)
+
+
+@functools.lru_cache(maxsize=None)
+def _splitter():
+    # Splitters are stateless, so one instance is shared by every caller
+    # pylint: disable=import-outside-toplevel
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    return RecursiveCharacterTextSplitter(
+        chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP
+    )
+
+
+def iter_documents(file_path: str):
+    """Lazily load a document file, one page at a time for PDFs.
+
+    Args:
+        file_path: Path to the file to load
+
+    Yields:
+        Documents tagged with the file name as their source
+    """
+    ext = Path(file_path).suffix.lower()
+    if ext not in LOADERS:
+        raise ValueError(f"Unsupported file type: {ext}")
+
+    source = Path(file_path).name
+    for doc in _loader_class(ext)(file_path).lazy_load():
+        doc.metadata["source"] = source
+        yield doc
 
 
 def load_document(file_path: str) -> list:
@@ -15,23 +72,101 @@ def load_document(file_path: str) -> list:
     Returns:
         List of document chunks
     """
-    ext = Path(file_path).suffix.lower()
+    return list(iter_documents(file_path))
 
-    if ext == ".pdf":
-        loader = PyPDFLoader(file_path)
-    elif ext in [".txt", ".md"]:
-        if ext == ".md":
-            loader = UnstructuredMarkdownLoader(file_path)
-        else:
-            loader = TextLoader(file_path)
-    else:
-        raise ValueError(f"Unsupported file type: {ext}")
 
-    documents = loader.load()
+def iter_windows(documents, size: int = PAGE_WINDOW):
+    """Group an iterable of documents into lists of at most size documents."""
+    documents = iter(documents)
+    while window := list(itertools.islice(documents, size)):
+        yield window
+
+
+def pdf_page_count(file_path: str) -> int:
+    """Return the number of pages in a PDF without extracting any text."""
+    # pylint: disable=import-outside-toplevel
+    from pypdf import PdfReader
+
+    return len(PdfReader(file_path).pages)
 
-    # Add metadata
-    source = Path(file_path).name
-    for doc in documents:
-        doc.metadata["source"] = source
 
-    return documents
+def pdf_metadata(file_path: str) -> dict:
+    """Return the document-level metadata PyPDFLoader attaches to every page."""
+    first = next(iter_documents(file_path), None)
+    if first is None:
+        return {}
+    return {k: v for k, v in first.metadata.items() if k not in PDF_PAGE_METADATA}
+
+
+def load_pdf_pages(file_path: str, start: int, stop: int, metadata: dict) -> list:
+    """Load a range of PDF pages as PyPDFLoader would, without the rest.
+
+    Lets worker processes each parse their own slice of a large PDF; the
+    loader itself can only walk a file from its first page.
+
+    Args:
+        file_path: Path to the PDF
+        start: Index of the first page to load
+        stop: Index one past the last page to load
+        metadata: Document-level metadata from pdf_metadata
+
+    Returns:
+        One document per page, identical to the loader's
+    """
+    # pylint: disable=import-outside-toplevel
+    from langchain_core.documents import Document
+    from pypdf import PdfReader
+
+    reader = PdfReader(file_path)
+    labels = reader.page_labels
+    return [
+        Document(
+            page_content=reader.pages[page].extract_text(extraction_mode="plain").strip(),
+            metadata={**metadata, "page": page, "page_label": labels[page]},
+        )
+        for page in range(start, min(stop, len(reader.pages)))
+    ]
+
+
+def split_documents(documents: list, source: str) -> list:
+    """Split loaded documents into chunks tagged with their source filename.
+
+    Args:
+        documents: Documents returned by load_document
+        source: Filename to record in each chunk's metadata
+
+    Returns:
+        List of document chunks
+    """
+    chunks = _splitter().split_documents(documents)
+    for chunk in chunks:
+        chunk.metadata["source"] = source
+    return chunks
+
+
+def make_chunk_ids(chunks: list, seen: dict = None) -> list:
+    """Derive stable IDs for chunks from their content and position metadata.
+
+    An unchanged chunk gets the same ID every time its file is split, which
+    lets re-ingestion diff old and new chunk sets by ID alone. Identical
+    chunks within one file are told apart by an occurrence suffix.
+
+    Args:
+        chunks: Chunks returned by split_documents
+        seen: Occurrence counts to share across calls when a file is split
+            in several windows
+
+    Returns:
+        List of IDs in the same order as the chunks
+    """
+    ids = []
+    seen = {} if seen is None else seen
+    for chunk in chunks:
+        key = [chunk.metadata.get(field) for field in CHUNK_ID_METADATA]
+        digest = hashlib.sha256(
+            json.dumps([key, chunk.page_content], default=str).encode("utf-8")
+        ).hexdigest()
+        occurrence = seen.get(digest, 0)
+        seen[digest] = occurrence + 1
+        ids.append(f"{digest}-{occurrence}" if occurrence else digest)
+    return ids
@@ -0,0 +1,6 @@
+"""Token counting helpers that need no tokenizer."""
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheaply estimate the token count of a text (about 4 characters per token)."""
+    return max(1, len(text) // 4)
@@ -0,0 +1,31 @@
+"""LangSmith tracing that is only imported when tracing is enabled."""
+
+from app.utils.load_env import get_env, load_env
+
+load_env()
+
+TRACING_ENV_VARS = ("LANGSMITH_TRACING", "LANGCHAIN_TRACING_V2")
+
+
+def tracing_enabled() -> bool:
+    """Return whether LangSmith tracing is switched on in the environment."""
+    return any((get_env(name) or "").lower() == "true" for name in TRACING_ENV_VARS)
+
+
+def traceable(name: str):
+    """Decorate a function as a LangSmith run when tracing is enabled.
+
+    The langsmith client takes about half a second to import, which every
+    worker and CLI call would pay at startup just to define decorators
+    that do nothing without tracing. When tracing is off the function is
+    returned unchanged.
+
+    Args:
+        name: Run name shown in LangSmith
+    """
+    if not tracing_enabled():
+        return lambda func: func
+    # pylint: disable=import-outside-toplevel
+    from langsmith import traceable as langsmith_traceable
+
+    return langsmith_traceable(name=name)
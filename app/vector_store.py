@@ -2,36 +2,186 @@
 
 import os
 import shutil
+import threading
 
-from langchain_chroma import Chroma
-from langchain_openai import OpenAIEmbeddings
+import httpx
+
+from app.embedding_cache import CachedEmbeddings
+from app.utils.load_env import get_env
 
 VECTOR_STORE_DIR = "vector_store"
-_VECTORDB = None  # Global singleton
+OPENAI_MAX_CONNECTIONS = int(get_env("OPENAI_MAX_CONNECTIONS", "32"))
+EMBEDDING_MODEL = get_env("EMBEDDING_MODEL", "text-embedding-ada-002")
+_MANAGER = None  # Global singleton
+# Bumped on every change to the indexed corpus; caches key on it
+_CORPUS_VERSION = 0
+
+
+class VectorStoreManager:
+    """Single owner of the Chroma client, embedding function and HTTP pools.
+
+    Retrieval and ingestion both go through this manager, so there is one
+    persistent client per process. ``reset`` swaps in an empty store without
+    a restart and bumps ``generation``; work that started on an older
+    generation can compare it before committing results.
+    """
+
+    def __init__(self, persist_directory: str = VECTOR_STORE_DIR):
+        self.persist_directory = persist_directory
+        self.generation = 0
+        self._store = None
+        self._embeddings = None
+        self._http_client = None
+        self._http_async_client = None
+        self._lock = threading.RLock()
+
+    @property
+    def http_client(self) -> httpx.Client:
+        """Pooled HTTP client shared by the OpenAI embeddings and chat clients."""
+        with self._lock:
+            if self._http_client is None:
+                self._http_client = httpx.Client(
+                    limits=httpx.Limits(max_connections=OPENAI_MAX_CONNECTIONS)
+                )
+            return self._http_client
+
+    @property
+    def http_async_client(self) -> httpx.AsyncClient:
+        """Pooled async HTTP client shared by the OpenAI clients."""
+        with self._lock:
+            if self._http_async_client is None:
+                self._http_async_client = httpx.AsyncClient(
+                    limits=httpx.Limits(max_connections=OPENAI_MAX_CONNECTIONS)
+                )
+            return self._http_async_client
+
+    @property
+    def embeddings(self):
+        """Embedding function used for both ingestion and queries."""
+        with self._lock:
+            if self._embeddings is None:
+                self._embeddings = get_embeddings()
+            return self._embeddings
+
+    def open(self):
+        """Open the persistent store if needed and return it."""
+        with self._lock:
+            if self._store is None:
+                # chromadb is slow to import; only pay for it once a store is needed
+                # pylint: disable=import-outside-toplevel
+                from langchain_chroma import Chroma
+
+                self._store = Chroma(
+                    persist_directory=self.persist_directory,
+                    embedding_function=self.embeddings,
+                )
+            return self._store
+
+    @property
+    def store(self):
+        """The open Chroma store."""
+        store = self._store
+        return store if store is not None else self.open()
+
+    def close(self):
+        """Release the Chroma client so the directory can be removed or reopened."""
+        with self._lock:
+            if self._store is None:
+                return
+            self._store = None
+            # Chroma caches one system per path; drop it so a reopen is fresh
+            # pylint: disable=import-outside-toplevel
+            from chromadb.api.shared_system_client import SharedSystemClient
+
+            SharedSystemClient.clear_system_cache()
+
+    def reset(self) -> int:
+        """Delete all stored chunks and hot-swap in an empty store.
+
+        Returns:
+            The new generation number
+        """
+        with self._lock:
+            self.close()
+            if os.path.exists(self.persist_directory):
+                shutil.rmtree(self.persist_directory)
+            self.generation += 1
+            self.open()
+            generation = self.generation
+        bump_corpus_version()
+        return generation
+
+    def shutdown(self):
+        """Close the store and the HTTP connection pools.
+
+        The async pool can only be closed from an event loop, so it is just
+        dropped here; servers call ashutdown instead.
+        """
+        with self._lock:
+            self.close()
+            if self._http_client is not None:
+                self._http_client.close()
+                self._http_client = None
+            self._http_async_client = None
+            self._embeddings = None
+
+    async def ashutdown(self):
+        """Close the async HTTP pool on the running loop, then shut down."""
+        with self._lock:
+            async_client, self._http_async_client = self._http_async_client, None
+        if async_client is not None:
+            await async_client.aclose()
+        self.shutdown()
+
+
+def get_manager() -> VectorStoreManager:
+    """Get or create the vector store manager."""
+    global _MANAGER
+    if _MANAGER is None:
+        _MANAGER = VectorStoreManager()
+    return _MANAGER
 
 
 def get_embeddings():
-    """Initialize OpenAI embeddings."""
-    return OpenAIEmbeddings()
+    """Initialize OpenAI embeddings behind the persistent embedding cache.
+
+    Set EMBEDDING_CACHE=0 to call the embeddings API directly.
+    """
+    # pylint: disable=import-outside-toplevel
+    from langchain_openai import OpenAIEmbeddings
+
+    manager = get_manager()
+    embeddings = OpenAIEmbeddings(
+        model=EMBEDDING_MODEL,
+        http_client=manager.http_client,
+        http_async_client=manager.http_async_client,
+    )
+    if get_env("EMBEDDING_CACHE", "1") == "0":
+        return embeddings
+    return CachedEmbeddings(embeddings)
 
 
 def get_vectordb():
     """Get or create the vector store instance."""
-    global _VECTORDB
-    if _VECTORDB is None:
-        _VECTORDB = Chroma(
-            persist_directory=VECTOR_STORE_DIR, embedding_function=get_embeddings()
-        )
-    return _VECTORDB
+    return get_manager().store
+
+
+def corpus_version() -> int:
+    """Return the current corpus version."""
+    return _CORPUS_VERSION
+
+
+def bump_corpus_version() -> int:
+    """Mark the corpus as changed and return the new version."""
+    global _CORPUS_VERSION
+    _CORPUS_VERSION += 1
+    return _CORPUS_VERSION
 
 
 def reset_vectordb():
     """Clean up the vector store and uploaded documents."""
-    global _VECTORDB
-
     # Clear vector store
-    if os.path.exists(VECTOR_STORE_DIR):
-        shutil.rmtree(VECTOR_STORE_DIR)
+    get_manager().reset()
 
     # Clear uploaded docs
     upload_dir = "uploaded_docs"
@@ -39,11 +189,17 @@ def reset_vectordb():
         for f in os.listdir(upload_dir):
             os.remove(os.path.join(upload_dir, f))
 
-    _VECTORDB = None  # Clear reference so it's reinitialized on next use
+    # pylint: disable=import-outside-toplevel
+    from app.lexical_index import reset_lexical_index
+    from app.manifest import reset_manifest
+
+    reset_manifest()
+    reset_lexical_index()
 
 
 def cleanup():
     """Remove the vector store directory."""
+    get_manager().close()
     if os.path.exists(VECTOR_STORE_DIR):
         shutil.rmtree(VECTOR_STORE_DIR)
 
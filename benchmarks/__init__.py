@@ -0,0 +1 @@
+"""Offline performance benchmarks with local stand-ins for the OpenAI models."""
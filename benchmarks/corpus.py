@@ -0,0 +1,68 @@
+"""Seeded synthetic corpora and questions for benchmarks."""
+
+import os
+import random
+
+_SYLLABLES = ("ka", "lo", "mi", "ne", "ru", "sa", "ti", "vo", "ze", "an", "el", "or", "ub")
+
+
+def make_vocabulary(size: int, rng: random.Random) -> list:
+    """Return ``size`` distinct pronounceable pseudo-words."""
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+class SyntheticCorpus:
+    """Generator of plain-text documents drawn from a fixed vocabulary.
+
+    Word frequencies follow a Zipf-like distribution so a few words are
+    common across documents and most are rare, as in natural text.
+    Documents are numbered, and the same seed always produces the same
+    document for a given number.
+    """
+
+    def __init__(self, seed: int = 0, vocabulary_size: int = 5000, words_per_doc: int = 800):
+        self.seed = seed
+        self.words_per_doc = words_per_doc
+        self.vocabulary = make_vocabulary(vocabulary_size, random.Random(seed))
+        self._weights = [1 / (rank + 1) for rank in range(vocabulary_size)]
+
+    def _sentences(self, rng: random.Random, words: int) -> list:
+        sentences = []
+        while words > 0:
+            length = min(words, rng.randint(8, 20))
+            picked = rng.choices(self.vocabulary, weights=self._weights, k=length)
+            sentences.append(" ".join(picked).capitalize() + ".")
+            words -= length
+        return sentences
+
+    def document(self, number: int) -> str:
+        """Return the text of one document, split into paragraphs."""
+        rng = random.Random(f"{self.seed}-{number}")
+        sentences = self._sentences(rng, self.words_per_doc)
+        paragraphs = [" ".join(sentences[i : i + 5]) for i in range(0, len(sentences), 5)]
+        return "\n\n".join(paragraphs)
+
+    def write(self, directory: str, start: int, stop: int) -> list:
+        """Write documents numbered start to stop - 1 and return their paths."""
+        os.makedirs(directory, exist_ok=True)
+        paths = []
+        for number in range(start, stop):
+            path = os.path.join(directory, f"doc_{number:06d}.txt")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(self.document(number))
+            paths.append(path)
+        return paths
+
+    def questions(self, count: int, documents: int, seed: int = 1) -> list:
+        """Return distinct questions built from sentences of existing documents."""
+        rng = random.Random(f"{self.seed}-questions-{seed}")
+        questions = []
+        for index in range(count):
+            text = self.document(rng.randrange(documents))
+            sentences = [s for s in text.replace("\n\n", " ").split(". ") if s]
+            words = rng.choice(sentences).rstrip(".").split()[:10]
+            questions.append(f"What about {' '.join(words).lower()}? ({index})")
+        return questions
@@ -0,0 +1,135 @@
+"""Deterministic local stand-ins for OpenAIEmbeddings and ChatOpenAI."""
+
+import asyncio
+import hashlib
+import re
+import time
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+class FakeEmbeddings(Embeddings):
+    """Hashed bag-of-words embeddings with configurable artificial latency.
+
+    Texts sharing words get similar vectors, so retrieval over a synthetic
+    corpus behaves like a real (if crude) semantic search. Each call
+    sleeps ``latency`` seconds plus ``latency_per_text`` per text to mimic
+    an embeddings API round trip.
+    """
+
+    def __init__(self, size: int = 256, latency: float = 0.0, latency_per_text: float = 0.0):
+        self.size = size
+        self.latency = latency
+        self.latency_per_text = latency_per_text
+        self.model = f"fake-bow-{size}"
+        self.requests = 0
+        self.texts = 0
+
+    def _vector(self, text: str) -> list:
+        vector = np.zeros(self.size, dtype=np.float32)
+        for token in _TOKEN.findall(text.casefold()):
+            digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+            vector[int.from_bytes(digest, "little") % self.size] += 1.0
+        norm = np.linalg.norm(vector)
+        if norm:
+            vector /= norm
+        return vector.tolist()
+
+    def _delay(self, count: int) -> float:
+        self.requests += 1
+        self.texts += count
+        return self.latency + self.latency_per_text * count
+
+    def embed_documents(self, texts: list) -> list:
+        time.sleep(self._delay(len(texts)))
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text: str) -> list:
+        return self.embed_documents([text])[0]
+
+    async def aembed_documents(self, texts: list) -> list:
+        await asyncio.sleep(self._delay(len(texts)))
+        return [self._vector(text) for text in texts]
+
+    async def aembed_query(self, text: str) -> list:
+        return (await self.aembed_documents([text]))[0]
+
+
+class FakeChatModel(BaseChatModel):
+    """Chat model that answers from its prompt after an artificial delay.
+
+    The answer is the first sentence of the prompt's context, streamed one
+    word at a time. ``latency`` is the time to the first token and
+    ``token_latency`` the gap between streamed tokens.
+    """
+
+    latency: float = 0.0
+    token_latency: float = 0.0
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-docqa-chat"
+
+    def _answer(self, messages) -> list:
+        self.calls += 1
+        prompt = messages[-1].content
+        context = prompt.split("Context:", 1)[-1].strip()
+        sentence = context.split(".", 1)[0][:200] or "I don't know"
+        return [f"{word} " for word in sentence.split()]
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        words = self._answer(messages)
+        time.sleep(self.latency + self.token_latency * len(words))
+        message = AIMessage(content="".join(words).strip())
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        words = self._answer(messages)
+        await asyncio.sleep(self.latency + self.token_latency * len(words))
+        message = AIMessage(content="".join(words).strip())
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        time.sleep(self.latency)
+        for word in self._answer(messages):
+            time.sleep(self.token_latency)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=word))
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        await asyncio.sleep(self.latency)
+        for word in self._answer(messages):
+            await asyncio.sleep(self.token_latency)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=word))
+
+
+def install(
+    embed_latency: float = 0.0,
+    embed_latency_per_text: float = 0.0,
+    llm_latency: float = 0.0,
+    llm_token_latency: float = 0.0,
+    embedding_size: int = 256,
+) -> tuple:
+    """Swap the app's OpenAI models for the local fakes.
+
+    Must be called before the vector store is first opened, since the
+    embedding function is created with it.
+
+    Returns:
+        The (embeddings, llm) fakes, whose counters can be read after a run
+    """
+    # pylint: disable=import-outside-toplevel
+    import app.qa_chain
+    import app.vector_store
+
+    embeddings = FakeEmbeddings(embedding_size, embed_latency, embed_latency_per_text)
+    llm = FakeChatModel(latency=llm_latency, token_latency=llm_token_latency)
+    app.vector_store.get_embeddings = lambda: embeddings
+    app.qa_chain.llm = llm
+    return embeddings, llm
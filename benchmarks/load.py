@@ -0,0 +1,345 @@
+"""HTTP load test of the FastAPI app under concurrent mixed traffic.
+
+Simulates users asking questions, a trickle of uploads, a dashboard
+polling /status and browsers holding /ws/files sockets open, all at once.
+By default the app is served by an in-process uvicorn on its own thread,
+with the fake models from benchmarks.fakes and a preloaded synthetic
+corpus. The server loop's scheduling lag is sampled throughout, so
+blocking calls on the loop show up directly. Pass --url to load an
+already running server instead; loop lag and stage timings are then not
+available.
+
+Usage:
+    python -m benchmarks.load --scenario mixed --duration 30
+"""
+
+import argparse
+import asyncio
+import itertools
+import os
+import random
+import threading
+import time
+from collections import Counter
+
+import httpx
+import uvicorn
+from websockets.asyncio.client import connect
+
+from benchmarks.corpus import SyntheticCorpus
+from benchmarks.fakes import install
+from benchmarks.results import stage_deltas, summarize, write_results
+from benchmarks.workspace import workspace
+
+# Traffic mixes; every field can be overridden from the command line
+SCENARIOS = {
+    "mixed": {
+        "duration": 30.0,
+        "ask_users": 16,
+        "think_time": 0.0,
+        "upload_rate": 0.5,
+        "status_interval": 0.5,
+        "ws_clients": 20,
+    },
+    "ask-heavy": {
+        "duration": 30.0,
+        "ask_users": 64,
+        "think_time": 0.0,
+        "upload_rate": 0.0,
+        "status_interval": 1.0,
+        "ws_clients": 5,
+    },
+    "upload-burst": {
+        "duration": 30.0,
+        "ask_users": 4,
+        "think_time": 0.5,
+        "upload_rate": 5.0,
+        "status_interval": 0.5,
+        "ws_clients": 20,
+    },
+}
+LAG_INTERVAL = 0.01
+
+
+class EndpointStats:
+    """Latencies and outcomes of the requests sent to one endpoint."""
+
+    def __init__(self):
+        self.latencies = []
+        self.statuses = Counter()
+        self.errors = 0
+
+    def record(self, seconds: float, status):
+        """Record one request; status is an HTTP code or an exception name."""
+        self.statuses[str(status)] += 1
+        if isinstance(status, int) and status < 400:
+            self.latencies.append(seconds)
+        else:
+            self.errors += 1
+
+    def summary(self, duration: float) -> dict:
+        """Return throughput, error rate and latency percentiles."""
+        requests = sum(self.statuses.values())
+        return {
+            "requests": requests,
+            "errors": self.errors,
+            "error_rate": round(self.errors / requests, 4) if requests else None,
+            "requests_per_second": round(requests / duration, 2),
+            "statuses": dict(self.statuses),
+            "latency": summarize(self.latencies),
+        }
+
+
+async def sample_loop_lag(samples: list, stop: threading.Event):
+    """Record how late the running loop wakes from short sleeps."""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(LAG_INTERVAL)
+        samples.append(max(0.0, loop.time() - start - LAG_INTERVAL))
+
+
+class InProcessServer:
+    """The app served by uvicorn on a background thread and event loop."""
+
+    def __init__(self, app, host: str = "127.0.0.1"):
+        self.server = uvicorn.Server(
+            uvicorn.Config(app, host=host, port=0, log_level="warning", lifespan="on")
+        )
+        self.host = host
+        self.loop = None
+        self._thread = None
+
+    async def _serve(self):
+        self.loop = asyncio.get_running_loop()
+        await self.server.serve()
+
+    def start(self) -> str:
+        """Start serving and return the base URL."""
+        self._thread = threading.Thread(
+            target=asyncio.run, args=(self._serve(),), name="load-server", daemon=True
+        )
+        self._thread.start()
+        while not self.server.started:
+            if not self._thread.is_alive():
+                raise RuntimeError("Server failed to start")
+            time.sleep(0.05)
+        port = self.server.servers[0].sockets[0].getsockname()[1]
+        return f"http://{self.host}:{port}"
+
+    def stop(self):
+        """Shut the server down and wait for its thread."""
+        self.server.should_exit = True
+        self._thread.join(timeout=30)
+
+
+async def _timed(stats: EndpointStats, request):
+    start = time.perf_counter()
+    try:
+        response = await request
+        stats.record(time.perf_counter() - start, response.status_code)
+    except (httpx.HTTPError, OSError) as e:
+        stats.record(time.perf_counter() - start, type(e).__name__)
+
+
+async def ask_user(client, stats, questions, options, seed: int, stop: asyncio.Event):
+    """Ask questions back to back, pausing think_time between them."""
+    rng = random.Random(seed)
+    while not stop.is_set():
+        payload = {"question": rng.choice(questions), "k": options.k, "mode": options.mode}
+        await _timed(stats, client.post("/ask", json=payload))
+        if options.think_time:
+            await asyncio.sleep(options.think_time)
+
+
+async def uploader(client, stats, corpus, first: int, rate: float, stop: asyncio.Event):
+    """Upload new documents at a fixed rate, whatever the response times."""
+    in_flight = set()
+    for number in itertools.count(first):
+        if stop.is_set():
+            break
+        files = {"file": (f"doc_{number:06d}.txt", corpus.document(number), "text/plain")}
+        task = asyncio.create_task(_timed(stats, client.post("/upload", files=files)))
+        in_flight.add(task)
+        task.add_done_callback(in_flight.discard)
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=1 / rate)
+        except asyncio.TimeoutError:
+            pass
+    await asyncio.gather(*in_flight)
+
+
+async def status_poller(client, stats, interval: float, stop: asyncio.Event):
+    """Poll /status like a dashboard would."""
+    while not stop.is_set():
+        await _timed(stats, client.get("/status"))
+        await asyncio.sleep(interval)
+
+
+async def ws_client(url: str, stats: EndpointStats, counts: Counter, stop: asyncio.Event):
+    """Hold a /ws/files socket open and count the events it receives."""
+    start = time.perf_counter()
+    connected = False
+    try:
+        async with connect(url) as websocket:
+            stats.record(time.perf_counter() - start, 101)
+            connected = True
+            while not stop.is_set():
+                try:
+                    await asyncio.wait_for(websocket.recv(), timeout=0.5)
+                    counts["messages"] += 1
+                except asyncio.TimeoutError:
+                    continue
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        counts["disconnects"] += 1
+        if not connected:
+            stats.record(time.perf_counter() - start, type(e).__name__)
+
+
+async def run_load(base_url: str, options, corpus, questions: list) -> dict:
+    """Drive the scenario against a server and return per-endpoint results."""
+    stats = {name: EndpointStats() for name in ("ask", "upload", "status", "ws_connect")}
+    ws_counts = Counter()
+    stop = asyncio.Event()
+    limits = httpx.Limits(max_connections=options.ask_users + 32)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        ws_url = base_url.replace("http", "ws", 1) + "/ws/files"
+        tasks = [
+            asyncio.create_task(ws_client(ws_url, stats["ws_connect"], ws_counts, stop))
+            for _ in range(options.ws_clients)
+        ]
+        tasks += [
+            asyncio.create_task(
+                ask_user(client, stats["ask"], questions, options, options.seed + user, stop)
+            )
+            for user in range(options.ask_users)
+        ]
+        if options.upload_rate > 0:
+            tasks.append(
+                asyncio.create_task(
+                    uploader(
+                        client, stats["upload"], corpus, options.documents,
+                        options.upload_rate, stop,
+                    )
+                )
+            )
+        if options.status_interval > 0:
+            tasks.append(
+                asyncio.create_task(
+                    status_poller(client, stats["status"], options.status_interval, stop)
+                )
+            )
+        start = time.perf_counter()
+        await asyncio.sleep(options.duration)
+        stop.set()
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+
+    endpoints = {name: s.summary(elapsed) for name, s in stats.items() if s.statuses}
+    return {
+        "elapsed_seconds": round(elapsed, 3),
+        "endpoints": endpoints,
+        "websockets": {"clients": options.ws_clients, **ws_counts},
+    }
+
+
+def _print_report(results: dict):
+    print(f"{'endpoint':<12}{'reqs':>8}{'req/s':>9}{'err%':>7}{'p50 ms':>10}{'p99 ms':>10}")
+    for name, data in results["endpoints"].items():
+        latency = data["latency"]
+        error_rate = (data["error_rate"] or 0) * 100
+        print(
+            f"{name:<12}{data['requests']:>8}{data['requests_per_second']:>9}"
+            f"{error_rate:>7.1f}{latency.get('p50_ms', '-'):>10}{latency.get('p99_ms', '-'):>10}"
+        )
+    lag = results.get("loop_lag")
+    if lag and lag["count"]:
+        print(f"loop lag    p50 {lag['p50_ms']} ms  p99 {lag['p99_ms']} ms  max {lag['max_ms']} ms")
+
+
+def parse_args(argv=None):
+    """Parse command-line options; unset traffic options come from the scenario."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="mixed")
+    parser.add_argument("--duration", type=float, help="Seconds of load.")
+    parser.add_argument("--ask-users", type=int, help="Concurrent /ask clients.")
+    parser.add_argument("--think-time", type=float, help="Pause between a user's questions.")
+    parser.add_argument("--upload-rate", type=float, help="Uploads per second.")
+    parser.add_argument("--status-interval", type=float, help="Seconds between /status polls.")
+    parser.add_argument("--ws-clients", type=int, help="Open /ws/files sockets.")
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--mode", choices=("vector", "hybrid", "lexical"), default="vector")
+    parser.add_argument("--url", help="Load this running server instead of an in-process one.")
+    parser.add_argument(
+        "--documents", type=int, default=200, help="Synthetic documents preloaded in-process."
+    )
+    parser.add_argument("--words-per-doc", type=int, default=800)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--questions", type=int, default=500, help="Distinct questions to ask.")
+    parser.add_argument("--embed-latency", type=float, default=0.05)
+    parser.add_argument("--embed-latency-per-text", type=float, default=0.0005)
+    parser.add_argument("--llm-latency", type=float, default=0.3)
+    parser.add_argument("--llm-token-latency", type=float, default=0.0)
+    parser.add_argument("--output", help="Results file; defaults to benchmarks/results/.")
+    parser.add_argument("--workdir", help="Directory for the in-process server's stores.")
+    parser.add_argument("--keep", action="store_true", help="Keep the temporary workdir.")
+    args = parser.parse_args(argv)
+    for name, value in SCENARIOS[args.scenario].items():
+        if getattr(args, name) is None:
+            setattr(args, name, value)
+    return args
+
+
+def _run_in_process(args, corpus, questions) -> dict:
+    # pylint: disable=import-outside-toplevel
+    install(
+        embed_latency=args.embed_latency,
+        embed_latency_per_text=args.embed_latency_per_text,
+        llm_latency=args.llm_latency,
+        llm_token_latency=args.llm_token_latency,
+    )
+    from app.main import app, job_queue
+    from app.metrics import STAGE_SECONDS
+    from app.pipeline import ingest_bulk
+
+    ingest_bulk(corpus.write("corpus", 0, args.documents), workers=0)
+    os.makedirs("uploaded_docs", exist_ok=True)
+
+    server = InProcessServer(app)
+    base_url = server.start()
+    lag, stop_lag = [], threading.Event()
+    monitor = asyncio.run_coroutine_threadsafe(sample_loop_lag(lag, stop_lag), server.loop)
+    before = STAGE_SECONDS.snapshot()
+    try:
+        results = asyncio.run(run_load(base_url, args, corpus, questions))
+    finally:
+        stop_lag.set()
+        monitor.result(timeout=5)
+        queued = job_queue.queued
+        server.stop()
+    results["loop_lag"] = summarize(lag)
+    results["stages"] = stage_deltas(before, STAGE_SECONDS.snapshot())
+    results["jobs_still_queued"] = queued
+    return results
+
+
+def main(argv=None):
+    """Run the load test and write its results."""
+    args = parse_args(argv)
+    output = os.path.abspath(args.output) if args.output else None
+    corpus = SyntheticCorpus(args.seed, words_per_doc=args.words_per_doc)
+    questions = corpus.questions(args.questions, max(args.documents, 1))
+    if args.url:
+        results = asyncio.run(run_load(args.url.rstrip("/"), args, corpus, questions))
+    else:
+        with workspace(args.workdir, args.keep):
+            results = _run_in_process(args, corpus, questions)
+
+    _print_report(results)
+    config = {key: value for key, value in vars(args).items() if key != "output"}
+    path = write_results("load", {"config": config, **results}, output)
+    print(f"Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
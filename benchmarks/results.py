@@ -0,0 +1,86 @@
+"""Latency summaries and machine-readable result files for benchmark runs."""
+
+import json
+import os
+import platform
+import subprocess
+from datetime import datetime, timezone
+
+import numpy as np
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def summarize(latencies: list) -> dict:
+    """Return count, mean and tail percentiles of latencies, in milliseconds."""
+    if not latencies:
+        return {"count": 0}
+    values = np.asarray(latencies) * 1000
+    p50, p90, p95, p99 = np.percentile(values, [50, 90, 95, 99])
+    return {
+        "count": len(latencies),
+        "mean_ms": round(float(values.mean()), 2),
+        "p50_ms": round(float(p50), 2),
+        "p90_ms": round(float(p90), 2),
+        "p95_ms": round(float(p95), 2),
+        "p99_ms": round(float(p99), 2),
+        "max_ms": round(float(values.max()), 2),
+    }
+
+
+def stage_deltas(before: dict, after: dict) -> dict:
+    """Return the mean duration of each stage observed between two snapshots."""
+    stages = {}
+    for stage, totals in after.items():
+        previous = before.get(stage, {"count": 0, "sum": 0.0})
+        count = totals["count"] - previous["count"]
+        if count:
+            mean = (totals["sum"] - previous["sum"]) / count * 1000
+            stages[stage] = {"count": count, "mean_ms": round(mean, 3)}
+    return stages
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(RESULTS_DIR),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment() -> dict:
+    """Describe the machine and code version a run was measured on."""
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "git_commit": _git_commit(),
+    }
+
+
+def write_results(name: str, payload: dict, output: str = None) -> str:
+    """Write a run's results as JSON and return the file path.
+
+    Args:
+        name: Benchmark name, used in the default file name
+        payload: Results to write; environment and timestamp are added
+        output: File path; defaults to benchmarks/results/<name>-<UTC time>.json
+    """
+    now = datetime.now(timezone.utc)
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"{name}-{now:%Y%m%dT%H%M%SZ}.json")
+    document = {
+        "benchmark": name,
+        "finished_at": now.isoformat(),
+        "environment": environment(),
+        **payload,
+    }
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(document, f, indent=2)
+    return output
@@ -0,0 +1,219 @@
+"""Offline benchmark of ingestion throughput, /ask latency and memory.
+
+Runs the real ingestion pipeline, retrieval and FastAPI app against
+deterministic local stand-ins for the OpenAI models, so it needs no API
+key or network access. The corpus is grown in steps. After each step the
+new documents are ingested and a batch of questions is sent to /ask, and
+throughput, latency percentiles, stage timings and memory are recorded.
+
+Usage:
+    python -m benchmarks.run --sizes 50,200,500 --questions 100
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+import psutil
+
+from benchmarks.corpus import SyntheticCorpus
+from benchmarks.fakes import install
+from benchmarks.results import stage_deltas, summarize, write_results
+from benchmarks.workspace import workspace
+
+
+def _directory_bytes(path: str) -> int:
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return total
+
+
+async def _ask_load(client, questions: list, concurrency: int, payload: dict) -> tuple:
+    """Send every question to /ask with bounded concurrency.
+
+    Returns:
+        A (latencies, errors, wall_seconds) tuple
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async def ask(question):
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.post("/ask", json={"question": question, **payload})
+            if response.status_code == 200:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*map(ask, questions))
+    return latencies, errors, time.perf_counter() - start
+
+
+async def run(args) -> list:
+    """Grow the corpus step by step and measure each step."""
+    # pylint: disable=import-outside-toplevel
+    from httpx import ASGITransport, AsyncClient
+
+    from app.answer_cache import answer_cache
+    from app.lexical_index import LEXICAL_INDEX_PATH
+    from app.main import app
+    from app.metrics import STAGE_SECONDS
+    from app.pipeline import ingest_bulk
+    from app.vector_store import VECTOR_STORE_DIR
+
+    corpus = SyntheticCorpus(args.seed, args.vocabulary, args.words_per_doc)
+    process = psutil.Process()
+    payload = {"k": args.k, "mode": args.mode}
+    steps = []
+    ingested = 0
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://bench") as client:
+        for size in args.sizes:
+            paths = corpus.write("corpus", ingested, size)
+            before = STAGE_SECONDS.snapshot()
+            start = time.perf_counter()
+            results, stats = await asyncio.to_thread(
+                ingest_bulk,
+                paths,
+                workers=args.workers,
+                batch_size=args.batch_size,
+                embed_concurrency=args.embed_concurrency,
+            )
+            ingest_seconds = time.perf_counter() - start
+            chunks = sum(r["chunks_added"] for r in results if isinstance(r, dict))
+            ingest_stages = stage_deltas(before, STAGE_SECONDS.snapshot())
+            ingested = size
+
+            # Questions are distinct, and ingesting bumped the corpus version
+            # that caches key on; clearing only keeps memory comparable
+            answer_cache.clear()
+            questions = corpus.questions(args.warmup + args.questions, size, seed=size)
+            await _ask_load(client, questions[: args.warmup], args.concurrency, payload)
+            before = STAGE_SECONDS.snapshot()
+            latencies, errors, ask_seconds = await _ask_load(
+                client, questions[args.warmup :], args.concurrency, payload
+            )
+            step = {
+                "documents": size,
+                "ingest": {
+                    "documents": len(paths),
+                    "chunks": chunks,
+                    "seconds": round(ingest_seconds, 3),
+                    "documents_per_second": round(len(paths) / ingest_seconds, 2),
+                    "chunks_per_second": round(chunks / ingest_seconds, 2),
+                    "pipeline": stats.summary(),
+                    "stages": ingest_stages,
+                },
+                "ask": {
+                    "latency": summarize(latencies),
+                    "errors": errors,
+                    "requests_per_second": round(len(latencies) / ask_seconds, 2),
+                    "stages": stage_deltas(before, STAGE_SECONDS.snapshot()),
+                },
+                "memory": {
+                    "rss_bytes": process.memory_info().rss,
+                    # The lexical index lives inside the store directory
+                    "vector_store_bytes": _directory_bytes(VECTOR_STORE_DIR)
+                    - _directory_bytes(LEXICAL_INDEX_PATH),
+                    "lexical_index_bytes": _directory_bytes(LEXICAL_INDEX_PATH),
+                },
+            }
+            steps.append(step)
+            print(
+                f"{size:>7} docs  ingest {step['ingest']['chunks_per_second']:>9} chunks/s"
+                f"  ask p50 {step['ask']['latency'].get('p50_ms')} ms"
+                f"  p99 {step['ask']['latency'].get('p99_ms')} ms"
+                f"  rss {step['memory']['rss_bytes'] / 2**20:.0f} MiB"
+            )
+    return steps
+
+
+def _sizes(value: str) -> list:
+    sizes = sorted({int(size) for size in value.split(",")})
+    if not sizes or sizes[0] < 1:
+        raise argparse.ArgumentTypeError("sizes must be positive integers")
+    return sizes
+
+
+def parse_args(argv=None):
+    """Parse command-line options."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument(
+        "--sizes", type=_sizes, default=[50, 200, 500],
+        help="Comma-separated corpus sizes in documents, measured in turn.",
+    )
+    parser.add_argument("--words-per-doc", type=int, default=800)
+    parser.add_argument("--vocabulary", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--questions", type=int, default=100, help="Questions per step.")
+    parser.add_argument("--warmup", type=int, default=5, help="Unmeasured questions per step.")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent /ask requests.")
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--mode", choices=("vector", "hybrid", "lexical"), default="vector")
+    parser.add_argument("--workers", type=int, default=0, help="Parser processes.")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--embed-concurrency", type=int, default=4)
+    parser.add_argument(
+        "--embed-latency", type=float, default=0.05,
+        help="Seconds per fake embeddings request.",
+    )
+    parser.add_argument(
+        "--embed-latency-per-text", type=float, default=0.0005,
+        help="Extra seconds per text in a fake embeddings request.",
+    )
+    parser.add_argument(
+        "--llm-latency", type=float, default=0.3,
+        help="Seconds to the fake LLM's first token.",
+    )
+    parser.add_argument(
+        "--llm-token-latency", type=float, default=0.0,
+        help="Seconds between fake LLM tokens.",
+    )
+    parser.add_argument("--output", help="Results file; defaults to benchmarks/results/.")
+    parser.add_argument(
+        "--workdir", help="Directory for the store and corpus; a temporary one by default."
+    )
+    parser.add_argument("--keep", action="store_true", help="Keep the temporary workdir.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Run the benchmark and write its results."""
+    args = parse_args(argv)
+    output = os.path.abspath(args.output) if args.output else None
+    with workspace(args.workdir, args.keep):
+        embeddings, llm = install(
+            embed_latency=args.embed_latency,
+            embed_latency_per_text=args.embed_latency_per_text,
+            llm_latency=args.llm_latency,
+            llm_token_latency=args.llm_token_latency,
+        )
+        steps = asyncio.run(run(args))
+
+    config = {key: value for key, value in vars(args).items() if key != "output"}
+    path = write_results(
+        "offline",
+        {
+            "config": config,
+            "fakes": {
+                "embedding_requests": embeddings.requests,
+                "embedded_texts": embeddings.texts,
+                "llm_calls": llm.calls,
+            },
+            "steps": steps,
+        },
+        output,
+    )
+    print(f"Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
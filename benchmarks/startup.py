@@ -0,0 +1,109 @@
+"""Cold-start report: import wall time and where the import time goes.
+
+Each module is imported in a fresh interpreter several times to measure
+cold-start wall time, then once more with ``-X importtime`` to break the
+cost down by top-level package and by the slowest individual modules.
+
+Usage:
+    python -m benchmarks.startup app.main app.ingest --runs 5
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+from benchmarks.results import write_results
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _python(args: list) -> subprocess.CompletedProcess:
+    # Importing app.qa_chain must not depend on an API key being set
+    env = {key: value for key, value in os.environ.items() if key != "OPENAI_API_KEY"}
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=REPO_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def import_wall_times(module: str, runs: int) -> list:
+    """Return the wall time of importing a module in fresh interpreters."""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        _python(["-c", f"import {module}"])
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def parse_importtime(stderr: str) -> list:
+    """Parse ``-X importtime`` output into (module, self_us, cumulative_us) rows."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def import_breakdown(module: str, top: int) -> dict:
+    """Return self time per top-level package and the slowest modules."""
+    rows = parse_importtime(_python(["-X", "importtime", "-c", f"import {module}"]).stderr)
+    packages = defaultdict(int)
+    for name, self_us, _ in rows:
+        packages[name.split(".")[0]] += self_us
+    slowest = sorted(rows, key=lambda row: row[2], reverse=True)[:top]
+    return {
+        "total_ms": round(sum(packages.values()) / 1000, 1),
+        "packages_ms": {
+            name: round(us / 1000, 1)
+            for name, us in sorted(packages.items(), key=lambda item: -item[1])[:top]
+        },
+        "slowest_modules_ms": {
+            name: round(cumulative / 1000, 1) for name, _, cumulative in slowest
+        },
+    }
+
+
+def main(argv=None):
+    """Measure and report cold-start cost for each module."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("modules", nargs="*", default=["app.main", "app.ingest", "app.pipeline"])
+    parser.add_argument("--runs", type=int, default=5, help="Fresh imports per module.")
+    parser.add_argument("--top", type=int, default=12, help="Packages and modules to list.")
+    parser.add_argument("--output", help="Results file; defaults to benchmarks/results/.")
+    args = parser.parse_args(argv)
+
+    report = {}
+    for module in args.modules:
+        times = import_wall_times(module, args.runs)
+        breakdown = import_breakdown(module, args.top)
+        report[module] = {
+            "wall_ms": {
+                "min": round(min(times) * 1000, 1),
+                "median": round(statistics.median(times) * 1000, 1),
+            },
+            **breakdown,
+        }
+        print(
+            f"{module}: median {report[module]['wall_ms']['median']} ms wall, "
+            f"{breakdown['total_ms']} ms importing"
+        )
+        for name, ms in breakdown["packages_ms"].items():
+            print(f"  {name:<32}{ms:>9.1f} ms")
+
+    path = write_results("startup", {"config": vars(args), "modules": report}, args.output)
+    print(f"Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""Scratch working directory that isolates a benchmark's stores."""
+
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+
+@contextmanager
+def workspace(path: str = None, keep: bool = False):
+    """Run the enclosed block with the cwd set to a scratch directory.
+
+    The app keeps its vector store, manifest, indexes and uploads relative
+    to the cwd, so a fresh directory gives each run empty stores.
+
+    Args:
+        path: Directory to use; a temporary one is created by default
+        keep: Keep a temporary directory instead of deleting it afterwards
+
+    Yields:
+        The directory path
+    """
+    directory = path or tempfile.mkdtemp(prefix="docqa-bench-")
+    os.makedirs(directory, exist_ok=True)
+    cwd = os.getcwd()
+    os.chdir(directory)
+    try:
+        yield directory
+    finally:
+        os.chdir(cwd)
+        if path is None and not keep:
+            shutil.rmtree(directory, ignore_errors=True)
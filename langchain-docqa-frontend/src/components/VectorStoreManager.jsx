@@ -1,5 +1,5 @@
 import { useEffect, useState } from 'react'
-import { BiFolderOpen } from 'react-icons/bi'
+import { BiFolderOpen, BiTrash } from 'react-icons/bi'
 
 export default function VectorStoreManager() {
   const [files, setFiles] = useState([])
@@ -61,10 +61,6 @@ export default function VectorStoreManager() {
       '⚠️ WARNING: This will completely reset the application.\n\n' +
         '- All uploaded files will be deleted\n' +
         '- The vector store will be cleared\n\n' +
-        'After pressing OK, you will need to manually restart both servers:\n' +
-        '1. Stop the backend server (Ctrl+C)\n' +
-        '2. Stop the frontend server (Ctrl+C)\n' +
-        '3. Restart both servers\n\n' +
         'This action cannot be undone. Are you sure you want to continue?'
     )
     if (!confirmReset) return
@@ -76,9 +72,7 @@ export default function VectorStoreManager() {
 
       if (res.ok) {
         const data = await res.json()
-        alert(
-          `Application has been reset.\n\n${data.instructions}\n\nPlease restart both servers now.`
-        )
+        alert(`Application has been reset.\n\n${data.message}`)
       } else {
         throw new Error('Failed to reset application')
       }
@@ -88,6 +82,26 @@ export default function VectorStoreManager() {
     }
   }
 
+  const handleDelete = async filename => {
+    if (!window.confirm(`Delete "${filename}" and remove it from the vector store?`)) return
+
+    try {
+      const res = await fetch(
+        `http://127.0.0.1:8000/files/${encodeURIComponent(filename)}`,
+        { method: 'DELETE' }
+      )
+
+      if (res.ok) {
+        setFiles(current => current.filter(file => file !== filename))
+      } else {
+        throw new Error('Failed to delete file')
+      }
+    } catch (err) {
+      console.error('Failed to delete file:', err)
+      alert('Failed to delete file. Please try again.')
+    }
+  }
+
   const getFileType = filename => {
     const extension = filename.split('.').pop().toLowerCase()
     const types = {
@@ -135,6 +149,13 @@ export default function VectorStoreManager() {
                 >
                   <span className="text-gray-900">{file}</span>
                   <span className="ml-auto text-xs text-gray-400">{getFileType(file)}</span>
+                  <button
+                    onClick={() => handleDelete(file)}
+                    title="Delete file"
+                    className="ml-3 p-1 rounded text-gray-400 hover:text-red-500 transition-colors"
+                  >
+                    <BiTrash className="h-4 w-4" />
+                  </button>
                 </div>
               ))}
             </div>
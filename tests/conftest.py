@@ -1,9 +1,57 @@
 """Pytest configuration and fixtures."""
 
+import asyncio
+from types import SimpleNamespace
+
+import pytest
 import pytest_asyncio
 from httpx import ASGITransport, AsyncClient
+from langchain_chroma import Chroma
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from app.embedding_cache import EmbeddingCache
+from app.lexical_index import LexicalIndex
+from app.main import app, job_queue
+from app.manifest import IngestManifest
+
+
+@pytest.fixture(autouse=True)
+def lexical_index(tmp_path_factory, monkeypatch):
+    """Give every test its own temporary lexical index and embedding cache.
+
+    Without this, anything that ingests through the app writes into the
+    real index and cache files in the working directory.
+    """
+    directory = tmp_path_factory.mktemp("indexes")
+    index = LexicalIndex(path=str(directory / "lexical_index.sqlite3"))
+    monkeypatch.setattr("app.lexical_index._INDEX", index)
+    monkeypatch.setattr(
+        "app.embedding_cache._CACHE",
+        EmbeddingCache(path=str(directory / "embedding_cache.sqlite3")),
+    )
+    return index
+
 
-from app.main import app
+@pytest.fixture
+def ingest_store(tmp_path, monkeypatch, lexical_index):
+    """Point ingestion at a temporary Chroma store, manifest and lexical index.
+
+    The store embeds with a deterministic fake, so nothing calls OpenAI.
+    Tests may swap store.vectordb or store.manifest; ingestion looks them
+    up on every call.
+    """
+    store = SimpleNamespace(
+        vectordb=Chroma(
+            persist_directory=str(tmp_path / "store"),
+            embedding_function=DeterministicFakeEmbedding(size=8),
+        ),
+        manifest=IngestManifest(path=str(tmp_path / "manifest.json")),
+        lexical=lexical_index,
+    )
+    for module in ("app.ingest", "app.pipeline"):
+        monkeypatch.setattr(f"{module}.get_vectordb", lambda: store.vectordb)
+        monkeypatch.setattr(f"{module}.get_manifest", lambda: store.manifest)
+    return store
 
 
 @pytest_asyncio.fixture
@@ -12,3 +60,22 @@ async def client():
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as ac:
         yield ac
+    # The transport skips lifespan, so stop the workers it would have stopped
+    await job_queue.stop()
+
+
+@pytest.fixture
+def wait_for_job(client):
+    """Return a helper that polls /jobs/{id} until the job finishes."""
+
+    async def wait(job_id: str, timeout: float = 30.0) -> dict:
+        deadline = asyncio.get_running_loop().time() + timeout
+        while True:
+            job = (await client.get(f"/jobs/{job_id}")).json()
+            if job["status"] in ("completed", "duplicate", "failed"):
+                return job
+            if asyncio.get_running_loop().time() > deadline:
+                raise TimeoutError(f"Job {job_id} did not finish in {timeout}s")
+            await asyncio.sleep(0.05)
+
+    return wait
@@ -0,0 +1,66 @@
+"""Unit tests for the corpus-versioned answer cache."""
+
+from langchain_core.documents import Document
+from langchain_core.language_models import FakeListChatModel
+
+from app import qa_chain
+from app.answer_cache import AnswerCache, SemanticCache
+from app.vector_store import bump_corpus_version
+
+
+def test_answer_cache_hits_until_corpus_changes(monkeypatch):
+    """Test that repeated questions are cached until the corpus version bumps."""
+    retrievals = []
+
+    async def fake_docs(query, k=4, **_kwargs):
+        retrievals.append(query)
+        return [(Document(page_content="Denver won.", metadata={"source": "a.txt"}), 0.1)]
+
+    async def fake_embed(_query):
+        return [1.0, 0.0]
+
+    monkeypatch.setattr(qa_chain, "answer_cache", AnswerCache())
+    monkeypatch.setattr(qa_chain, "semantic_cache", SemanticCache(enabled=False))
+    monkeypatch.setattr(qa_chain, "aembed_query", fake_embed)
+    monkeypatch.setattr(qa_chain, "aget_docs_with_scores", fake_docs)
+    monkeypatch.setattr(
+        qa_chain, "llm", FakeListChatModel(responses=["Denver.", "Still Denver."])
+    )
+
+    first = qa_chain.answer_question("Who won in 2023?")
+    second = qa_chain.answer_question("  who won in 2023  ")
+
+    assert first["cached"] is False
+    assert second["cached"] is True
+    assert second["answer"] == "Denver."
+    assert len(retrievals) == 1
+
+    bump_corpus_version()
+    third = qa_chain.answer_question("Who won in 2023?")
+    assert third["cached"] is False
+    assert third["answer"] == "Still Denver."
+
+
+def test_answer_cache_enforces_memory_cap():
+    """Test that the least recently used entries are evicted over the byte cap."""
+    cache = AnswerCache(max_bytes=100)
+    cache.put(("a",), {"answer": "x" * 40})
+    cache.put(("b",), {"answer": "y" * 40})
+    cache.put(("c",), {"answer": "z" * 40})
+
+    assert cache.get(("a",)) is None
+    assert cache.get(("c",)) is not None
+    assert cache.stats()["bytes"] <= 100
+
+
+def test_semantic_cache_matches_paraphrases_for_same_version():
+    """Test that near-duplicate embeddings hit only for the same k and version."""
+    cache = SemanticCache(threshold=0.95, max_entries=4, enabled=True)
+    cache.put([1.0, 0.0, 0.0], k=4, corpus_version=7, payload={"answer": "Denver."})
+
+    assert cache.lookup([0.99, 0.05, 0.0], k=4, corpus_version=7) == {
+        "answer": "Denver."
+    }
+    assert cache.lookup([0.0, 1.0, 0.0], k=4, corpus_version=7) is None
+    assert cache.lookup([0.99, 0.05, 0.0], k=2, corpus_version=7) is None
+    assert cache.lookup([0.99, 0.05, 0.0], k=4, corpus_version=8) is None
@@ -0,0 +1,219 @@
+"""Unit tests for reading documents out of uploaded archives."""
+
+import hashlib
+import io
+import os
+import tarfile
+import zipfile
+from types import SimpleNamespace
+
+import pytest
+
+from app import main
+from app.archives import ArchiveError, ArchiveMember, ingest_members, stage_members
+from app.manifest import IngestManifest
+from app.pipeline import PipelineStats
+
+
+def _zip_bytes(members: dict) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+
+def _tar_bytes(members: dict) -> bytes:
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as archive:
+        for name, data in members.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+
+def test_stage_members_filters_and_keeps_paths(tmp_path):
+    """Test that only supported documents are staged, keeping their archive paths."""
+    archive = tmp_path / "docs.tar.gz"
+    archive.write_bytes(
+        _tar_bytes(
+            {
+                "team/guide.md": b"# Guide",
+                "team/notes/todo.txt": b"Things to do.",
+                "team/tool.exe": b"binary",
+                "team/.hidden.txt": b"dotfile",
+                "__MACOSX/team/._guide.md": b"resource fork",
+                "team/big.txt": b"x" * 2048,
+            }
+        )
+    )
+
+    staged, skipped = stage_members(
+        str(archive), "docs.tar.gz", str(tmp_path / "staging"), max_file_bytes=1024
+    )
+
+    assert [(m.upload.filename, m.path) for m in staged] == [
+        ("guide.md", "team/guide.md"),
+        ("todo.txt", "team/notes/todo.txt"),
+    ]
+    assert [(entry["path"], entry["status"]) for _, entry in skipped] == [
+        ("team/tool.exe", "skipped"),
+        ("team/big.txt", "skipped"),
+    ]
+    assert sorted(p.name for p in (tmp_path / "staging").iterdir()) == sorted(
+        m.upload.temp_path.rsplit("/", 1)[1] for m in staged
+    )
+
+
+def test_stage_members_rejects_corrupt_archive(tmp_path):
+    """Test that an unreadable archive raises ArchiveError and stages nothing."""
+    archive = tmp_path / "broken.zip"
+    archive.write_bytes(b"not a zip file")
+
+    with pytest.raises(ArchiveError):
+        stage_members(str(archive), "broken.zip", str(tmp_path / "staging"))
+
+
+def test_failed_run_keeps_files_it_already_ingested(monkeypatch, tmp_path):
+    """Test that a run failing partway only removes the files it did not ingest."""
+    members = []
+    for index, name in enumerate(("first.txt", "second.txt", "third.txt")):
+        member = ArchiveMember(index, f"team/{name}", SimpleNamespace(filename=name))
+        member.file_path = str(tmp_path / name)
+        (tmp_path / name).write_text(name)
+        members.append(member)
+
+    def failing_ingest_bulk(paths, workers, progress):
+        progress(paths[0], {"filename": "first.txt", "chunks_added": 2})
+        progress(paths[1], 0)
+        raise RuntimeError("embedding service went away")
+
+    monkeypatch.setattr("app.archives.ingest_bulk", failing_ingest_bulk)
+
+    with pytest.raises(RuntimeError):
+        ingest_members("team.zip", members, [], workers=0)
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["first.txt"]
+
+
+@pytest.mark.asyncio
+async def test_upload_archive_queues_one_bulk_job(
+    client, wait_for_job, monkeypatch, tmp_path
+):
+    """Test that an archive is checked, ingested as one job and broadcast once."""
+    monkeypatch.setattr("app.uploads.UPLOAD_STAGING_DIR", str(tmp_path / "staging"))
+    monkeypatch.setattr("app.uploads.UPLOAD_DIR", str(tmp_path / "docs"))
+    manifest = IngestManifest(path=str(tmp_path / "manifest.json"))
+    monkeypatch.setattr(main, "get_manifest", lambda: manifest)
+    ingested, events = [], []
+
+    def fake_ingest_bulk(paths, workers, progress):
+        ingested.append(paths)
+        results = []
+        for path in paths:
+            result = {"filename": os.path.basename(path), "chunks_added": 2}
+            if path.endswith("broken.md"):
+                result = 0
+            progress(path, result)
+            results.append(result)
+        return results, PipelineStats()
+
+    async def fake_broadcast(message):
+        events.append(message)
+
+    monkeypatch.setattr("app.archives.ingest_bulk", fake_ingest_bulk)
+    monkeypatch.setattr(main, "broadcast", fake_broadcast)
+    data = _zip_bytes(
+        {
+            "b/image.png": "not a document",
+            "a/notes.txt": "First document.",
+            "b/notes.txt": "Different notes under the same name.",
+            "b/copy_of_notes.txt": "First document.",
+            "b/broken.md": "Fails to parse.",
+            "c/guide.md": "Second document.",
+        }
+    )
+
+    response = await client.post(
+        "/upload/archive", files={"file": ("team.zip", data, "application/zip")}
+    )
+
+    assert response.status_code == 202
+    job = await wait_for_job(response.json()["job_id"])
+    assert job["status"] == "completed"
+    result = job["result"]
+    assert result["counts"] == {
+        "ingested": 2,
+        "duplicate": 1,
+        "conflict": 1,
+        "skipped": 1,
+        "failed": 1,
+    }
+    assert [(entry["path"], entry["status"]) for entry in result["files"]] == [
+        ("b/image.png", "skipped"),
+        ("a/notes.txt", "ingested"),
+        ("b/notes.txt", "conflict"),
+        ("b/copy_of_notes.txt", "duplicate"),
+        ("b/broken.md", "failed"),
+        ("c/guide.md", "ingested"),
+    ]
+    assert result["files"][2]["reason"] == "another member of this archive has the same name"
+    assert result["chunks_added"] == 4
+    assert len(ingested) == 1 and len(ingested[0]) == 3
+    assert sorted(p.name for p in (tmp_path / "docs").iterdir()) == ["guide.md", "notes.txt"]
+    assert list((tmp_path / "staging").iterdir()) == []
+    updates = [event for event in events if event["type"] == "file_updated"]
+    assert len(updates) == 1
+    assert sorted(updates[0]["files"]) == ["guide.md", "notes.txt"]
+
+
+@pytest.mark.asyncio
+async def test_upload_archive_of_stored_files_needs_no_job(client, monkeypatch, tmp_path):
+    """Test that an archive with nothing new is summarized without queueing a job."""
+    monkeypatch.setattr("app.uploads.UPLOAD_STAGING_DIR", str(tmp_path / "staging"))
+    monkeypatch.setattr("app.uploads.UPLOAD_DIR", str(tmp_path / "docs"))
+    manifest = IngestManifest(path=str(tmp_path / "manifest.json"))
+    manifest.record(
+        "notes.txt", hashlib.sha256(b"First document.").hexdigest(), ["id-1"]
+    )
+    monkeypatch.setattr(main, "get_manifest", lambda: manifest)
+
+    response = await client.post(
+        "/upload/archive",
+        files={
+            "file": (
+                "team.zip",
+                _zip_bytes({"a/notes.txt": "First document.", "b/notes.txt": "Edited."}),
+                "application/zip",
+            )
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.json()["files"] == [
+        {
+            "filename": "notes.txt",
+            "path": "a/notes.txt",
+            "status": "duplicate",
+            "duplicate_of": "notes.txt",
+        },
+        {
+            "filename": "notes.txt",
+            "path": "b/notes.txt",
+            "status": "conflict",
+            "reason": "a different file named 'notes.txt' is already stored",
+        },
+    ]
+    assert not (tmp_path / "docs").exists()
+
+
+@pytest.mark.asyncio
+async def test_upload_archive_rejects_other_types(client):
+    """Test that only zip and tar archives are accepted."""
+    response = await client.post(
+        "/upload/archive", files={"file": ("notes.txt", b"text", "text/plain")}
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Only zip and tar archives are supported."
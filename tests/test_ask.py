@@ -11,7 +11,7 @@ async def test_ask_question_success(monkeypatch):
     """Test question answering with success."""
 
     # Patch where the function is used, not defined
-    def mock_answer_question(_query: str, _k: int = 4):
+    async def mock_answer_question(_query: str, _k: int = 4, **_kwargs):
         return {
             "answer": "This is a mock answer.",
             "sources": [
@@ -19,7 +19,7 @@ async def test_ask_question_success(monkeypatch):
             ],
         }
 
-    monkeypatch.setattr("app.main.answer_question", mock_answer_question)
+    monkeypatch.setattr("app.main.aanswer_question", mock_answer_question)
 
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as client:
@@ -38,10 +38,10 @@ async def test_ask_question_success(monkeypatch):
 async def test_ask_question_no_documents(monkeypatch):
     """Test question answering with no documents."""
 
-    def mock_answer_question(_query: str, _k: int = 4):
+    async def mock_answer_question(_query: str, _k: int = 4, **_kwargs):
         return {"answer": "I don't know based on the document.", "sources": []}
 
-    monkeypatch.setattr("app.main.answer_question", mock_answer_question)
+    monkeypatch.setattr("app.main.aanswer_question", mock_answer_question)
 
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as client:
@@ -65,16 +65,28 @@ async def test_ask_invalid_payload(client):
     assert "details" in response.json()
 
 
+@pytest.mark.asyncio
+@pytest.mark.parametrize("option", [{"fetch_k": 20}, {"mmr_lambda": 0.5}, {"score_threshold": 0.3}])
+async def test_ask_rejects_vector_tuning_in_lexical_mode(client, option):
+    """Test that vector-only retrieval options are rejected for lexical search."""
+    response = await client.post(
+        "/ask", json={"question": "What is LangChain?", "mode": "lexical", **option}
+    )
+
+    assert response.status_code == 422
+    assert "only apply to vector and hybrid modes" in str(response.json()["details"])
+
+
 @pytest.mark.asyncio
 async def test_ask_internal_error(monkeypatch, client):
     """Test question answering with internal error."""
 
     # Monkeypatch the answer_question function to raise an exception
-    def mock_answer_question(*args, **kwargs):
+    async def mock_answer_question(*args, **kwargs):
         """Mock answer_question function."""
         raise Exception("Simulated failure")
 
-    monkeypatch.setattr("app.main.answer_question", mock_answer_question)
+    monkeypatch.setattr("app.main.aanswer_question", mock_answer_question)
 
     payload = {"question": "What is Python?", "k": 3}
     response = await client.post("/ask", json=payload)
@@ -84,3 +96,22 @@ async def test_ask_internal_error(monkeypatch, client):
         response.json()["detail"]
         == "Something went wrong while processing the question."
     )
+
+
+@pytest.mark.asyncio
+async def test_ask_batch(monkeypatch, client):
+    """Test batch question answering returns one result per question."""
+
+    async def mock_answer_batch(queries, _k=4, **_kwargs):
+        return [{"question": q, "answer": f"Answer to {q}", "sources": []} for q in queries]
+
+    monkeypatch.setattr("app.main.aanswer_batch", mock_answer_batch)
+
+    response = await client.post("/ask/batch", json={"questions": ["One?", "Two?"]})
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["answer"] for r in results] == ["Answer to One?", "Answer to Two?"]
+
+    empty = await client.post("/ask/batch", json={"questions": []})
+    assert empty.status_code == 422
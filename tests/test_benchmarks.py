@@ -0,0 +1,75 @@
+"""Tests for the offline benchmark stand-ins and corpus generator."""
+
+import numpy as np
+
+from benchmarks.corpus import SyntheticCorpus
+from benchmarks.fakes import FakeChatModel, FakeEmbeddings
+from benchmarks.load import EndpointStats, parse_args
+from benchmarks.results import summarize
+
+
+def test_fake_embeddings_are_deterministic_and_word_based():
+    """Test that shared words give similar vectors and repeats give equal ones."""
+    embeddings = FakeEmbeddings(size=64)
+    first, related, unrelated = embeddings.embed_documents(
+        ["the nuggets won the title", "nuggets title", "avalanche hockey game"]
+    )
+
+    assert embeddings.embed_query("the nuggets won the title") == first
+    assert np.dot(first, related) > np.dot(first, unrelated)
+    assert embeddings.requests == 2
+    assert embeddings.texts == 4
+
+
+def test_fake_chat_model_answers_from_context():
+    """Test that the fake LLM answers with the first sentence of the context."""
+    llm = FakeChatModel()
+
+    answer = llm.invoke("Context:\nDenver won in 2023. Miami lost.\n\nQuestion:\nWho won?")
+
+    assert answer.content == "Denver won in 2023"
+    assert llm.calls == 1
+
+
+def test_synthetic_corpus_is_reproducible(tmp_path):
+    """Test that a seed always yields the same documents and questions."""
+    corpus = SyntheticCorpus(seed=3, vocabulary_size=200, words_per_doc=100)
+    paths = corpus.write(str(tmp_path), 0, 2)
+
+    same_seed = SyntheticCorpus(seed=3, vocabulary_size=200, words_per_doc=100)
+    assert same_seed.document(1) == corpus.document(1)
+    assert open(paths[0], encoding="utf-8").read() == corpus.document(0)
+    assert corpus.questions(3, 2) == corpus.questions(3, 2)
+    assert len(set(corpus.questions(10, 2))) == 10
+
+
+def test_summarize_reports_percentiles_in_milliseconds():
+    """Test latency summaries."""
+    summary = summarize([0.01 * i for i in range(1, 101)])
+
+    assert summary["count"] == 100
+    assert summary["p50_ms"] == 505.0
+    assert summary["max_ms"] == 1000.0
+
+
+def test_load_options_default_to_the_scenario():
+    """Test that unset traffic options come from the chosen scenario."""
+    args = parse_args(["--scenario", "ask-heavy", "--ws-clients", "2"])
+
+    assert args.ask_users == 64
+    assert args.ws_clients == 2
+
+
+def test_endpoint_stats_count_errors_separately():
+    """Test that failed requests count as errors and not as latencies."""
+    stats = EndpointStats()
+    stats.record(0.1, 200)
+    stats.record(0.2, 503)
+    stats.record(0.3, "ConnectError")
+
+    summary = stats.summary(duration=1.0)
+
+    assert summary["requests"] == 3
+    assert summary["errors"] == 2
+    assert summary["latency"]["count"] == 1
+    assert summary["statuses"] == {"200": 1, "503": 1, "ConnectError": 1}
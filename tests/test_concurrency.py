@@ -0,0 +1,104 @@
+"""Tests that blocking work does not stall the event loop."""
+
+import asyncio
+import time
+from pathlib import Path
+
+import pytest
+
+import app.main as app_main
+from app.concurrency import SingleFlight
+from app.vector_store import bump_corpus_version
+
+
+@pytest.mark.asyncio
+async def test_health_not_blocked_by_slow_ingestion(
+    monkeypatch, client, wait_for_job, tmp_path
+):
+    """Test that /health answers while a slow ingestion is running."""
+
+    def slow_ingest(file_path, **_kwargs):
+        time.sleep(0.5)
+        return {"filename": file_path, "chunks_added": 1}
+
+    monkeypatch.setattr("app.jobs.ingest_single_file", slow_ingest)
+    test_file_path = tmp_path / "slow.txt"
+    test_file_path.write_text("Slow to parse.")
+
+    async def upload():
+        with test_file_path.open("rb") as f:
+            return await client.post(
+                "/upload", files={"file": ("slow_ingest.txt", f, "text/plain")}
+            )
+
+    async def health():
+        await asyncio.sleep(0.1)
+        start = time.perf_counter()
+        response = await client.get("/health")
+        return response, time.perf_counter() - start
+
+    try:
+        upload_response = await upload()
+        health_response, elapsed = await health()
+        job = await wait_for_job(upload_response.json()["job_id"])
+    finally:
+        Path("uploaded_docs/slow_ingest.txt").unlink(missing_ok=True)
+
+    assert upload_response.status_code == 202
+    assert health_response.status_code == 200
+    assert elapsed < 0.25
+    assert job["status"] == "completed"
+
+
+@pytest.mark.asyncio
+async def test_identical_concurrent_questions_are_coalesced(monkeypatch, client):
+    """Test that concurrent identical /ask requests share one computation."""
+    calls = []
+
+    async def slow_answer(query: str, k: int = 4, **_kwargs):
+        calls.append((query, k))
+        await asyncio.sleep(0.2)
+        return {"answer": "Shared answer.", "sources": []}
+
+    monkeypatch.setattr("app.main.aanswer_question", slow_answer)
+    monkeypatch.setattr("app.main.ask_flight", SingleFlight())
+
+    responses = await asyncio.gather(
+        *[
+            client.post("/ask", json={"question": "Who won in 2023?", "k": 4})
+            for _ in range(5)
+        ],
+        client.post("/ask", json={"question": "Who won in 2023?", "k": 2}),
+    )
+
+    assert all(response.status_code == 200 for response in responses)
+    assert all(r.json()["answer"] == "Shared answer." for r in responses)
+    assert len(calls) == 2
+    assert app_main.ask_flight.stats()["collapsed"] == 4
+
+
+@pytest.mark.asyncio
+async def test_questions_after_a_corpus_change_are_not_coalesced(monkeypatch, client):
+    """Test that a request made after the corpus changed starts its own call."""
+    calls = []
+
+    async def slow_answer(query: str, k: int = 4, **_kwargs):
+        calls.append((query, k))
+        number = len(calls)
+        await asyncio.sleep(0.2)
+        return {"answer": f"Answer {number}.", "sources": []}
+
+    monkeypatch.setattr("app.main.aanswer_question", slow_answer)
+    monkeypatch.setattr("app.main.ask_flight", SingleFlight())
+
+    async def ask_after_upload():
+        await asyncio.sleep(0.05)
+        bump_corpus_version()
+        return await client.post("/ask", json={"question": "Who won in 2023?"})
+
+    before, after = await asyncio.gather(
+        client.post("/ask", json={"question": "Who won in 2023?"}), ask_after_upload()
+    )
+
+    assert len(calls) == 2
+    assert before.json()["answer"] != after.json()["answer"]
@@ -0,0 +1,40 @@
+"""Unit tests for token-budgeted context assembly."""
+
+from langchain_core.documents import Document
+
+from app.context import build_context, count_tokens, merge_overlapping
+
+MODEL = "gpt-3.5-turbo"
+
+
+def test_merge_overlapping_stitches_adjacent_chunks():
+    """Test that a repeated boundary is kept once when chunks are merged."""
+    first = "The Nuggets won the title in 2023 after beating the Heat"
+    second = "after beating the Heat in five games."
+
+    assert merge_overlapping(first, second) == (
+        "The Nuggets won the title in 2023 after beating the Heat in five games."
+    )
+    assert merge_overlapping(second, first) is None
+    assert merge_overlapping(first, "won the title") == first
+
+
+def test_build_context_packs_best_chunks_within_budget():
+    """Test that chunks are packed best first, merged, and kept under budget."""
+    meta = {"source": "nuggets.txt"}
+    docs = [
+        (Document(page_content="Jokic won Finals MVP for the Nuggets.", metadata=meta), 0.1),
+        (Document(page_content="for the Nuggets. Murray added 21 points.", metadata=meta), 0.2),
+        (Document(page_content="Unrelated filler text. " * 40, metadata={"source": "x"}), 0.3),
+        (Document(page_content="Ball Arena is in Denver.", metadata={"source": "y"}), 0.4),
+    ]
+    budget = 40
+
+    context = build_context(docs, MODEL, budget=budget)
+
+    assert context.passages[0] == (
+        "Jokic won Finals MVP for the Nuggets. Murray added 21 points."
+    )
+    assert [score for _, score in context.docs_and_scores] == [0.1, 0.2, 0.4]
+    assert context.tokens <= budget
+    assert context.tokens == sum(count_tokens(p, MODEL) for p in context.passages)
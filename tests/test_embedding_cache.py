@@ -0,0 +1,76 @@
+"""Unit tests for the persistent embedding cache."""
+
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from app.embedding_cache import CachedEmbeddings, EmbeddingCache
+
+
+class CountingEmbeddings(DeterministicFakeEmbedding):
+    """Fake embeddings that record how many texts were sent to the model."""
+
+    calls: int = 0
+
+    def embed_documents(self, texts):
+        self.calls += len(texts)
+        return super().embed_documents(texts)
+
+
+def test_cached_embeddings_only_embed_new_text(tmp_path):
+    """Test that repeated text is served from the cache."""
+    underlying = CountingEmbeddings(size=8)
+    cache = EmbeddingCache(path=str(tmp_path / "cache.sqlite3"))
+    embeddings = CachedEmbeddings(underlying, cache=cache)
+
+    first = embeddings.embed_documents(["alpha", "beta", "alpha"])
+    second = embeddings.embed_documents(["beta", "gamma"])
+
+    assert underlying.calls == 3
+    assert first[0] == first[2]
+    assert second[0] == first[1]
+    assert cache.stats()["hits"] == 1
+
+    # A new process reading the same file pays for nothing
+    reopened = CachedEmbeddings(
+        underlying, cache=EmbeddingCache(path=str(tmp_path / "cache.sqlite3"))
+    )
+    reopened.embed_documents(["alpha", "beta", "gamma"])
+    assert underlying.calls == 3
+
+
+def test_embedding_cache_evicts_least_recently_used(tmp_path):
+    """Test that the cache evicts the least recently used entries over its cap."""
+    cache = EmbeddingCache(path=str(tmp_path / "cache.sqlite3"), max_entries=2)
+    cache.put_many({"a": [1.0], "b": [2.0]})
+    cache.get_many(["a"])
+    cache.put_many({"c": [3.0]})
+
+    assert set(cache.get_many(["a", "b", "c"])) == {"a", "c"}
+    assert cache.stats()["entries"] == 2
+
+
+def test_embedding_cache_counts_entries_without_rescanning(tmp_path):
+    """Test that rewriting a cached key does not inflate the entry count."""
+    cache = EmbeddingCache(path=str(tmp_path / "cache.sqlite3"), max_entries=3)
+    cache.put_many({"a": [1.0], "b": [2.0]})
+    cache.put_many({"b": [2.0], "c": [3.0]})
+
+    assert cache.stats()["entries"] == 3
+    assert set(cache.get_many(["a", "b", "c"])) == {"a", "b", "c"}
+    assert EmbeddingCache(path=str(tmp_path / "cache.sqlite3")).stats()["entries"] == 3
+
+
+@pytest.mark.asyncio
+async def test_async_embeddings_cache_documents_but_not_queries(tmp_path):
+    """Test that the async path caches chunk text and leaves queries uncached."""
+    underlying = CountingEmbeddings(size=8)
+    cache = EmbeddingCache(path=str(tmp_path / "cache.sqlite3"))
+    embeddings = CachedEmbeddings(underlying, cache=cache)
+
+    first = await embeddings.aembed_documents(["alpha", "beta"])
+    second = await embeddings.aembed_documents(["alpha"])
+    await embeddings.aembed_query("who won?")
+
+    assert second == first[:1]
+    assert underlying.calls == 2
+    assert cache.stats()["entries"] == 2
@@ -6,7 +6,7 @@ import pytest
 
 
 @pytest.mark.asyncio
-async def test_full_flow_file_upload_and_ask_question_success(client):
+async def test_full_flow_file_upload_and_ask_question_success(client, wait_for_job):
     """Test complete flow of file upload and question answering."""
     # Setup: Create a small test file
     test_file_path = Path("tests/test_files/full_flow.txt")
@@ -20,8 +20,9 @@ async def test_full_flow_file_upload_and_ask_question_success(client):
                 "/upload", files={"file": (test_file_path.name, f, "text/plain")}
             )
 
-        assert upload_response.status_code == 200
-        assert "chunks" in upload_response.json()["message"]
+        assert upload_response.status_code == 202
+        job = await wait_for_job(upload_response.json()["job_id"])
+        assert job["status"] in ("completed", "duplicate")
 
         # Step 2: Ask a question related to the content
         question_payload = {"question": "What does LangChain help with?", "k": 2}
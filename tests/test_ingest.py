@@ -0,0 +1,131 @@
+"""Unit tests for single-file ingestion."""
+
+from fpdf import FPDF
+
+from app.ingest import (delete_file, estimate_ingestion, find_documents,
+                        ingest_single_file, name_collisions)
+from app.manifest import file_sha256
+from app.utils.file_loader import (load_document, make_chunk_ids,
+                                   split_documents)
+
+
+def test_update_reembeds_only_changed_chunks(ingest_store, tmp_path):
+    """Test that updating a file keeps unchanged chunk IDs and swaps the rest."""
+    vectordb, manifest = ingest_store.vectordb, ingest_store.manifest
+
+    sections = [f"Section {i}. " + f"Policy text number {i}. " * 20 for i in range(6)]
+    path = tmp_path / "handbook.txt"
+    path.write_text("\n\n".join(sections))
+    first = ingest_single_file(str(path))
+    original_ids = set(manifest.get("handbook.txt")["chunk_ids"])
+
+    sections[2] = "Section 2. The policy was rewritten this week. " * 5
+    path.write_text("\n\n".join(sections))
+    assert ingest_single_file(str(path)) == "duplicate"
+    second = ingest_single_file(str(path), update=True)
+
+    updated_ids = set(manifest.get("handbook.txt")["chunk_ids"])
+    assert second["chunks_added"] < first["chunks_added"]
+    assert second["chunks_unchanged"] == len(original_ids & updated_ids) > 0
+    assert second["chunks_removed"] == len(original_ids - updated_ids) > 0
+    stored = vectordb.get()["ids"]
+    assert set(stored) == updated_ids
+
+    assert ingest_single_file(str(path), update=True) == "duplicate"
+
+
+def test_ingest_streams_pdf_in_page_windows(ingest_store, monkeypatch, tmp_path):
+    """Test that a PDF is ingested a page window at a time with whole-file IDs."""
+    vectordb, manifest = ingest_store.vectordb, ingest_store.manifest
+    monkeypatch.setattr("app.ingest.PAGE_WINDOW", 2)
+
+    pdf = FPDF()
+    pdf.set_font("Arial", size=12)
+    for page in range(5):
+        pdf.add_page()
+        pdf.cell(200, 8, txt=f"Page {page} of the manual.", ln=True)
+    path = str(tmp_path / "manual.pdf")
+    pdf.output(path)
+    expected = make_chunk_ids(split_documents(load_document(path), "manual.pdf"))
+
+    pages = []
+
+    def progress(stage, **counts):
+        if stage == "parsed":
+            pages.append(counts["pages_parsed"])
+
+    result = ingest_single_file(path, progress=progress)
+
+    assert pages == [2, 4, 5]
+    assert result == {"filename": "manual.pdf", "chunks_added": len(expected)}
+    assert manifest.get("manual.pdf")["chunk_ids"] == expected
+    assert set(vectordb.get()["ids"]) == set(expected)
+
+
+def test_delete_file_removes_only_that_source(ingest_store, tmp_path):
+    """Test that deleting a file leaves other files' chunks in place."""
+    vectordb, manifest = ingest_store.vectordb, ingest_store.manifest
+
+    for name in ("keep.txt", "drop.txt"):
+        path = tmp_path / name
+        path.write_text(f"Contents of {name}. " * 60)
+        ingest_single_file(str(path))
+    # A chunk written before the manifest tracked chunk IDs
+    vectordb.add_texts(["Legacy chunk."], metadatas=[{"source": "drop.txt"}])
+    kept = set(manifest.get("keep.txt")["chunk_ids"])
+
+    removed = delete_file("drop.txt")
+
+    assert removed > 1
+    assert manifest.get("drop.txt") is None
+    assert set(vectordb.get()["ids"]) == kept
+    assert delete_file("drop.txt") == 0
+
+
+def test_find_documents_recurses_and_filters(tmp_path):
+    """Test that supported files are found in subdirectories, hidden ones skipped."""
+    for name in ("a.txt", "team/b.md", "team/deep/c.pdf", "team/d.png", ".git/e.txt"):
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("content")
+
+    found = find_documents(str(tmp_path))
+
+    assert [p[len(str(tmp_path)) + 1 :] for p in found] == [
+        "a.txt",
+        "team/b.md",
+        "team/deep/c.pdf",
+    ]
+
+
+def test_name_collisions_groups_paths_by_base_name():
+    """Test that only base names used by several paths are reported."""
+    paths = ["docs/a/notes.txt", "docs/b/notes.txt", "docs/readme.md"]
+
+    assert name_collisions(paths) == {"notes.txt": paths[:2]}
+
+
+def test_estimate_ingestion_skips_stored_files(ingest_store, monkeypatch, tmp_path):
+    """Test that a dry run counts chunks and tokens of new files only."""
+    manifest = ingest_store.manifest
+    monkeypatch.setattr("app.ingest.count_tokens", lambda text, model: len(text.split()))
+    new = tmp_path / "new.txt"
+    new.write_text("Fresh words to embed. " * 100)
+    stored = tmp_path / "stored.txt"
+    stored.write_text("Already embedded.")
+    manifest.record("stored.txt", file_sha256(str(stored)), [])
+    renamed = tmp_path / "edited" / "stored.txt"
+    renamed.parent.mkdir()
+    renamed.write_text("Edited since it was embedded.")
+    chunks = split_documents(load_document(str(new)), "new.txt")
+
+    counts = estimate_ingestion([str(new), str(stored), str(renamed)])
+
+    assert counts == {
+        "files": 1,
+        "duplicates": 1,
+        "conflicts": 1,
+        "failed": 0,
+        "chunks": len(chunks),
+        "tokens": sum(len(chunk.page_content.split()) for chunk in chunks),
+    }
@@ -0,0 +1,75 @@
+"""Unit tests for the background ingestion job queue."""
+
+import asyncio
+
+import pytest
+
+from app.jobs import JobQueue, QueueFullError
+
+
+@pytest.mark.asyncio
+async def test_job_queue_reports_progress_and_completion(monkeypatch):
+    """Test that workers forward progress and completion events."""
+    events = []
+
+    async def notify(event):
+        events.append(event)
+
+    def fake_ingest(_file_path, sha256=None, progress=None, **_kwargs):
+        progress("parsed", pages_parsed=3)
+        progress("embedding", chunks_embedded=10, chunks_total=10)
+        return {"filename": "doc.txt", "chunks_added": 10}
+
+    monkeypatch.setattr("app.jobs.ingest_single_file", fake_ingest)
+
+    queue = JobQueue(notify=notify, workers=1, depth=4)
+    job = queue.submit("uploaded_docs/doc.txt", "doc.txt", "abc")
+    while not job.done:
+        await asyncio.sleep(0.01)
+    await queue.stop()
+
+    assert job.status == "completed"
+    assert job.progress == {"pages_parsed": 3, "chunks_embedded": 10, "chunks_total": 10}
+    assert events[-1]["type"] == "job_completed"
+    assert any(event["job"]["stage"] == "parsed" for event in events)
+
+
+@pytest.mark.asyncio
+async def test_job_queue_rejects_work_when_full():
+    """Test that submitting beyond the queue depth raises QueueFullError."""
+
+    async def notify(_event):
+        pass
+
+    queue = JobQueue(notify=notify, workers=0, depth=1)
+    queue.submit("a.txt", "a.txt", "hash-a")
+
+    with pytest.raises(QueueFullError):
+        queue.submit("b.txt", "b.txt", "hash-b")
+    assert queue.queued == 1
+
+
+@pytest.mark.asyncio
+async def test_bulk_job_runs_its_task_and_claims_its_files():
+    """Test that a bulk job runs its task and counts as active for each file."""
+
+    async def notify(_event):
+        pass
+
+    def task(progress):
+        progress("ingesting", files_done=2, files_total=2)
+        return {"filename": "team.zip", "chunks_added": 4}
+
+    queue = JobQueue(notify=notify, workers=1, depth=4)
+    job = queue.submit_bulk("team.zip", [("a.txt", "hash-a"), ("b.txt", "hash-b")], task)
+
+    assert queue.find_active("b.txt", "other") is job
+    assert queue.find_active("c.txt", "hash-a") is job
+    assert queue.find_active("c.txt", "hash-c") is None
+    while not job.done:
+        await asyncio.sleep(0.01)
+    await queue.stop()
+
+    assert job.status == "completed"
+    assert job.result["chunks_added"] == 4
+    assert job.progress == {"files_done": 2, "files_total": 2}
@@ -0,0 +1,74 @@
+"""Unit tests for the BM25 lexical index and hybrid retrieval."""
+
+import shutil
+
+from langchain_core.documents import Document
+
+from app import qa_chain
+from app.lexical_index import LexicalIndex
+
+
+def _doc(text: str, source: str = "roster.txt") -> Document:
+    return Document(page_content=text, metadata={"source": source})
+
+
+def test_lexical_index_finds_exact_identifiers(tmp_path):
+    """Test that rare terms and numbers rank first and deletes take effect."""
+    index = LexicalIndex(path=str(tmp_path / "lexical.sqlite3"))
+    index.add(
+        ["a", "b", "c"],
+        [
+            _doc("Nikola Jokic wore jersey number 15 for the Nuggets."),
+            _doc("Jamal Murray scored in the playoffs."),
+            _doc("The Nuggets won the championship."),
+        ],
+    )
+
+    results = index.search("Who wore number 15?", k=2)
+    assert results[0][0].id == "a"
+    assert results[0][1] > 0
+
+    index.delete(["a"])
+    assert index.count() == 2
+    assert all(doc.id != "a" for doc, _ in index.search("jersey 15", k=3))
+    assert index.search("?!", k=3) == []
+
+
+def test_recreate_survives_deleted_store_directory(tmp_path):
+    """Test that the index starts empty after its directory was removed."""
+    store = tmp_path / "store"
+    index = LexicalIndex(path=str(store / "lexical.sqlite3"))
+    index.add(["a"], [_doc("Ball arena hosts the Denver Nuggets.")])
+
+    shutil.rmtree(store)
+    index.recreate()
+    index.add(["b"], [_doc("Jamal Murray scored in the playoffs.")])
+
+    assert index.count() == 1
+    assert (store / "lexical.sqlite3").exists()
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    """Test that a chunk ranked well by both retrievers comes out on top."""
+    a, b, c = (Document(page_content=t, id=t) for t in ("a", "b", "c"))
+
+    fused = qa_chain.reciprocal_rank_fusion(
+        [[(a, 0.1), (b, 0.2), (c, 0.3)], [(b, 9.0), (c, 5.0)]], k=2
+    )
+
+    assert [doc.id for doc, _ in fused] == ["b", "c"]
+
+
+def test_lexical_mode_skips_embedding(monkeypatch, tmp_path):
+    """Test that lexical-only retrieval never calls the embeddings API."""
+    index = LexicalIndex(path=str(tmp_path / "lexical.sqlite3"))
+    index.add(["a"], [_doc("Ball arena hosts the Denver Nuggets.")])
+
+    def no_embedding(_query):
+        raise AssertionError("lexical retrieval must not embed the query")
+
+    monkeypatch.setattr(qa_chain, "embed_query", no_embedding)
+    monkeypatch.setattr(qa_chain, "get_lexical_index", lambda: index)
+
+    results = qa_chain.get_docs_with_scores("Ball arena", k=1, mode="lexical")
+    assert results[0][0].metadata["source"] == "roster.txt"
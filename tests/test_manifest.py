@@ -0,0 +1,67 @@
+"""Unit tests for the ingest manifest."""
+
+from app.manifest import (DuplicateFilter, IngestCheckpoint, IngestManifest,
+                          file_sha256)
+
+
+def test_manifest_detects_duplicate_by_name_and_content(tmp_path):
+    """Test duplicate detection by filename and by content hash."""
+    doc = tmp_path / "original.txt"
+    doc.write_text("Same bytes, different name.")
+    sha256 = file_sha256(str(doc))
+
+    manifest = IngestManifest(path=str(tmp_path / "manifest.json"))
+    assert manifest.find_duplicate("original.txt", sha256) is None
+
+    manifest.record("original.txt", sha256, ["id-1", "id-2"])
+
+    assert manifest.find_duplicate("original.txt", "other-hash") == "original.txt"
+    assert manifest.find_duplicate("renamed.txt", sha256) == "original.txt"
+    assert manifest.find_duplicate("unrelated.txt", "other-hash") is None
+
+
+def test_duplicate_filter_tells_conflicts_from_duplicates(tmp_path):
+    """Test that a reused name with new content is a conflict, not a duplicate."""
+    manifest = IngestManifest(path=str(tmp_path / "manifest.json"))
+    manifest.record("notes.txt", "stored", [])
+    duplicates = DuplicateFilter(manifest)
+
+    assert duplicates.check("copy.txt", "stored") == ("duplicate", "notes.txt")
+    assert duplicates.check("notes.txt", "edited") == ("conflict", "notes.txt")
+    assert duplicates.check("a.txt", "first") == ("new", None)
+    assert duplicates.check("a.txt", "second") == ("conflict", "a.txt")
+    assert duplicates.check("b.txt", "first") == ("duplicate", "a.txt")
+
+
+def test_manifest_persists_and_removes_entries(tmp_path):
+    """Test that manifest entries survive a reload and can be removed."""
+    # Saving creates the store directory the manifest lives in
+    path = str(tmp_path / "vector_store" / "manifest.json")
+    IngestManifest(path=path).record("a.txt", "abc", ["id-1"])
+
+    reloaded = IngestManifest(path=path)
+    assert reloaded.get("a.txt")["chunk_ids"] == ["id-1"]
+    assert reloaded.find_by_hash("abc") == "a.txt"
+
+    entry = reloaded.remove("a.txt")
+    assert entry["chunk_ids"] == ["id-1"]
+    assert IngestManifest(path=path).get("a.txt") is None
+
+
+def test_checkpoint_replays_an_interrupted_run(tmp_path):
+    """Test that files logged before a crash are recovered into the manifest."""
+    path = str(tmp_path / "manifest.json")
+    checkpoint = IngestCheckpoint(path=str(tmp_path / "checkpoint.jsonl"))
+    checkpoint.append("a.txt", "abc", ["id-1"])
+    checkpoint.append("b.txt", "def", ["id-2", "id-3"])
+    # Simulate the process dying halfway through writing a line
+    with open(checkpoint.path, "a", encoding="utf-8") as f:
+        f.write('{"filename": "c.tx')
+
+    manifest = IngestManifest(path=path)
+    assert IngestCheckpoint(path=checkpoint.path).replay(manifest) == 2
+
+    reloaded = IngestManifest(path=path)
+    assert sorted(reloaded.filenames()) == ["a.txt", "b.txt"]
+    assert reloaded.get("b.txt")["chunk_ids"] == ["id-2", "id-3"]
+    assert not (tmp_path / "checkpoint.jsonl").exists()
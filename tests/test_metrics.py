@@ -0,0 +1,49 @@
+"""Tests for stage timing metrics and the /metrics endpoint."""
+
+import asyncio
+
+import pytest
+
+from app.concurrency import run_in_thread
+from app.metrics import Histogram, timed
+
+
+def test_histogram_renders_cumulative_buckets():
+    """Test that observations land in cumulative buckets per label."""
+    histogram = Histogram("test_seconds", "Test stage durations.", "stage", buckets=(0.1, 1))
+    histogram.observe("parse", 0.05)
+    histogram.observe("parse", 0.5)
+    histogram.observe("parse", 5)
+
+    lines = histogram.render()
+
+    assert 'test_seconds_bucket{stage="parse",le="0.1"} 1' in lines
+    assert 'test_seconds_bucket{stage="parse",le="1"} 2' in lines
+    assert 'test_seconds_bucket{stage="parse",le="+Inf"} 3' in lines
+    assert 'test_seconds_count{stage="parse"} 3' in lines
+
+
+@pytest.mark.asyncio
+async def test_stage_timings_reach_metrics_and_server_timing(monkeypatch, client):
+    """Test that a stage timed in a worker thread is reported for the request."""
+
+    def slow_stage():
+        with timed("vector_search"):
+            asyncio.run(asyncio.sleep(0.01))
+
+    async def mock_answer_question(_query: str, _k: int = 4, **_kwargs):
+        await run_in_thread(slow_stage)
+        return {"answer": "Timed answer.", "sources": []}
+
+    monkeypatch.setattr("app.main.aanswer_question", mock_answer_question)
+
+    response = await client.post("/ask", json={"question": "How long did it take?"})
+    metrics = await client.get("/metrics")
+
+    assert response.status_code == 200
+    assert "vector_search;dur=" in response.headers["server-timing"]
+    assert "total;dur=" in response.headers["server-timing"]
+    assert metrics.status_code == 200
+    assert 'docqa_stage_seconds_count{stage="vector_search"}' in metrics.text
+    assert "docqa_job_queue_depth 0" in metrics.text
+    assert "docqa_answer_cache_hits_total" in metrics.text
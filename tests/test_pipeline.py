@@ -0,0 +1,125 @@
+"""Unit tests for the bulk ingestion pipeline."""
+
+from pathlib import Path
+
+from fpdf import FPDF
+
+from app.manifest import IngestCheckpoint, IngestManifest, file_sha256
+from app.pipeline import ingest_bulk, page_windows
+from app.utils.file_loader import (load_document, make_chunk_ids,
+                                   split_documents)
+
+
+def test_ingest_bulk_batches_across_files(ingest_store, tmp_path):
+    """Test that chunks from several files are embedded and written in batches."""
+    vectordb, manifest = ingest_store.vectordb, ingest_store.manifest
+
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"doc_{i}.txt"
+        path.write_text(f"Document {i} sentence. " * 100)
+        paths.append(str(path))
+
+    results, stats = ingest_bulk(paths, workers=0, batch_size=5)
+
+    total = sum(result["chunks_added"] for result in results)
+    assert total == vectordb._collection.count()  # pylint: disable=protected-access
+    assert stats.items["parse"] == 3
+    assert stats.items["write"] == total
+    assert sorted(manifest.filenames()) == ["doc_0.txt", "doc_1.txt", "doc_2.txt"]
+
+    rerun, _ = ingest_bulk(paths, workers=0, batch_size=5)
+    assert rerun == ["duplicate"] * 3
+
+
+def test_ingest_bulk_reports_name_conflicts(ingest_store, tmp_path):
+    """Test that different files sharing a base name are not taken as duplicates."""
+    paths = []
+    for team in ("a", "b"):
+        path = tmp_path / team / "notes.txt"
+        path.parent.mkdir()
+        path.write_text(f"Notes of team {team}. " * 50)
+        paths.append(str(path))
+
+    results, _ = ingest_bulk(paths, workers=0)
+
+    assert results[0]["filename"] == "notes.txt"
+    assert results[1] == "conflict"
+    assert ingest_store.manifest.find_by_hash(file_sha256(paths[0])) == "notes.txt"
+
+    Path(paths[0]).write_text("Edited notes. " * 50)
+    rerun, _ = ingest_bulk(paths[:1], workers=0)
+    assert rerun == ["conflict"]
+
+
+def test_ingest_bulk_parses_pdf_page_windows_in_workers(ingest_store, tmp_path):
+    """Test that a PDF parsed in page windows by workers gets whole-file chunk IDs."""
+    vectordb, manifest = ingest_store.vectordb, ingest_store.manifest
+
+    pdf = FPDF()
+    pdf.set_font("Arial", size=12)
+    for page in range(5):
+        pdf.add_page()
+        for line in range(30):
+            pdf.cell(200, 8, txt=f"Page {page} line {line} of the manual.", ln=True)
+    path = str(tmp_path / "manual.pdf")
+    pdf.output(path)
+    expected = make_chunk_ids(split_documents(load_document(path), "manual.pdf"))
+
+    assert page_windows(path, page_window=2) == [(0, 2), (2, 4), (4, 5)]
+    results, stats = ingest_bulk([path], workers=2, batch_size=4, page_window=2)
+
+    assert results == [{"filename": "manual.pdf", "chunks_added": len(expected)}]
+    assert manifest.get("manual.pdf")["chunk_ids"] == expected
+    assert vectordb._collection.count() == len(expected)  # pylint: disable=protected-access
+    assert stats.items["parse"] == 1
+
+
+class _CountingManifest(IngestManifest):
+    """Manifest that counts how often it is written to disk."""
+
+    saves = 0
+
+    def save(self):
+        self.saves += 1
+        super().save()
+
+
+class _RecordingCheckpoint(IngestCheckpoint):
+    """Checkpoint that remembers which files it logged."""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.logged = []
+
+    def append(self, filename, sha256, chunk_ids):
+        self.logged.append(filename)
+        super().append(filename, sha256, chunk_ids)
+
+
+def test_ingest_bulk_checkpoint_saves_manifest_once(ingest_store, tmp_path):
+    """Test that a checkpointed run logs each file instead of saving the manifest."""
+    manifest = ingest_store.manifest = _CountingManifest(path=ingest_store.manifest.path)
+    checkpoint = _RecordingCheckpoint(str(tmp_path / "checkpoint.jsonl"))
+
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"doc_{i}.txt"
+        path.write_text(f"Document {i} sentence. " * 50)
+        paths.append(str(path))
+    finished = []
+
+    ingest_bulk(
+        paths,
+        workers=0,
+        batch_size=5,
+        checkpoint=checkpoint,
+        progress=lambda file_path, result: finished.append(file_path),
+    )
+
+    assert sorted(checkpoint.logged) == ["doc_0.txt", "doc_1.txt", "doc_2.txt"]
+    assert sorted(finished) == paths
+    # Once before the run, so a crash never leaves the store without one, and once after
+    assert manifest.saves == 2
+    assert sorted(IngestManifest(path=manifest.path).filenames()) == sorted(checkpoint.logged)
+    assert not (tmp_path / "checkpoint.jsonl").exists()
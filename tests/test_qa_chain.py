@@ -0,0 +1,137 @@
+"""Unit tests for answer generation in the QA chain."""
+
+import pytest
+from fastapi.testclient import TestClient
+from langchain_core.documents import Document
+from langchain_core.language_models import FakeListChatModel
+from langchain_core.messages import AIMessage
+
+from app import main, qa_chain
+from app.answer_cache import AnswerCache
+
+
+class ExplodingChatModel(FakeListChatModel):
+    """Chat model that fails the test if it is ever called."""
+
+    def _call(self, *args, **kwargs):
+        raise AssertionError("the LLM must not be called")
+
+
+class PoolBoundChatModel:  # pylint: disable=too-few-public-methods
+    """Chat model stand-in that fails like ChatOpenAI once its pool is closed."""
+
+    def __init__(self, http_async_client, **_kwargs):
+        self.pool = http_async_client
+
+    async def ainvoke(self, _messages):
+        if self.pool.is_closed:
+            raise RuntimeError("Connection error.")
+        return AIMessage(content="Denver.")
+
+
+@pytest.mark.asyncio
+async def test_empty_retrieval_skips_llm(monkeypatch):
+    """Test that no retrieved chunks returns the canned answer without the LLM."""
+
+    async def no_docs(_query, **_kwargs):
+        return []
+
+    async def fake_embed(_query):
+        return [1.0, 0.0]
+
+    stats = qa_chain.LLMCallStats()
+    monkeypatch.setattr(qa_chain, "answer_cache", AnswerCache())
+    monkeypatch.setattr(qa_chain, "llm_calls", stats)
+    monkeypatch.setattr(qa_chain, "aembed_query", fake_embed)
+    monkeypatch.setattr(qa_chain, "aget_docs_with_scores", no_docs)
+    monkeypatch.setattr(qa_chain, "llm", ExplodingChatModel(responses=[]))
+
+    result = await qa_chain.aanswer_question("Who won in 1850?")
+
+    assert result["answer"] == qa_chain.NO_ANSWER
+    assert result["sources"] == []
+    assert result["prompt_tokens"] == 0
+    assert stats.stats() == {"calls": 0, "skipped": 1, "skip_rate": 1.0}
+
+
+def test_relevant_chunks_call_llm(monkeypatch):
+    """Test that the LLM is called and counted when there is context."""
+
+    async def some_docs(_query, **_kwargs):
+        return [(Document(page_content="Denver won.", metadata={"source": "a.txt"}), 0.1)]
+
+    async def fake_embed(_query):
+        return [1.0, 0.0]
+
+    stats = qa_chain.LLMCallStats()
+    monkeypatch.setattr(qa_chain, "answer_cache", AnswerCache())
+    monkeypatch.setattr(qa_chain, "llm_calls", stats)
+    monkeypatch.setattr(qa_chain, "aembed_query", fake_embed)
+    monkeypatch.setattr(qa_chain, "aget_docs_with_scores", some_docs)
+    monkeypatch.setattr(qa_chain, "llm", FakeListChatModel(responses=["Denver."]))
+
+    result = qa_chain.answer_question("Who won?")
+
+    assert result["answer"] == "Denver."
+    assert result["prompt_tokens"] > 0
+    assert stats.stats()["calls"] == 1
+
+
+@pytest.mark.asyncio
+async def test_batch_shares_embedding_and_retrieval_calls(monkeypatch):
+    """Test that a batch embeds once, searches once and isolates item errors."""
+    embed_calls, search_calls = [], []
+
+    async def fake_embed_many(queries):
+        queries = list(queries)
+        embed_calls.append(queries)
+        return [[float(i), 1.0] for i in range(len(queries))]
+
+    def fake_search_many(queries, _k, _embeddings, _mode, **_options):
+        search_calls.append(queries)
+        return [
+            [(Document(page_content=f"About {q}", metadata={"source": "a.txt"}), 0.1)]
+            for q in queries
+        ]
+
+    class FlakyChatModel(FakeListChatModel):
+        """Fails for one specific question."""
+
+        def _call(self, messages, *args, **kwargs):
+            if "broken" in messages[0].content:
+                raise RuntimeError("model unavailable")
+            return "An answer."
+
+    monkeypatch.setattr(qa_chain, "answer_cache", AnswerCache())
+    monkeypatch.setattr(qa_chain, "aembed_queries", fake_embed_many)
+    monkeypatch.setattr(qa_chain, "_search_many", fake_search_many)
+    monkeypatch.setattr(qa_chain, "llm", FlakyChatModel(responses=[]))
+
+    results = await qa_chain.aanswer_batch(["first", "broken", " ", "third"])
+
+    assert len(embed_calls) == len(search_calls) == 1
+    assert embed_calls[0] == ["first", "broken", "third"]
+    assert [r["question"] for r in results] == ["first", "broken", " ", "third"]
+    assert results[0]["answer"] == "An answer."
+    assert results[1]["error"] == "model unavailable"
+    assert results[2]["error"] == "Question cannot be empty."
+    assert results[3]["cached"] is False
+
+
+def test_chat_client_is_rebuilt_after_a_lifespan(monkeypatch):
+    """Test that /ask works in a second app lifespan after the pools were closed."""
+
+    async def some_docs(_query, **_kwargs):
+        return [(Document(page_content="Denver won.", metadata={"source": "a.txt"}), 0.1)]
+
+    monkeypatch.setattr("langchain_openai.ChatOpenAI", PoolBoundChatModel)
+    monkeypatch.setattr(qa_chain, "llm", None)
+    monkeypatch.setattr(qa_chain, "answer_cache", AnswerCache())
+    monkeypatch.setattr(qa_chain, "aget_docs_with_scores", some_docs)
+    monkeypatch.setattr(main, "WARM_START", False)
+
+    for question in ("Who won?", "Who won again?"):
+        with TestClient(main.app) as client:
+            response = client.post("/ask", json={"question": question, "mode": "lexical"})
+        assert response.status_code == 200
+        assert response.json()["answer"] == "Denver."
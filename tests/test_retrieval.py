@@ -0,0 +1,49 @@
+"""Unit tests for MMR and score-threshold retrieval options."""
+
+import numpy as np
+from langchain_chroma import Chroma
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from app import qa_chain
+
+
+def test_mmr_skips_near_duplicates():
+    """Test that MMR prefers a distinct chunk over a near-copy of the first pick."""
+    vectors = qa_chain._normalize_rows(  # pylint: disable=protected-access
+        np.array([[1.0, 0.0], [0.99, 0.05], [0.6, 0.8]], dtype=np.float32)
+    )
+    query = np.array([0.95, 0.9, 0.6], dtype=np.float32)
+
+    assert qa_chain.maximal_marginal_relevance(query, vectors, k=2, lambda_mult=1.0) == [0, 1]
+    assert qa_chain.maximal_marginal_relevance(query, vectors, k=2, lambda_mult=0.5) == [0, 2]
+    assert qa_chain.maximal_marginal_relevance(query[:0], vectors[:0], k=2) == []
+
+
+def test_retrieval_options_filter_and_diversify(monkeypatch, tmp_path):
+    """Test that score_threshold drops chunks and MMR removes exact duplicates."""
+    embeddings = DeterministicFakeEmbedding(size=16)
+    vectordb = Chroma(
+        collection_name="retrieval_test",
+        persist_directory=str(tmp_path / "store"),
+        embedding_function=embeddings,
+    )
+    vectordb.add_texts(
+        ["Denver won.", "Denver won.", "Miami lost.", "Boston rested."],
+        ids=["a", "b", "c", "d"],
+    )
+    monkeypatch.setattr(qa_chain, "get_vectordb", lambda: vectordb)
+    query = embeddings.embed_query("Denver won.")
+
+    plain = qa_chain.get_docs_with_scores("Denver won.", k=2, embedding=query)
+    assert [doc.page_content for doc, _ in plain] == ["Denver won.", "Denver won."]
+
+    diverse = qa_chain.get_docs_with_scores(
+        "Denver won.", k=2, embedding=query, fetch_k=4, mmr_lambda=0.5
+    )
+    assert [doc.page_content for doc, _ in diverse][0] == "Denver won."
+    assert diverse[1][0].page_content != "Denver won."
+
+    strict = qa_chain.get_docs_with_scores(
+        "Denver won.", k=4, embedding=query, score_threshold=0.99
+    )
+    assert {doc.id for doc, _ in strict} == {"a", "b"}
@@ -0,0 +1,34 @@
+"""Tests that importing the app stays cheap."""
+
+import os
+import subprocess
+import sys
+
+# Heavy packages that must only be imported on first use
+DEFERRED = (
+    "chromadb",
+    "langchain_openai",
+    "langchain_community.document_loaders.pdf",
+    "langsmith.run_helpers",
+)
+
+
+def test_importing_app_defers_heavy_clients():
+    """Test that importing app.main loads no model, store or loader clients."""
+    env = {key: value for key, value in os.environ.items() if key != "OPENAI_API_KEY"}
+    # Explicit values win over a developer's .env, which may enable tracing
+    env.update(LANGSMITH_TRACING="false", LANGCHAIN_TRACING_V2="false")
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, app.main; "
+            f"print([m for m in {DEFERRED!r} if m in sys.modules])",
+        ],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert result.stdout.strip() == "[]"
@@ -0,0 +1,61 @@
+"""Tests for the streaming question answering endpoints."""
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.metrics import STAGE_SECONDS
+
+
+async def mock_astream_answer(_query: str, _k: int = 4, **_kwargs):
+    """Yield a fixed stream of answer events."""
+    yield {
+        "type": "sources",
+        "sources": [{"source": "sample.txt", "snippet": "Mock...", "score": 0.2}],
+    }
+    yield {"type": "token", "content": "Lang"}
+    yield {"type": "token", "content": "Chain."}
+    yield {"type": "done", "answer": "LangChain.", "cached": False}
+
+
+@pytest.mark.asyncio
+async def test_ask_stream_ndjson_sends_sources_before_tokens(monkeypatch, client):
+    """Test that streamed events arrive in order with timing fields."""
+    monkeypatch.setattr("app.main.astream_answer", mock_astream_answer)
+    before = STAGE_SECONDS.snapshot().get("ttft", {"count": 0})["count"]
+
+    response = await client.post(
+        "/ask/stream?format=ndjson", json={"question": "What is this?", "k": 2}
+    )
+
+    assert response.status_code == 200
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert [event["type"] for event in events] == ["sources", "token", "token", "done"]
+    assert "ttfb_ms" in events[0]
+    assert events[-1]["answer"] == "LangChain."
+    assert events[-1]["first_token_ms"] is not None
+    assert STAGE_SECONDS.snapshot()["ttft"]["count"] == before + 1
+
+
+@pytest.mark.asyncio
+async def test_ask_stream_sse_format(monkeypatch, client):
+    """Test that the default format is Server-Sent Events."""
+    monkeypatch.setattr("app.main.astream_answer", mock_astream_answer)
+
+    response = await client.post("/ask/stream", json={"question": "What is this?"})
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.text.startswith("event: sources\ndata: ")
+
+
+def test_ask_websocket_streams_events(monkeypatch):
+    """Test that /ws/ask streams the same events over a WebSocket."""
+    monkeypatch.setattr("app.main.astream_answer", mock_astream_answer)
+
+    with TestClient(app).websocket_connect("/ws/ask") as websocket:
+        websocket.send_json({"question": "What is this?", "k": 2})
+        types = [websocket.receive_json()["type"] for _ in range(4)]
+
+    assert types == ["sources", "token", "token", "done"]
@@ -1,16 +1,20 @@
 """Unit tests for file upload functionality."""
 
+import hashlib
+import threading
 from datetime import datetime
 from pathlib import Path
 
 import pytest
 from fpdf import FPDF
 
+from app import main, uploads
 from app.main import active_connections
+from app.manifest import IngestManifest
 
 
 @pytest.mark.asyncio
-async def test_file_upload_success(client):
+async def test_file_upload_success(client, wait_for_job):
     """Test file upload with success."""
     test_file_path = Path("tests/test_files/sample.pdf")
     test_file_path.parent.mkdir(parents=True, exist_ok=True)
@@ -27,7 +31,11 @@ async def test_file_upload_success(client):
             "/upload", files={"file": ("sample.pdf", f, "application/pdf")}
         )
 
-    assert response.status_code == 200
+    # A previous run may already have ingested sample.pdf
+    assert response.status_code in (200, 202)
+    if response.status_code == 202:
+        job = await wait_for_job(response.json()["job_id"])
+        assert job["status"] == "completed"
 
 
 @pytest.mark.asyncio
@@ -49,7 +57,115 @@ async def test_file_upload_invalid_type(client):
 
 
 @pytest.mark.asyncio
-async def test_file_upload_duplicate(client):
+async def test_file_upload_too_large(client, monkeypatch, tmp_path):
+    """Test that an oversize upload is refused and leaves no partial file."""
+    monkeypatch.setattr(uploads, "MAX_UPLOAD_BYTES", 1024)
+    monkeypatch.setattr(uploads, "UPLOAD_STAGING_DIR", str(tmp_path))
+
+    response = await client.post(
+        "/upload", files={"file": ("large.txt", b"x" * 4096, "text/plain")}
+    )
+
+    assert response.status_code == 413
+    assert list(tmp_path.iterdir()) == []
+    assert not Path("uploaded_docs/large.txt").exists()
+
+
+@pytest.mark.asyncio
+async def test_file_upload_invalid_filename(client):
+    """Test that a file name with a path component is rejected."""
+    response = await client.post(
+        "/upload", files={"file": ("../escape.txt", b"content", "text/plain")}
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid filename."
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        b"not a multipart body",
+        b'--xyz\r\nContent-Disposition: form-data; name="file"; filename="cut.txt"\r\n'
+        b"\r\ntruncated before the closing boundary",
+    ],
+)
+@pytest.mark.asyncio
+async def test_file_upload_malformed_body(client, monkeypatch, tmp_path, body):
+    """Test that a broken or truncated multipart body is a 400, not a 500."""
+    monkeypatch.setattr(uploads, "UPLOAD_STAGING_DIR", str(tmp_path))
+
+    response = await client.post(
+        "/upload",
+        content=body,
+        headers={"content-type": "multipart/form-data; boundary=xyz"},
+    )
+
+    assert response.status_code == 400
+    assert "multipart" in response.json()["detail"]
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_file_upload_hashes_while_streaming(client, monkeypatch, tmp_path):
+    """Test that the streamed hash is used to skip a duplicate upload."""
+    content = b"line of text\n" * 200_000
+    seen = {}
+
+    # pylint: disable=too-few-public-methods
+    class FakeManifest:
+        """Manifest that treats every upload as a duplicate."""
+
+        def find_duplicate(self, filename, sha256, update=False):
+            """Record the hash the endpoint computed."""
+            seen.update(filename=filename, sha256=sha256, update=update)
+            return True
+
+    monkeypatch.setattr(main, "get_manifest", FakeManifest)
+    monkeypatch.setattr(uploads, "UPLOAD_STAGING_DIR", str(tmp_path))
+
+    response = await client.post(
+        "/upload", files={"file": ("streamed.txt", content, "text/plain")}
+    )
+
+    assert response.status_code == 200
+    assert "already exists" in response.json()["message"]
+    assert seen == {
+        "filename": "streamed.txt",
+        "sha256": hashlib.sha256(content).hexdigest(),
+        "update": False,
+    }
+    assert list(tmp_path.iterdir()) == []
+    assert not Path("uploaded_docs/streamed.txt").exists()
+
+
+@pytest.mark.asyncio
+async def test_delete_unknown_file(client, monkeypatch, tmp_path):
+    """Test that deleting an unknown file returns 404 without opening the store."""
+
+    def no_store():
+        raise AssertionError("the vector store must not be opened")
+
+    manifest = IngestManifest(path=str(tmp_path / "manifest.json"))
+    loaded_on = []
+
+    def load_manifest():
+        # A first load may rebuild from the store; it must not block the loop
+        loaded_on.append(threading.current_thread())
+        return manifest
+
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    monkeypatch.setattr("app.main.get_manifest", load_manifest)
+    monkeypatch.setattr("app.ingest.get_vectordb", no_store)
+    response = await client.delete("/files/never_uploaded.txt")
+
+    assert response.status_code == 404
+    assert response.json()["detail"] == "File not found."
+    assert loaded_on and threading.main_thread() not in loaded_on
+
+
+@pytest.mark.asyncio
+async def test_file_upload_duplicate(client, wait_for_job):
     """Test file upload with duplicate file."""
     test_file_path = Path("tests/test_files/sample.txt")
     test_file_path.parent.mkdir(parents=True, exist_ok=True)
@@ -57,7 +173,11 @@ async def test_file_upload_duplicate(client):
 
     # Upload once to ensure it's in the store
     with test_file_path.open("rb") as f:
-        await client.post("/upload", files={"file": ("sample.txt", f, "text/plain")})
+        first = await client.post(
+            "/upload", files={"file": ("sample.txt", f, "text/plain")}
+        )
+    if first.status_code == 202:
+        await wait_for_job(first.json()["job_id"])
 
     # Upload again to trigger "duplicate"
     with test_file_path.open("rb") as f:
@@ -70,7 +190,7 @@ async def test_file_upload_duplicate(client):
 
 
 @pytest.mark.asyncio
-async def test_websocket_notification_on_upload(monkeypatch, client):
+async def test_websocket_notification_on_upload(client, wait_for_job):
     """Test WebSocket notification during file upload."""
 
     # pylint: disable=too-few-public-methods
@@ -101,7 +221,9 @@ async def test_websocket_notification_on_upload(monkeypatch, client):
                 "/upload", files={"file": (filename, f, "text/plain")}
             )
 
-        assert response.status_code == 200
+        assert response.status_code == 202
+        job = await wait_for_job(response.json()["job_id"])
+        assert job["status"] == "completed"
         assert fake_connection.called, "WebSocket was not notified"
         assert isinstance(fake_connection.sent_data, dict)
         assert fake_connection.sent_data["type"] == "file_updated"
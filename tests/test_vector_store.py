@@ -0,0 +1,39 @@
+"""Unit tests for the shared vector store manager."""
+
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from app.vector_store import VectorStoreManager, corpus_version
+
+
+def test_manager_hot_swaps_to_empty_store(monkeypatch, tmp_path):
+    """Test that reset empties the store in place and bumps the generation."""
+    monkeypatch.setattr(
+        "app.vector_store.get_embeddings", lambda: DeterministicFakeEmbedding(size=8)
+    )
+    manager = VectorStoreManager(persist_directory=str(tmp_path / "store"))
+
+    store = manager.store
+    assert manager.store is store
+    store.add_texts(["Nuggets", "Broncos"])
+    assert store._collection.count() == 2  # pylint: disable=protected-access
+
+    version = corpus_version()
+    assert manager.reset() == 1
+
+    fresh = manager.store
+    assert fresh is not store
+    assert fresh._collection.count() == 0  # pylint: disable=protected-access
+    assert corpus_version() > version
+
+
+@pytest.mark.asyncio
+async def test_async_shutdown_closes_async_pool(tmp_path):
+    """Test that ashutdown closes the pooled async HTTP client."""
+    manager = VectorStoreManager(persist_directory=str(tmp_path / "store"))
+    client = manager.http_async_client
+
+    await manager.ashutdown()
+
+    assert client.is_closed
+    assert manager.http_async_client is not client